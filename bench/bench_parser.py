@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+log_parser 分阶段基准：合成输入（synth.py）→ 逐阶段计时 + 峰值内存 → JSON 报告
+    阶段：extract_valid_sections / LmemParser / MemoryStatistics / TimestepParser /
+          BmodelIndex / ProfileParser / LayerExtractor / ResultJsonWriter / csv / lvpk
+    - 每个阶段先在 tracemalloc 下跑一遍取峰值内存（Python 分配），再不带追踪跑 --repeat 次取最短时间
+    - 报告里记录吞吐（条/s、MB/s）与运行环境；--baseline 给出旧报告时逐阶段对比
+usage:
+    python bench/bench_parser.py [--cores 4 --insts 200000 ...] [-o report.json]
+                                 [--baseline old.json [--max-regression 0.2]] [--data DIR]
+"""
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import subprocess
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / 'src' / 'core' / 'parser'))
+import log_parser as lp                    # noqa: E402
+from columnar import ColumnarWriter, EntryColumns  # noqa: E402
+from synth import add_scale_args, make_dataset, scale_from_args  # noqa: E402
+
+
+# ----------------------------------------------------------
+# 1. 计时 / 内存
+# ----------------------------------------------------------
+class StageRunner:
+    def __init__(self, repeat: int = 1, memory: bool = True):
+        self.repeat = max(repeat, 1)
+        self.memory = memory
+        self.records: List[Dict[str, Any]] = []
+
+    def run(self, stage: str, fn: Callable[[Any], Any], setup: Callable[[], Any] = lambda: None,
+            items: Optional[Callable[[Any], int]] = None, unit: str = 'items',
+            nbytes: int = 0) -> Any:
+        """
+        fn(setup()) 为被测阶段；setup 在计时之外执行（每次重跑都重新准备输入）
+        items(result) 给出处理的条数，用于吞吐
+        """
+        peak = None
+        if self.memory:
+            arg = setup()
+            tracemalloc.start()
+            base = tracemalloc.get_traced_memory()[0]
+            fn(arg)
+            peak = tracemalloc.get_traced_memory()[1] - base
+            tracemalloc.stop()
+            del arg
+
+        best, result = None, None
+        for _ in range(self.repeat):
+            arg = setup()
+            t0 = time.perf_counter()
+            result = fn(arg)
+            dt = time.perf_counter() - t0
+            best = dt if best is None else min(best, dt)
+            del arg
+
+        n = items(result) if items else 0
+        rec = {
+            'stage': stage,
+            'seconds': round(best, 6),
+            'items': n,
+            'unit': unit,
+            'items_per_s': round(n / best, 1) if best and n else None,
+            'mb_per_s': round(nbytes / best / 1e6, 2) if best and nbytes else None,
+            'peak_mb': round(peak / 1e6, 2) if peak is not None else None,
+        }
+        self.records.append(rec)
+        rate = f"{rec['items_per_s']:>12,.0f} {unit}/s" if rec['items_per_s'] else ' ' * 20
+        mem = f"{rec['peak_mb']:9.1f} MB" if peak is not None else ''
+        print(f'{stage:28s} {best:9.3f}s {rate} {mem}')
+        return result
+
+
+# ----------------------------------------------------------
+# 2. 各阶段
+# ----------------------------------------------------------
+def run_stages(paths: Dict[str, Any], runner: StageRunner, out_dir: Path):
+    log: Path = paths['log']
+    bmodel: Path = paths['bmodel']
+    profiles: List[Path] = paths['profiles']
+
+    sections = runner.run(
+        'extract_valid_sections', lambda _: lp.extract_valid_sections(log),
+        items=lambda r: len(r['lmemSections']) + len(r['timestepSections']),
+        unit='sections', nbytes=log.stat().st_size)
+
+    chip = sections['chip'] or {}
+    lmem, max_ts = runner.run(
+        'LmemParser', lambda p: (p.parse(sections['lmemSections']), p.get_global_max_timestep()),
+        setup=lambda: lp.LmemParser(chip),
+        items=lambda r: sum(len(g['allocations']) for g in r[0]), unit='allocs')
+    n_allocs = sum(len(g['allocations']) for g in lmem)
+
+    backends = ['python'] + (['numpy'] if lp.np is not None else [])
+    for backend in backends:
+        def stats(_, backend=backend):
+            ms = lp.MemoryStatistics(backend)
+            ms.set_lmem_data(lmem, max_ts)
+            return ms.calculate_all_statistics()
+        runner.run(f'MemoryStatistics[{backend}]', stats,
+                   items=lambda r: n_allocs, unit='allocs')
+
+    runner.run(
+        'TimestepParser', lambda p: p.parse(sections['timestepSections']),
+        setup=lp.TimestepParser, items=lambda r: len(sections['timestepSections']), unit='sections')
+    del sections
+
+    index = runner.run('BmodelIndex.load', lambda _: lp.BmodelIndex.load(bmodel),
+                       items=lambda r: len(r.ops), unit='ops', nbytes=bmodel.stat().st_size)
+
+    # 不带 bmodel 解析：只有 BD / GDMA 指令，layer 关联单独计时
+    prof_bytes = sum(p.stat().st_size for p in profiles)
+    parsed = runner.run(
+        'ProfileParser', lambda _: [lp.ProfileParser().parse_file(p)[0] for p in profiles],
+        items=lambda r: sum(len(x['entries']) for x in r), unit='entries', nbytes=prof_bytes)
+
+    def copy_tables():
+        tables = []
+        for prof in parsed:
+            t = EntryColumns()
+            t.extend(prof['entries'])
+            tables.append(t)
+        return tables
+
+    def join(tables):
+        ext = lp.LayerExtractor(index)
+        return sum(ext.make_layer_entries(t, core_id) for core_id, t in enumerate(tables))
+    runner.run('LayerExtractor', join, setup=copy_tables, items=lambda r: r, unit='layers')
+
+    # 输出阶段用带 layer 的完整结果
+    tables = copy_tables()
+    ext = lp.LayerExtractor(index)
+    for core_id, t in enumerate(tables):
+        ext.make_layer_entries(t, core_id)
+        t.sort_by_start()
+    profile = [{'settings': p['settings'], 'entries': t} for p, t in zip(parsed, tables)]
+    del parsed
+    n_entries = sum(len(t) for t in tables)
+    result = lp.parse_log(log)
+
+    def write_json(_):
+        w = lp.ResultJsonWriter(out_dir / 'result.json')
+        for key, value in result.items():
+            if key != 'profile':
+                w.write_key(key, value)
+                continue
+            w.begin_list('profile')
+            for prof in profile:
+                w.write_item(prof)
+            w.end_list()
+        w.close()
+        return (out_dir / 'result.json').stat().st_size
+    runner.run('ResultJsonWriter', write_json, items=lambda r: n_entries, unit='entries')
+
+    def write_csv(_):
+        for core_id, prof in enumerate(profile):
+            lp.export_core_tables(out_dir, core_id, prof['entries'])
+    runner.run('export_core_tables', write_csv, items=lambda r: n_entries, unit='entries')
+
+    def write_lvpk(_):
+        w = ColumnarWriter(out_dir / 'result.lvpk')
+        for core_id, prof in enumerate(profile):
+            w.write_core(core_id, prof['entries'])
+        w.close({'profileSettings': [p['settings'] for p in profile]})
+    runner.run('ColumnarWriter', write_lvpk, items=lambda r: n_entries, unit='entries')
+
+
+# ----------------------------------------------------------
+# 3. 报告
+# ----------------------------------------------------------
+def environment() -> Dict[str, Any]:
+    try:
+        rev = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                             capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        rev = None
+    return {
+        'python': platform.python_version(),
+        'numpy': getattr(lp.np, '__version__', None),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'git': rev,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> bool:
+    """逐阶段对比耗时，返回是否有阶段变慢超过 max_regression"""
+    old = {r['stage']: r for r in baseline.get('stages', [])}
+    if baseline.get('scale') != report['scale']:
+        print('[warn] 基线的输入规模不同，对比仅供参考')
+    regressed = False
+    print(f"\n{'stage':28s} {'baseline':>10s} {'current':>10s} {'change':>8s}")
+    for rec in report['stages']:
+        base = old.get(rec['stage'])
+        if not base or not base['seconds']:
+            print(f"{rec['stage']:28s} {'-':>10s} {rec['seconds']:9.3f}s")
+            continue
+        change = rec['seconds'] / base['seconds'] - 1
+        flag = ''
+        if change > max_regression:
+            flag, regressed = '  <-- slower', True
+        print(f"{rec['stage']:28s} {base['seconds']:9.3f}s {rec['seconds']:9.3f}s {change:+8.1%}{flag}")
+    return regressed
+
+
+def main():
+    ap = argparse.ArgumentParser(description='log_parser stage benchmark')
+    add_scale_args(ap)
+    ap.add_argument('-o', '--output', type=Path, default=Path('bench_report.json'),
+                    help='JSON 报告路径')
+    ap.add_argument('--repeat', type=int, default=1, help='每个阶段重复次数，取最短时间')
+    ap.add_argument('--no-memory', action='store_true', help='不测峰值内存（省掉 tracemalloc 那一遍）')
+    ap.add_argument('--data', type=Path,
+                    help='合成输入目录（已存在时直接复用；默认临时目录，结束后删除）')
+    ap.add_argument('--baseline', type=Path, help='旧报告，逐阶段对比耗时')
+    ap.add_argument('--max-regression', type=float, default=None,
+                    help='与 --baseline 对比时允许的最大变慢比例（如 0.2），超过则以状态码 1 退出')
+    args = ap.parse_args()
+    scale = scale_from_args(args)
+
+    with tempfile.TemporaryDirectory(prefix='bench_parser_') as tmp:
+        data_dir = args.data or Path(tmp) / 'input'
+        if args.data and (data_dir / 'LayerGroup.log').exists():
+            paths = {'log': data_dir / 'LayerGroup.log',
+                     'bmodel': next(data_dir.glob('*.bmodel.json')),
+                     'profiles': sorted(data_dir.glob('compiler_profile_*'),
+                                        key=lambda p: int(p.name.rsplit('_', 1)[1]))}
+            print(f'[info] 复用输入 {data_dir}')
+        else:
+            t0 = time.perf_counter()
+            paths = make_dataset(data_dir, scale)
+            print(f'[info] 生成输入 {data_dir} ({time.perf_counter() - t0:.1f}s)')
+        out_dir = Path(tmp) / 'output'
+        out_dir.mkdir()
+
+        runner = StageRunner(args.repeat, memory=not args.no_memory)
+        run_stages(paths, runner, out_dir)
+        input_bytes = sum(p.stat().st_size for p in [paths['log'], paths['bmodel'], *paths['profiles']])
+
+    report = {
+        'scale': scale.__dict__,
+        'input_mb': round(input_bytes / 1e6, 2),
+        'environment': environment(),
+        'repeat': args.repeat,
+        'stages': runner.records,
+        'total_seconds': round(sum(r['seconds'] for r in runner.records), 6),
+    }
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"\ntotal {report['total_seconds']:.3f}s -> {args.output}")
+
+    if args.baseline:
+        regressed = compare(report, json.loads(args.baseline.read_text()),
+                            args.max_regression if args.max_regression is not None else float('inf'))
+        if regressed and args.max_regression is not None:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ProfileParser 行切分 + 单元格解析的微基准（lines/sec）
+    - 先用 synth.write_profile 生成合成 profile（默认 1000 万行，写到临时文件后逐行读，不整体进内存）
+    - legacy：改动前的 re.split + 逐字段 re.match 实现（按 str 逐行读）
+    - current：profile_reader.ColumnSplitter / ProfileParser._scan_cell（按 bytes 逐行读，与 parse_file 相同）
+usage:
+    python bench/bench_tokenizer.py [-n LINES] [--keep PATH]
+"""
+import re
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src' / 'core' / 'parser'))
+from log_parser import ProfileParser      # noqa: E402
+from profile_reader import ColumnSplitter  # noqa: E402
+from synth import write_profile           # noqa: E402
+
+
+# ----------------------------------------------------------
+# 1. 改动前的实现（对照组）
+# ----------------------------------------------------------
+def legacy_split(line: str):
+    parts = re.split(r' {2,}', line, maxsplit=1)
+    return parts[0], (parts[1] if len(parts) > 1 else None)
+
+
+def legacy_parse_single(text: str, engine: str) -> Optional[Dict[str, Any]]:
+    items = text.split('|')
+    if len(items) < 3:
+        return None
+    entry = {'engine': engine, 'op': items[0], 'type': items[1]}
+    for it in items[2:]:
+        m = re.match(r'(\w+):(.+)', it)
+        if not m:
+            continue
+        k, v = m.group(1), m.group(2)
+        if k == 's':
+            entry['start'] = int(v)
+        elif k == 'e':
+            entry['end'] = int(v)
+        elif k == 't':
+            entry['cost'] = int(v)
+        elif k == 'b':
+            entry['bd_id'] = int(v)
+        elif k == 'g':
+            entry['gdma_id'] = int(v)
+        elif k == 'dr':
+            entry['direction'] = int(v)
+        elif k == 'sz':
+            entry['size'] = int(v)
+        elif k == 'bw':
+            entry['bandwidth'] = float(v)
+    required = {'op', 'type', 'start', 'end', 'cost'}
+    return entry if required.issubset(entry) else None
+
+
+# ----------------------------------------------------------
+# 2. 计时
+# ----------------------------------------------------------
+def run(path: Path, split, parse_cell, binary: bool = False, learn_header=None):
+    """
+    与 ProfileParser.parse 的主循环相同，只是不保留 entries；binary 时以 'rb' 读，逐行为 bytes
+    learn_header 非空时把 ENGINE_ 表头行交给它（ColumnSplitter 从表头取右列位置）
+    """
+    dash, header = (b'-', b'ENGINE_') if binary else ('-', 'ENGINE_')
+    n_lines = n_entries = 0
+    t0 = time.perf_counter()
+    with (path.open('rb') if binary else path.open('r', encoding='utf-8')) as f:
+        for line in f:
+            line = line.rstrip()
+            n_lines += 1
+            if not line or line.startswith(dash):
+                continue
+            if header in line:
+                if learn_header:
+                    learn_header(line)
+                continue
+            left, right = split(line)
+            if left and parse_cell(left):
+                n_entries += 1
+            if right and parse_cell(right):
+                n_entries += 1
+    return n_lines, n_entries, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description='ProfileParser tokenizer microbenchmark')
+    ap.add_argument('-n', '--lines', type=int, default=10_000_000)
+    ap.add_argument('--keep', type=Path, help='合成 profile 保存路径（默认临时文件，结束后删除）')
+    args = ap.parse_args()
+
+    path = args.keep or Path(tempfile.mkstemp(prefix='bench_profile_')[1])
+    try:
+        t0 = time.perf_counter()
+        write_profile(path, args.lines)
+        print(f'generated {args.lines} lines ({path.stat().st_size >> 20} MB) '
+              f'in {time.perf_counter() - t0:.1f}s')
+
+        pp = ProfileParser()
+        names = {}     # _scan_cell 的 op / type 名解码缓存，每轮单独一份
+        cols = ColumnSplitter()
+        results = {}
+        for name, split, cell, binary, header in (
+            ('legacy', legacy_split, lambda text: legacy_parse_single(text, 'BD'), False, None),
+            ('current', cols.split, lambda text: pp._scan_cell(text, names), True, cols.learn_header),
+        ):
+            n_lines, n_entries, dt = run(path, split, cell, binary, header)
+            results[name] = n_lines / dt
+            print(f'{name:8s} {n_entries:>10d} entries  {dt:7.2f}s  {n_lines / dt:12,.0f} lines/s')
+        print(f'speedup  {results["current"] / results["legacy"]:.2f}x')
+    finally:
+        if args.keep is None:
+            path.unlink()
+
+
+if __name__ == '__main__':
+    main()
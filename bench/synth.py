@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准用的合成输入（同一 seed 逐字节可复现），格式与 log_parser 解析的真实日志一致
+    - LayerGroup.log：lmem_spec 芯片段 + 若干组 lmem_assign 分配段 + timestep_cycle 段
+    - compiler_profile_<n>：ENGINE_BD / ENGINE_GDMA 两列指令 + 尾部汇总行
+    - <name>.bmodel.json：每个 core 若干 tpu 算子，BD / GDMA id 区间与 profile 里的指令对应
+全部逐行写文件，生成规模不受内存限制
+usage:
+    python bench/synth.py out_dir/ [--cores 4] [--insts 200000] [--ops 2000] ...
+"""
+import json
+import random
+import argparse
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List
+
+LMEM_TYPES = ['LMEM_ACTIVATION', 'LMEM_WEIGHT', 'LMEM_OPERATION']
+OP_NAMES   = ['Conv2D', 'Load', 'Store', 'Add', 'MatMul', 'Pool2D']
+
+
+@dataclass
+class Scale:
+    cores: int = 4            # compiler_profile_<n> 个数
+    insts: int = 200_000      # 每个 core 的 BD 指令数（GDMA 约为其 6/7）
+    ops: int = 2_000          # 每个 core 的 bmodel 算子数
+    groups: int = 50          # lmem 分配组数（shape_secs 不同）
+    allocs: int = 200         # 每组分配条数
+    timesteps: int = 64       # 每组 timestep 数
+    seed: int = 0
+
+
+# ----------------------------------------------------------
+# 1. LayerGroup 日志
+# ----------------------------------------------------------
+def write_layergroup_log(path: Path, scale: Scale):
+    rnd = random.Random(scale.seed)
+    steps = scale.timesteps
+    with path.open('w', encoding='utf-8') as f:
+        f.write('INFO: synthetic LayerGroup log\n')
+        f.write('[LG] ; action = lmem_assign; step = lmem_spec; lmem_bytes = 262144; '
+                'lmem_banks = 16; lmem_bank_bytes = 16384;\n')
+        for g in range(scale.groups):
+            secs = f'1,{g + 1},1,1,1'
+            for a in range(scale.allocs):
+                st = rnd.randrange(steps)
+                en = rnd.randrange(steps)
+                status = 'success' if rnd.random() < 0.9 else 'failed'
+                f.write(
+                    f'[LG] ; action = lmem_assign; tag = iteration_result; op_name = "op_{g}_{a}"; '
+                    f'op_type = tpu.{rnd.choice(OP_NAMES)}; addr = 0x{rnd.randrange(0, 262144, 64):x}; '
+                    f'size = {rnd.randint(1, 64) * 64}; timestep_start = {st}; timestep_end = {en}; '
+                    f'lmem_type = {rnd.choice(LMEM_TYPES)}; hold_in_lmem = {int(rnd.random() < 0.1)}; '
+                    f'status = {status}; shape_secs = {secs}; allow_bank_conflict = {g % 2};\n')
+        f.write('[LG] ; action = timestep_cycle; debug_range = given; x = 1;\n')
+        for g in range(scale.groups):
+            for t in range(steps):
+                f.write(
+                    f'[LG] ; action = timestep_cycle; step = timestep_cycle; tag = result; '
+                    f'timestep = {t}; timestep_type = {rnd.choice(["gdma", "tiu"])}; op = "op{t}"; '
+                    f'tensor_name = "t{t}"; concerning_op = {t}; concerning_op_name = "cop{t}"; '
+                    f'cycle = {rnd.randint(1, 1000)}; shape_secs = 1,{g + 1},1,1,1;\n')
+
+
+# ----------------------------------------------------------
+# 2. compiler_profile_<n>
+# ----------------------------------------------------------
+def write_profile(path: Path, n_lines: int, seed: int = 0):
+    """与 compiler_profile_N 同格式；每 7 行一行只有 BD 列；第 i 行的 BD / GDMA id 都是 i"""
+    rnd = random.Random(seed)
+    t = tg = 0
+    with path.open('w', encoding='utf-8') as f:
+        f.write('ENGINE_BD                                ENGINE_GDMA\n' + '-' * 60 + '\n')
+        for i in range(1, n_lines + 1):
+            d = rnd.randint(1, 50)
+            left = f'Conv2D_{i % 997}|AR|s:{t}|b:{i}|g:{i - 1}|e:{t + d}|t:{d}'
+            t += d + 3
+            if i % 7 == 0:
+                f.write(left + '\n')
+                continue
+            dg = rnd.randint(1, 80)
+            right = (f'Load_{i % 997}|DMA_tensor|s:{tg}|b:{i - 1}|g:{i}|e:{tg + dg}|t:{dg}'
+                     f'|dr:{i % 4}|sz:{dg * 64}|bw:{dg / 7:.2f}')
+            tg += dg + 2
+            f.write(left.ljust(40) + '   ' + right + '\n')
+        f.write('-' * 60 + '\n')
+        f.write(f'API_END total_cycle:{max(t, tg)}|b:{n_lines}|g:{n_lines}\n')
+        f.write(f'TCYC : {max(t, tg)}\n')
+        f.write('GDMA SUMMARY : total|dr[0] S2L:100 a|dr[1] L2S:200 b|dr[2] S2S:0 c|dr[3] L2L:5\n')
+        f.write('DDR BW USAGE : 12.5%\n')
+        f.write('flops: 1.5e+09, runtime: 3.25ms, ComputationAbility: 1.75T\n')
+
+
+# ----------------------------------------------------------
+# 3. bmodel.json
+# ----------------------------------------------------------
+def write_bmodel(path: Path, scale: Scale):
+    """每个 core 的算子依次瓜分 1..insts 的 BD / GDMA id"""
+    rnd = random.Random(scale.seed + 1)
+    per_op = max(scale.insts // max(scale.ops, 1), 1)
+    with path.open('w', encoding='utf-8') as f:
+        f.write('[\n')
+        first = True
+        for c in range(scale.cores):
+            bd = gd = 0
+            for o in range(scale.ops):
+                nb = min(per_op, scale.insts - bd)
+                ng = min(per_op, scale.insts - gd)
+                name = rnd.choice(OP_NAMES)
+                node = {
+                    'opcode': f'tpu.{name}', 'file-line': 100 + o, 'core_id': c,
+                    'tiu_dma_id(before)': [bd, gd], 'tiu_dma_id(after)': [bd + nb, gd + ng],
+                    'operands': [{'shape': [1, 64, 56, 56], 'memory_type': '<1x64x56x56xf32>'}],
+                    'results': [{'shape': [1, 64, 56, 56], 'memory_type': '<1x64x56x56xsi8>'}],
+                    'is_local': rnd.random() < 0.5,
+                }
+                f.write(('' if first else ',\n') + json.dumps(node))
+                first = False
+                bd += nb
+                gd += ng
+        f.write('\n]\n')
+
+
+# ----------------------------------------------------------
+# 4. 整套输入目录
+# ----------------------------------------------------------
+def make_dataset(out_dir: Path, scale: Scale) -> Dict[str, object]:
+    """写出 log_parser.py 可直接解析的输入目录，返回各文件路径"""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    log = out_dir / 'LayerGroup.log'
+    bmodel = out_dir / 'synthetic.bmodel.json'
+    write_layergroup_log(log, scale)
+    write_bmodel(bmodel, scale)
+    profiles: List[Path] = []
+    for c in range(scale.cores):
+        p = out_dir / f'compiler_profile_{c}'
+        write_profile(p, scale.insts, seed=scale.seed + 100 + c)
+        profiles.append(p)
+    return {'log': log, 'bmodel': bmodel, 'profiles': profiles}
+
+
+def add_scale_args(ap: argparse.ArgumentParser):
+    for name, default in asdict(Scale()).items():
+        ap.add_argument(f'--{name}', type=int, default=default)
+
+
+def scale_from_args(args: argparse.Namespace) -> Scale:
+    return Scale(**{k: getattr(args, k) for k in asdict(Scale())})
+
+
+def main():
+    ap = argparse.ArgumentParser(description='生成合成的 LayerGroup 日志 / compiler_profile / bmodel.json')
+    ap.add_argument('out_dir', type=Path)
+    add_scale_args(ap)
+    args = ap.parse_args()
+    paths = make_dataset(args.out_dir, scale_from_args(args))
+    size = sum(p.stat().st_size for p in [paths['log'], paths['bmodel'], *paths['profiles']])
+    print(f'generated {args.out_dir} ({size >> 20} MB)')
+
+
+if __name__ == '__main__':
+    main()
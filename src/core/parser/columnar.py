@@ -0,0 +1,575 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+result 的紧凑列式容器（.lvpk），与 result.json 内容等价
+    - profile entries 按 core 存成定长类型数组（start/end/cost/... 为 float64，缺失为 NaN）
+    - op / type / info / file_line 字符串统一进全局字符串表，列里只存 u32 下标
+    - 其余部分（lmem / summary / timestep / chip / 各 core settings、lod 金字塔）放进 META（JSON）
+
+文件布局（小端）：
+    b'LVPK' u32 version
+    chunk*:  tag[4] u32 0  u64 payload_len  payload（补齐到 8 字节）
+        CORE: u32 core_id  u32 n  各列依 COLUMNS 顺序紧接，每列起点 8 字节对齐
+              每个 core 的 entries（已按 start 排序）按 BLOCK_ROWS 行切成多个 CORE 块，依次写出
+        CIDX: u32 count  u32 0  记录[count]：u32 core_id  u32 n  u64 payload 偏移  f64 min_start  f64 max_end
+        STRS: u32 count  u32 offsets[count + 1]  utf-8 blob
+        META: utf-8 JSON
+        TAIL: u64 CIDX / STRS / META 的 chunk 偏移（固定为最后 40 字节）
+所有列都 8 字节对齐，浏览器端可直接 new Float64Array(buffer, offset, n) 读取
+ColumnarReader 从 TAIL 直接定位块索引，query(core_id, t0, t1) 只读取、解码与时间窗口相交的块：
+块内 start 有序，但长指令 / layer 的 end 可能跨过后面好几块，所以用 max_end 的前缀最大值定位第一块
+
+另有 EntryColumns：解析期间单个 core 的 entries 在内存里的列式存储（不落盘），
+写 json / csv 时才逐条还原成 dict，写 .lvpk 时直接按列编码
+
+usage:
+    from columnar import write_columnar, read_columnar
+    write_columnar(result, out_dir / 'result.lvpk')
+    result = read_columnar(out_dir / 'result.lvpk')     # 与 json.load(result.json) 同结构
+"""
+import io
+import sys
+import bisect
+import json
+import math
+import struct
+from array import array
+from pathlib import Path
+from typing import List, Dict, Any, Optional, BinaryIO, Iterator, Tuple, Union
+
+MAGIC   = b'LVPK'
+VERSION = 2                     # 2：CORE 分块 + CIDX / TAIL；仍可读取 1
+BLOCK_ROWS = 4096               # 每个 CORE 块的行数
+
+ENGINES  = ['BD', 'GDMA', 'LAYER']
+NO_STR   = 0xFFFFFFFF           # 字符串列缺失值
+NO_BOOL  = 0xFF                 # 布尔列缺失值
+
+# (列名, array typecode)；float64 列在前，保证后续列天然对齐
+COLUMNS: List[Tuple[str, str]] = [
+    ('start', 'd'), ('end', 'd'), ('cost', 'd'),
+    ('bd_id', 'd'), ('gdma_id', 'd'), ('direction', 'd'),
+    ('size', 'd'), ('bandwidth', 'd'),
+    ('op', 'I'), ('type', 'I'), ('info', 'I'), ('file_line', 'I'),
+    ('engine', 'B'), ('isSL', 'B'),
+]
+NUM_FIELDS = [name for name, code in COLUMNS if code == 'd']
+STR_FIELDS = ['op', 'type', 'info']
+
+# 还原 dict 时的键顺序，与 result.json 的 entries 一致（.lvpk 读取和 EntryColumns 遍历共用）
+ENTRY_KEYS = {
+    'BD':    ['engine', 'op', 'type', 'start', 'bd_id', 'gdma_id', 'end', 'cost',
+              'direction', 'size', 'bandwidth'],
+    'GDMA':  ['engine', 'op', 'type', 'start', 'bd_id', 'gdma_id', 'end', 'cost',
+              'direction', 'size', 'bandwidth'],
+    'LAYER': ['engine', 'op', 'type', 'start', 'end', 'cost', 'file_line', 'info', 'isSL'],
+}
+FLOAT_FIELDS = {'bandwidth'}
+
+MISSING = -(1 << 63)            # EntryColumns 整数列缺失值（浮点列用 NaN）
+INT_FIELDS = ['start', 'end', 'cost', 'bd_id', 'gdma_id', 'direction', 'size']
+ENGINE_CODE = {name: i for i, name in enumerate(ENGINES)}
+
+
+def _pad8(n: int) -> int:
+    return (-n) % 8
+
+
+def _le(arr: array) -> bytes:
+    """按小端输出 array 内容"""
+    if sys.byteorder != 'little' and arr.itemsize > 1:
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+# ----------------------------------------------------------
+# 1. 字符串表
+# ----------------------------------------------------------
+class StringTable:
+    """字符串驻留：同一个 op / type 名在所有 core 里只存一份"""
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def intern(self, s: str) -> int:
+        i = self.ids.get(s)
+        if i is None:
+            i = self.ids[s] = len(self.strings)
+            self.strings.append(s)
+        return i
+
+    def encode(self) -> bytes:
+        blobs = [s.encode('utf-8') for s in self.strings]
+        offsets = array('I', [0])
+        for b in blobs:
+            offsets.append(offsets[-1] + len(b))
+        return struct.pack('<I', len(blobs)) + _le(offsets) + b''.join(blobs)
+
+    @staticmethod
+    def decode(payload: bytes) -> List[str]:
+        (count,) = struct.unpack_from('<I', payload, 0)
+        offsets = _read_array('I', payload, 4, count + 1)
+        base = 4 + 4 * (count + 1)
+        return [payload[base + offsets[i]: base + offsets[i + 1]].decode('utf-8')
+                for i in range(count)]
+
+
+def _read_array(code: str, buf, offset: int, n: int) -> array:
+    arr = array(code)
+    arr.frombytes(bytes(buf[offset: offset + n * arr.itemsize]))
+    if sys.byteorder != 'little' and arr.itemsize > 1:
+        arr.byteswap()
+    return arr
+
+
+# ----------------------------------------------------------
+# 2. 内存列式 entries
+# ----------------------------------------------------------
+# 各列的 array typecode；整数列用 int64，缺失为 MISSING
+_ROW_CODES = {
+    'engine': 'B', 'op': 'I', 'type': 'I', 'info': 'I', 'file_line': 'I', 'isSL': 'B',
+    **{k: 'q' for k in INT_FIELDS}, 'bandwidth': 'd',
+}
+# ENTRY_KEYS 去掉打头的 engine（遍历时 engine 先单独放进 dict）
+ROW_KEYS = {engine: keys[1:] for engine, keys in ENTRY_KEYS.items()}
+
+
+class EntryColumns:
+    """
+    单个 core 的 profile entries（struct-of-arrays）
+    每条约 80 字节，而等价的 dict 在 600 字节以上；op / type / info 在 strings 里驻留，
+    file_line 与 .lvpk 相同存 JSON 文本。遍历时逐条产出 dict（只在序列化边界使用）
+    """
+    __slots__ = ('strings', *_ROW_CODES)
+
+    def __init__(self):
+        self.strings = StringTable()
+        for name, code in _ROW_CODES.items():
+            setattr(self, name, array(code))
+
+    def __len__(self) -> int:
+        return len(self.engine)
+
+    def append_instr(self, engine: str, op: str, type_: str, start: int, end: int, cost: int,
+                     bd_id: int = MISSING, gdma_id: int = MISSING, direction: int = MISSING,
+                     size: int = MISSING, bandwidth: float = math.nan):
+        intern = self.strings.intern
+        self.engine.append(ENGINE_CODE[engine])
+        self.op.append(intern(op))
+        self.type.append(intern(type_))
+        self.info.append(NO_STR)
+        self.file_line.append(NO_STR)
+        self.isSL.append(NO_BOOL)
+        self.start.append(start)
+        self.end.append(end)
+        self.cost.append(cost)
+        self.bd_id.append(bd_id)
+        self.gdma_id.append(gdma_id)
+        self.direction.append(direction)
+        self.size.append(size)
+        self.bandwidth.append(bandwidth)
+
+    def append_layer(self, op: str, type_: str, start: int, end: int, cost: int,
+                     file_line: Any, info: str, isSL: bool):
+        intern = self.strings.intern
+        self.engine.append(ENGINE_CODE['LAYER'])
+        self.op.append(intern(op))
+        self.type.append(intern(type_))
+        self.info.append(intern(info))
+        self.file_line.append(intern(json.dumps(file_line)))
+        self.isSL.append(int(bool(isSL)))
+        self.start.append(start)
+        self.end.append(end)
+        self.cost.append(cost)
+        self.bd_id.append(MISSING)
+        self.gdma_id.append(MISSING)
+        self.direction.append(MISSING)
+        self.size.append(MISSING)
+        self.bandwidth.append(math.nan)
+
+    def extend(self, other: 'EntryColumns'):
+        """追加另一张表的全部行（字符串下标换成本表的下标）"""
+        remap = [self.strings.intern(s) for s in other.strings.strings]
+        for name, code in _ROW_CODES.items():
+            src = getattr(other, name)
+            if code == 'I':
+                src = array('I', (NO_STR if v == NO_STR else remap[v] for v in src))
+            getattr(self, name).extend(src)
+
+    def sort_by_start(self):
+        """按 start 稳定排序（与 list.sort(key=start) 的结果顺序相同）"""
+        order = sorted(range(len(self)), key=self.start.__getitem__)
+        for name, code in _ROW_CODES.items():
+            col = getattr(self, name)
+            setattr(self, name, array(code, [col[i] for i in order]))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        cols = {name: getattr(self, name) for name in _ROW_CODES}
+        strs = self.strings.strings
+        for i in range(len(self)):
+            engine = ENGINES[cols['engine'][i]]
+            e = {'engine': engine}
+            for k in ROW_KEYS[engine]:
+                v = cols[k][i]
+                code = _ROW_CODES[k]
+                if code == 'q':
+                    if v != MISSING:
+                        e[k] = v
+                elif code == 'I':
+                    if v != NO_STR:
+                        e[k] = json.loads(strs[v]) if k == 'file_line' else strs[v]
+                elif code == 'd':
+                    if v == v:  # 非 NaN
+                        e[k] = v
+                elif v != NO_BOOL:
+                    e[k] = bool(v)
+            yield e
+
+    def lvpk_columns(self, strings: StringTable) -> Dict[str, array]:
+        """转成 COLUMNS 布局的列，字符串下标换成 .lvpk 全局字符串表的下标"""
+        remap = [strings.intern(s) for s in self.strings.strings]
+        nan = math.nan
+        cols = {}
+        for name, code in COLUMNS:
+            src = getattr(self, name)
+            if code == 'd':
+                cols[name] = array('d', (nan if v == MISSING else v for v in src)) \
+                    if name in INT_FIELDS else array('d', src)
+            elif code == 'I':
+                cols[name] = array('I', (NO_STR if v == NO_STR else remap[v] for v in src))
+            else:
+                cols[name] = array('B', src)
+        return cols
+
+
+# ----------------------------------------------------------
+# 3. 写
+# ----------------------------------------------------------
+CIDX_RECORD = struct.Struct('<IIQdd')
+TAIL_RECORD = struct.Struct('<QQQ')
+
+
+def core_columns(entries: Union[EntryColumns, List[Dict[str, Any]]],
+                 strings: StringTable) -> Dict[str, array]:
+    """一个 core 的 entries 转成 COLUMNS 布局的列"""
+    if isinstance(entries, EntryColumns):
+        return entries.lvpk_columns(strings)
+    return _dict_columns(entries, strings)
+
+
+def encode_block(core_id: int, cols: Dict[str, array], lo: int, hi: int) -> bytes:
+    """把 [lo, hi) 行编码成 CORE chunk 的 payload"""
+    out = io.BytesIO()
+    out.write(struct.pack('<II', core_id, hi - lo))
+    for name, _ in COLUMNS:
+        raw = _le(cols[name][lo:hi])
+        out.write(raw)
+        out.write(b'\0' * _pad8(len(raw)))
+    return out.getvalue()
+
+
+def block_span(cols: Dict[str, array], lo: int, hi: int) -> Tuple[float, float]:
+    """[lo, hi) 行的 (最小 start, 最大 end)；end < start 的行按 start 计，NaN 忽略"""
+    starts = [v for v in cols['start'][lo:hi] if v == v]
+    ends = [max(e, s) if e == e else s for s, e in zip(cols['start'][lo:hi], cols['end'][lo:hi])
+            if s == s]
+    return (min(starts, default=math.inf), max(ends, default=-math.inf))
+
+
+def _dict_columns(entries: List[Dict[str, Any]], strings: StringTable) -> Dict[str, array]:
+    cols = {name: array(code) for name, code in COLUMNS}
+    nan = math.nan
+    for e in entries:
+        for k in NUM_FIELDS:
+            v = e.get(k)
+            cols[k].append(nan if v is None else v)
+        for k in STR_FIELDS:
+            v = e.get(k)
+            cols[k].append(NO_STR if v is None else strings.intern(v))
+        fl = e.get('file_line')
+        cols['file_line'].append(NO_STR if fl is None else strings.intern(json.dumps(fl)))
+        cols['engine'].append(ENGINES.index(e['engine']))
+        sl = e.get('isSL')
+        cols['isSL'].append(NO_BOOL if sl is None else int(bool(sl)))
+    return cols
+
+
+class ColumnarWriter:
+    """逐块写出 .lvpk；CORE 可以边解析边写，CIDX / STRS / META / TAIL 在 close 时写"""
+    def __init__(self, path: Path, block_rows: int = BLOCK_ROWS):
+        self.path = Path(path)
+        self.f: BinaryIO = self.path.open('wb')
+        self.f.write(MAGIC + struct.pack('<I', VERSION))
+        self.strings = StringTable()
+        self.block_rows = block_rows
+        self.index: List[Tuple[int, int, int, float, float]] = []   # CIDX 记录
+
+    def write_chunk(self, tag: bytes, payload: bytes) -> int:
+        """返回 chunk 起点偏移"""
+        pos = self.f.tell()
+        self.f.write(tag + struct.pack('<IQ', 0, len(payload)))
+        self.f.write(payload)
+        self.f.write(b'\0' * _pad8(len(payload)))
+        return pos
+
+    def write_core(self, core_id: int, entries: Union[EntryColumns, List[Dict[str, Any]]]):
+        """按 block_rows 行切块写出；空 core 也写一个 0 行的块（进索引），保留 core_id"""
+        cols = core_columns(entries, self.strings)
+        n = len(cols['engine'])
+        for lo in range(0, max(n, 1), self.block_rows):
+            hi = min(lo + self.block_rows, n)
+            pos = self.write_chunk(b'CORE', encode_block(core_id, cols, lo, hi))
+            self.index.append((core_id, hi - lo, pos + 16, *block_span(cols, lo, hi)))
+
+    def close(self, meta: Dict[str, Any]):
+        idx = io.BytesIO()
+        idx.write(struct.pack('<II', len(self.index), 0))
+        for rec in self.index:
+            idx.write(CIDX_RECORD.pack(*rec))
+        cidx = self.write_chunk(b'CIDX', idx.getvalue())
+        strs = self.write_chunk(b'STRS', self.strings.encode())
+        meta = {**meta, 'columns': COLUMNS, 'engines': ENGINES}
+        meta_pos = self.write_chunk(b'META', json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+        self.write_chunk(b'TAIL', TAIL_RECORD.pack(cidx, strs, meta_pos))
+        self.f.close()
+
+
+def write_columnar(result: Dict[str, Any], path: Path):
+    """把完整 result（与 result.json 同结构）写成 .lvpk"""
+    w = ColumnarWriter(path)
+    profile = result.get('profile') or []
+    for core_id, prof in enumerate(profile):
+        w.write_core(core_id, prof.get('entries') or [])
+    meta = {k: v for k, v in result.items() if k != 'profile'}
+    meta['profileSettings'] = [prof.get('settings', {}) for prof in profile]
+    meta['profileLod'] = [prof.get('lod') for prof in profile]
+    w.close(meta)
+
+
+# ----------------------------------------------------------
+# 4. 读（纯标准库，不依赖 json 解析 entries）
+# ----------------------------------------------------------
+def iter_chunks(f: BinaryIO) -> Iterator[Tuple[bytes, int, int]]:
+    """遍历 chunk，产出 (tag, payload 偏移, payload 长度)；只 seek 不读 payload"""
+    head = f.read(8)
+    if head[:4] != MAGIC:
+        raise ValueError('不是 LVPK 文件')
+    (version,) = struct.unpack('<I', head[4:8])
+    if version > VERSION:
+        raise ValueError(f'不支持的 LVPK 版本: {version}')
+    pos = 8
+    while True:
+        f.seek(pos)
+        hdr = f.read(16)
+        if len(hdr) < 16:
+            return
+        tag = hdr[:4]
+        _, length = struct.unpack('<IQ', hdr[4:])
+        yield tag, pos + 16, length
+        pos += 16 + length + _pad8(length)
+
+
+class _BlockIndex:
+    """单个 core 的块索引；块按写出顺序（即 start 升序）排列"""
+    def __init__(self):
+        self.offsets: List[int] = []       # payload 偏移
+        self.rows: List[int] = []
+        self.min_start: List[float] = []
+        self.max_end: List[float] = []
+        self.max_end_prefix: List[float] = []    # max_end 的前缀最大值（单调不减）
+        self.min_start_suffix: List[float] = []  # min_start 的后缀最小值（单调不减）
+
+    def add(self, offset: int, n: int, min_start: float, max_end: float):
+        self.offsets.append(offset)
+        self.rows.append(n)
+        self.min_start.append(min_start)
+        self.max_end.append(max_end)
+        self.max_end_prefix.append(max(max_end, self.max_end_prefix[-1]) if self.max_end_prefix
+                                   else max_end)
+
+    def seal(self):
+        suffix, lo = [], math.inf
+        for v in reversed(self.min_start):
+            lo = min(lo, v)
+            suffix.append(lo)
+        self.min_start_suffix = suffix[::-1]
+
+    def overlapping(self, t0: float, t1: float) -> List[int]:
+        """可能含有与 [t0, t1) 相交的行的块下标"""
+        first = bisect.bisect_left(self.max_end_prefix, t0)      # 之前的块全部在 t0 之前结束
+        last = bisect.bisect_left(self.min_start_suffix, t1)     # 之后的块全部从 t1 起才开始
+        return [b for b in range(first, last)
+                if self.min_start[b] < t1 and self.max_end[b] >= t0]
+
+
+def _block_bytes(n: int) -> int:
+    """n 行 CORE 块的 payload 长度"""
+    size = 8
+    for _, code in COLUMNS:
+        raw = array(code).itemsize * n
+        size += raw + _pad8(raw)
+    return size
+
+
+class ColumnarReader:
+    """
+    按需读取 .lvpk：meta / 字符串表常驻，各 core 的列在访问时才解码
+    v2 文件经 TAIL 直接定位块索引，不必遍历所有 chunk；v1 文件（每个 core 一整块、无索引）仍可读取
+    """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.cores: Dict[int, List[Tuple[int, int]]] = {}   # core_id -> [(payload 偏移, 长度)]
+        self.index: Dict[int, _BlockIndex] = {}
+        self.strings: List[str] = []
+        self.meta: Dict[str, Any] = {}
+        with self.path.open('rb') as f:
+            if not self._load_footer(f):
+                self._scan_chunks(f)
+
+    def _load_footer(self, f: BinaryIO) -> bool:
+        size = f.seek(0, io.SEEK_END)
+        tail_len = 16 + TAIL_RECORD.size
+        if size < 8 + tail_len:
+            return False
+        f.seek(0)
+        head = f.read(8)
+        if head[:4] != MAGIC:
+            raise ValueError('不是 LVPK 文件')
+        (version,) = struct.unpack('<I', head[4:8])
+        if version > VERSION:
+            raise ValueError(f'不支持的 LVPK 版本: {version}')
+        f.seek(size - tail_len)
+        hdr = f.read(tail_len)
+        if hdr[:4] != b'TAIL':
+            return False
+        cidx, strs, meta = TAIL_RECORD.unpack_from(hdr, 16)
+        self.strings = StringTable.decode(_read_chunk(f, strs))
+        self.meta = json.loads(_read_chunk(f, meta).decode('utf-8'))
+        idx = _read_chunk(f, cidx)
+        (count,) = struct.unpack_from('<I', idx, 0)
+        for k in range(count):
+            core_id, n, off, lo, hi = CIDX_RECORD.unpack_from(idx, 8 + k * CIDX_RECORD.size)
+            self.cores.setdefault(core_id, []).append((off, _block_bytes(n)))
+            self.index.setdefault(core_id, _BlockIndex()).add(off, n, lo, hi)
+        for bi in self.index.values():
+            bi.seal()
+        return True
+
+    def _scan_chunks(self, f: BinaryIO):
+        f.seek(0)
+        for tag, off, length in iter_chunks(f):
+            if tag == b'CORE':
+                f.seek(off)
+                core_id, _ = struct.unpack('<II', f.read(8))
+                self.cores.setdefault(core_id, []).append((off, length))
+            elif tag == b'STRS':
+                f.seek(off)
+                self.strings = StringTable.decode(f.read(length))
+            elif tag == b'META':
+                f.seek(off)
+                self.meta = json.loads(f.read(length).decode('utf-8'))
+
+    def _read_block(self, f: BinaryIO, off: int, length: int) -> Dict[str, array]:
+        f.seek(off)
+        payload = f.read(length)
+        _, n = struct.unpack_from('<II', payload, 0)
+        pos, cols = 8, {}
+        for name, code in COLUMNS:
+            cols[name] = _read_array(code, payload, pos, n)
+            size = cols[name].itemsize * n
+            pos += size + _pad8(size)
+        return cols
+
+    def columns(self, core_id: int) -> Dict[str, array]:
+        """某个 core 的原始列（array.array，各块按顺序拼接）"""
+        cols = {name: array(code) for name, code in COLUMNS}
+        with self.path.open('rb') as f:
+            for off, length in self.cores[core_id]:
+                for name, col in self._read_block(f, off, length).items():
+                    cols[name].extend(col)
+        return cols
+
+    def entries(self, core_id: int) -> List[Dict[str, Any]]:
+        """还原成与 result.json 相同的 entry dict 列表"""
+        if core_id not in self.cores:
+            return []
+        return columns_to_entries(self.columns(core_id), self.strings)
+
+    def query(self, core_id: int, t0: float, t1: float) -> List[Dict[str, Any]]:
+        """
+        某个 core 与时间窗口 [t0, t1) 相交的 entries（顺序同 entries()）
+        相交：start < t1 且（start >= t0 或 end > t0），即 end <= start 的行按时间点 start 算
+        v2 文件只读取、解码可能相交的块；没有块索引的 v1 文件退回整个 core 过滤
+        """
+        if core_id not in self.cores:
+            return []
+        bi = self.index.get(core_id)
+        if bi is None:
+            blocks = [self.columns(core_id)]
+        else:
+            with self.path.open('rb') as f:
+                blocks = [self._read_block(f, bi.offsets[b], _block_bytes(bi.rows[b]))
+                          for b in bi.overlapping(t0, t1)]
+        out = []
+        for cols in blocks:
+            start, end = cols['start'], cols['end']
+            rows = [i for i in range(len(start))
+                    if start[i] < t1 and (start[i] >= t0 or end[i] > t0)]
+            if rows:
+                sub = {name: array(code, (cols[name][i] for i in rows)) for name, code in COLUMNS}
+                out.extend(columns_to_entries(sub, self.strings))
+        return out
+
+    def load(self) -> Dict[str, Any]:
+        meta = dict(self.meta)
+        settings = meta.pop('profileSettings', [])
+        lods = meta.pop('profileLod', None) or [None] * len(settings)
+        meta.pop('columns', None)
+        meta.pop('engines', None)
+        profile = []
+        for i, s in enumerate(settings):
+            prof = {'settings': s, 'entries': self.entries(i)}
+            if lods[i] is not None:
+                prof['lod'] = lods[i]
+            profile.append(prof)
+        return {**meta, 'profile': profile}
+
+
+def _read_chunk(f: BinaryIO, pos: int) -> bytes:
+    """读取 pos 处 chunk 的 payload"""
+    f.seek(pos)
+    (length,) = struct.unpack('<Q', f.read(16)[8:])
+    return f.read(length)
+
+
+def columns_to_entries(cols: Dict[str, array], strings: List[str]) -> List[Dict[str, Any]]:
+    out = []
+    for i in range(len(cols['engine'])):
+        engine = ENGINES[cols['engine'][i]]
+        e = {}
+        for k in ENTRY_KEYS[engine]:
+            if k == 'engine':
+                e[k] = engine
+            elif k in STR_FIELDS:
+                v = cols[k][i]
+                if v != NO_STR:
+                    e[k] = strings[v]
+            elif k == 'file_line':
+                v = cols[k][i]
+                if v != NO_STR:
+                    e[k] = json.loads(strings[v])
+            elif k == 'isSL':
+                v = cols[k][i]
+                if v != NO_BOOL:
+                    e[k] = bool(v)
+            else:
+                v = cols[k][i]
+                if v == v:  # 非 NaN
+                    e[k] = v if k in FLOAT_FIELDS else int(v)
+        out.append(e)
+    return out
+
+
+def read_columnar(path: Path) -> Dict[str, Any]:
+    return ColumnarReader(path).load()
@@ -2,12 +2,26 @@
 # -*- coding: utf-8 -*-
 """
 usage: 
-  python convert2.py <profile_files_or_dir> <bmodel.json> [output.js]
+  python convert2.py <profile_files_or_dir> <bmodel.json> [output.js] [-j N]
   或
-  python convert2.py <profile_file1> <profile_file2> ... <bmodel.json> [output.js]
+  python convert2.py <profile_file1> <profile_file2> ... <bmodel.json> [output.js] [-j N]
+  -j N：超大 profile 文件按块多进程解析（默认 1；0 表示 CPU 核数）
+  profile / bmodel.json 都可以是 .gz / .xz / .zst 压缩版本，边解压边解析；
+  压缩文件不能分块，-j N 时改为多个 core 的文件同时在进程池里解压解析
 """
 
-import sys, re, json, math, pathlib, collections
+import os, sys, re, json, math, pathlib, collections, multiprocessing
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # 可选依赖：汇总统计在有 numpy 时向量化计算
+    np = None
+
+from log_parser import BmodelIndex, get_tensor_info
+from input_files import find_inputs, is_compressed, open_input, strip_compression
+from profile_reader import ColumnSplitter, map_ranges, read_range, use_chunks
 
 # ----------------------------------------------------------
 # 1. 命令行参数解析 (修复版)
@@ -24,11 +38,23 @@ out_js = pathlib.Path('profile_data.js')  # 默认输出文件
 
 # 从后往前识别参数
 args = sys.argv[1:]
+
+# 可选并行度 -j N
+jobs = 1
+if '-j' in args:
+    i = args.index('-j')
+    try:
+        jobs = int(args[i + 1])
+    except (IndexError, ValueError):
+        print("错误: -j 需要一个整数参数")
+        sys.exit(1)
+    del args[i:i + 2]
+    jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
 if args[-1].endswith('.js'):
     out_js = pathlib.Path(args.pop())
 
-# 识别bmodel.json (最后一个非.js参数)
-if args and args[-1].endswith('.json'):
+# 识别bmodel.json (最后一个非.js参数，可为压缩的 .json.gz 等)
+if args and strip_compression(args[-1]).endswith('.json'):
     bmodel_json = pathlib.Path(args.pop())
 else:
     print("错误: 未找到bmodel.json文件")
@@ -56,8 +82,8 @@ def collect_profile_files(paths):
     all_files = []
     for p in paths:
         if p.is_dir():
-            # 收集目录下所有compiler_profile_*文件
-            files = sorted(p.glob('compiler_profile_*'))
+            # 收集目录下所有compiler_profile_*文件（含压缩版本）
+            files = find_inputs(p, 'compiler_profile_*')
             if not files:
                 print(f"⚠️ 警告: 目录中无compiler_profile文件: {p}")
             all_files.extend(files)
@@ -124,72 +150,20 @@ SUMMARY_HEADER= ['CoreId','Parallelism(%)','totalTime(us)','TiuWorkingRatio',
                  'GdmaDdrAvgBandwidth(GB/s)','GdmaL2AvgBandwidth(GB/s)',
                  'GdmaAvgDdrBurstLength','totalSdmaCycle',
                  'SdmaDdrAvgBandwidth(GB/s)','SdmaAvgDdrBurstLength']
-# 这里先写死，有需要可后期统计
-SUMMARY_DATA  = [
-    ['0','128.83%',151877405,'81.33%',154395617,'99.17%',72153345,
-     '24.47',0,'3.20',0,0,0],
-    ['Overall','128.83%','151877.4us','81.33%','123516.49us',
-     '99.17%','72153.35us','24.47',0,'3.20','0.00us',0,'0.00']
-]
+# summary_data 由各 core 实际解析结果统计（见第 5 节），在 profile_data.js 末尾写出
+SUMMARY_NA    = 'N/A'     # profile 中没有的指标：uArch 利用率
+DDR_DIRS      = (0, 1, 2) # GDMA 方向 dr[0] S2L / dr[1] L2S / dr[2] S2S 经过 DDR；dr[3] L2L 不经过
 
 TIU_MHZ = 1000          # 1250 MHz 就写 1250，1000 MHz 就写 1000
+LAYER_ID_SHIFT = -1     # 算子指令 id 取 tiu_dma_id(before) .. (after)-1（见 BmodelIndex.ranges_for_core）
 
 # ----------------------------------------------------------
-# 3. 解析 bmodel.json → 算子索引 (修复版)
+# 3. 解析 bmodel.json → 算子索引（复用 log_parser.BmodelIndex，只解析一次）
 # ----------------------------------------------------------
-# OpNode = collections.namedtuple(
-#     'OpNode',
-#     'file_line core_id name bd_start bd_count gdma_start gdma_count '
-#     'operands results is_local')
-
-# def build_info(op):
-#     """按目标格式拼 HTML 片段"""
-#     def fmt_tensor(t):
-#         shape = 'x'.join(str(s) for s in t['shape'])
-#         dtype = t['type'].split('<')[-1].split(',')[0]   # 简单粗暴取 dtype
-#         return f"tensor_id=-1 [{shape}] {dtype}"          # tensor_id 暂无，统一 -1
-
-#     ins = '<br>==ins==<br>' + '<br>'.join(fmt_tensor(t) for t in op.operands) if op.operands else ''
-#     outs = '<br>==outs==<br>' + '<br>'.join(fmt_tensor(t) for t in op.results) if op.results else ''
-#     local = 'local_layer' if op.is_local else 'global_layer'
-#     return f"<br>{local}{ins}{outs}<br>========<br>feature_size=0<br>weight_size=0<br>total_size=0"
-
-class OpNode(collections.namedtuple(
-    'OpNode',
-    'file_line core_id name bd_start bd_count gdma_start gdma_count '
-    'operands results is_local')):
-    
-    def get(self, attr, default=None):
-        """安全获取属性值"""
-        return getattr(self, attr, default)
-    
-    def get_tensor_info(self, tensor):
-        """提取张量的形状和数据类型"""
-        # 从shape字段提取形状信息（整数列表）
-        shape = tensor.get("shape", [])
-        shape_str = "x".join(str(dim) for dim in shape) if shape else ""
-        
-        # 从memory_type字段提取数据类型
-        dtype = "UNKNOWN"
-        memory_type = tensor.get("memory_type", "").lower()
-        
-        # 从memory_type中提取基础数据类型
-        if "f32" in memory_type: dtype = "FP32"
-        elif "f16" in memory_type: dtype = "FP16"
-        elif "si8" in memory_type: dtype = "INT8"
-        elif "ui8" in memory_type: dtype = "UINT8"
-        elif "i16" in memory_type: dtype = "INT16"
-        elif "bf16" in memory_type: dtype = "BF16"
-        elif "i32" in memory_type: dtype = "INT32"
-        
-        return shape_str, dtype
-
-
-
 def build_info(op):
     """按目标格式拼 HTML 片段"""
     def fmt_tensor(t):
-        shape, dtype = op.get_tensor_info(t)
+        shape, dtype = get_tensor_info(t)
         return f"tensor_id=-1 [{shape}] {dtype}"
     
     ins = '<br>==ins==<br>' + '<br>'.join(fmt_tensor(t) for t in op.operands) if op.operands else ''
@@ -199,89 +173,12 @@ def build_info(op):
 
 
 
-def parse_bmodel(path):
-    """安全解析bmodel.json文件，处理格式错误"""
-    ops = []
-    
-    # 1. 检查文件是否存在
-    if not path.exists():
-        print(f"❌ 错误: bmodel.json文件不存在: {path}")
-        return ops
-        
-    # 2. 检查文件大小
-    file_size = path.stat().st_size
-    if file_size == 0:
-        print(f"❌ 错误: bmodel.json文件为空")
-        return ops
-    
-    # 3. 读取并修复JSON内容
-    try:
-        content = path.read_text(encoding='utf-8-sig').strip()  # 处理BOM头
-        
-        # 修复常见JSON格式错误
-        if content.startswith('[') and content.endswith(',]'):
-            content = content[:-2] + ']'  # 修复尾随逗号
-        elif not content.startswith('[') or not content.endswith(']'):
-            print(f"⚠️ 警告: JSON格式异常，尝试修复")
-            content = '[' + content + ']'
-            
-        data = json.loads(content)
-    except json.JSONDecodeError as e:
-        print(f"❌ JSON解析失败: {e}")
-        print(f"错误位置: {e.pos}, 行 {e.lineno}, 列 {e.colno}")
-        print(f"错误上下文: {content[max(0, e.pos-50):e.pos+50]}")
-        return ops
-    except Exception as e:
-        print(f"❌ 文件读取失败: {type(e).__name__}: {e}")
-        return ops
-        
-    # 4. 安全解析算子
-    for node in data:
-        try:
-            # 验证必需字段
-            if not isinstance(node, dict) or not node.get('opcode', '').startswith('tpu.'):
-                continue
-                
-            # 安全获取字段值
-            fl = node.get('file-line', 'N/A')
-            core = node.get('core_id', -1)
-            
-            # 解析算子名称
-            opcode = node['opcode']
-            name = opcode.split('.')[-1] if '.' in opcode else opcode
-            
-            # 安全处理ID列表
-            before = node.get('tiu_dma_id(before)', [0, 0])
-            after = node.get('tiu_dma_id(after)', [0, 0])
-            
-            # 确保列表长度
-            if len(before) < 2: before = [0, 0]
-            if len(after) < 2: after = [0, 0]
-            
-            bd_start = before[0]
-            gdma_start = before[1]
-            bd_count = after[0] - before[0]
-            gdma_count = after[1] - before[1]
-            
-            #ops.append(OpNode(fl, core, name, bd_start, bd_count, gdma_start, gdma_count))
-            ops.append(OpNode(
-                fl, core, name,
-                bd_start, bd_count, gdma_start, gdma_count,
-                node.get('operands', []), node.get('results', []),
-                node.get('is_local', False)))
-            
-        except Exception as e:
-            print(f"⚠️ 算子解析错误: {e}")
-            print(f"问题节点: {node.get('file-line', '未知')}")
-            continue
-
-    #print(f'ops: {ops}')
-            
-    return ops
+if not bmodel_json.exists() or bmodel_json.stat().st_size == 0:
+    print(f"❌ 错误: bmodel.json文件不存在或为空: {bmodel_json}")
 
 print(f'[info] 解析 bmodel: {bmodel_json}')
-bmodel_ops = parse_bmodel(bmodel_json)   # 全部算子
-print(f'[info] bmodel 共 {len(bmodel_ops)} 个算子')
+bmodel_index = BmodelIndex.load(bmodel_json, verbose=True)   # 全部算子，按 core 索引
+print(f'[info] bmodel 共 {len(bmodel_index.ops)} 个算子')
 
 # ----------------------------------------------------------
 # 4. 解析单个 compiler_profile_<n> 文件 (增强版)
@@ -293,58 +190,60 @@ import re
 import re
 from pathlib import Path
 
-# 定义分割日志行的正则表达式（用于分割BD和GDMA指令）
-SPLIT_RE = re.compile(r'\s{2,}')  # 匹配两个或更多连续空格
+# profile 按 bytes 逐行解析，不整体解码：数字字段直接由 bytes 转换，只有写进输出的名字解码
+# BD / GDMA 两列按 ENGINE_ 表头 / 数据行学到的列位置切分（见 profile_reader.ColumnSplitter）
 
 # 定义指令解析的正则表达式
 INST_RE = re.compile(
-    r'(?P<name>[\w_]+)\|(?P<ty>[\w_]+)\|'
-    r's:(?P<s>\d+)\|b:(?P<b>\d+)\|g:(?P<g>\d+)\|'  # 基本字段
-    r'(?:h:\d+\|sd:\d+\|)?'  # 使 h/sd 可选
-    r'e:(?P<e>-?\d+)\|t:(?P<t>\d+)'  # 结束时间
-    r'(?:\|dr:(?P<dr>\d+))?'  # 可选方向
-    r'(?:\|sz:(?P<sz>\d+))?'  # 可选数据大小
-    r'(?:\|bw:(?P<bw>[\d\.]+))?'  # 可选带宽
+    rb'(?P<name>[\w_]+)\|(?P<ty>[\w_]+)\|'
+    rb's:(?P<s>\d+)\|b:(?P<b>\d+)\|g:(?P<g>\d+)\|'  # 基本字段
+    rb'(?:h:\d+\|sd:\d+\|)?'  # 使 h/sd 可选
+    rb'e:(?P<e>-?\d+)\|t:(?P<t>\d+)'  # 结束时间
+    rb'(?:\|dr:(?P<dr>\d+))?'  # 可选方向
+    rb'(?:\|sz:(?P<sz>\d+))?'  # 可选数据大小
+    rb'(?:\|bw:(?P<bw>[\d\.]+))?'  # 可选带宽
 )
 
-def parse_single_profile(path: Path):
-    bd_rows, gdma_rows = [], []
-    if not path.exists() or path.stat().st_size == 0:
-        return bd_rows, gdma_rows, 0, 0.0
+# 本文件是无入口保护的脚本，分块解析的子进程只能 fork（spawn 会把整个脚本重跑一遍）
+FORK_CTX = (multiprocessing.get_context('fork')
+            if 'fork' in multiprocessing.get_all_start_methods() else None)
+
+
+# 汇总统计用的原始 cycle 列（与 bd_rows / gdma_rows 一一对应）
+Cycles = collections.namedtuple('Cycles', 'bd_start bd_end gdma_start gdma_end gdma_dr gdma_sz')
 
+def new_cycles():
+    return Cycles(*(array('q') for _ in Cycles._fields))
+
+
+def scan_profile_lines(lines):
+    """
+    逐行解析一段 profile（bytes 行），返回 (bd_rows, gdma_rows, gdma_bw, max_bw, cycles)
+    GDMA 行先只记下带宽（gdma_bw 与 gdma_rows 一一对应），高度留到全文件读完后再归一化
+    """
+    bd_rows, gdma_rows = [], []
     TIU_MHZ = 1000
-    max_bw = 1  # 默认最大值（避免除以0）
+    max_bw = None           # 所有 GDMA 单元格带宽的最大值
+    gdma_bw = array('d')
+    cyc = new_cycles()
+    cols = ColumnSplitter()
 
-    # 第一遍：收集所有GDMA的bw值，计算全局最大值
-    gdma_bandwidth = []
-    for raw in path.read_text().splitlines():
+    for raw in lines:
         line = raw.rstrip()
-        if not line or line.startswith('-') or 'ENGINE_' in line:
+        if not line or line.startswith(b'-'):
             continue
-        
-        # 使用SPLIT_RE分割行
-        parts = SPLIT_RE.split(line, maxsplit=1)
-        right = parts[1] if len(parts) > 1 else None
-        
-        # 检查右侧GDMA指令
-        if right:
-            m = INST_RE.search(right)
-            if m and m.group('bw'):
-                gdma_bandwidth.append(float(m.group('bw')))
-    
-    if gdma_bandwidth:
-        max_bw = max(gdma_bandwidth)  # 获取全局最大sz值
-
-    # 第二遍：实际解析
-    for raw in path.read_text().splitlines():
-        line = raw.rstrip()
-        if not line or line.startswith('-') or 'ENGINE_' in line:
+        if b'ENGINE_' in line:
+            cols.learn_header(line)
             continue
-        
-        # 使用SPLIT_RE分割行
-        parts = SPLIT_RE.split(line, maxsplit=1)
-        left = parts[0] if len(parts) > 0 else None
-        right = parts[1] if len(parts) > 1 else None
+
+        # 按列位置切出左（BD）右（GDMA）两列
+        left, right = cols.split(line)
+
+        # 右侧带宽先计入最大值（即使该行随后被跳过也计入）
+        m_right = INST_RE.search(right) if right else None
+        if m_right and m_right.group('bw'):
+            bw = float(m_right.group('bw'))
+            max_bw = bw if max_bw is None else max(max_bw, bw)
 
         # 解析左侧 BD 指令
         if left:
@@ -354,73 +253,220 @@ def parse_single_profile(path: Path):
                 s, e = int(d['s']), int(d['e'])
                 if e < 0:  # 跳过无效结束时间
                     continue
-                
+
                 begin_us = s / TIU_MHZ
                 end_us = e / TIU_MHZ
-                
-                # BD 指令使用固定小高度 
+
+                # BD 指令使用固定小高度
                 height = -1
-                
+
                 bd_rows.append([
                     0,  # category
                     round(begin_us, 3),
                     round(end_us, 3),
-                    f"bd_id={d['b']}",
+                    f"bd_id={d['b'].decode()}",
                     height,
                     -1,  # layer_id
-                    f"{d['name']}(G)",  # layer_type
+                    f"{d['name'].decode()}(G)",  # layer_type
                     0,  # subnet_id
                     "TPU(static)",  # subnet_type
                     "Iter[0]",  # iteration
                     "BD"  # info
                 ])
+                cyc.bd_start.append(s)
+                cyc.bd_end.append(e)
 
         # 解析右侧 GDMA 指令
-        if right:
-            m = INST_RE.search(right)
-            if m:
-                d = m.groupdict()
-                s, e = int(d['s']), int(d['e'])
-                if e < 0:  # 跳过无效结束时间
-                    continue
-                    
-                begin_us = s / TIU_MHZ
-                end_us = e / TIU_MHZ
-                dr = int(d['dr']) if d['dr'] else -1
-                sz = int(d['sz']) if d['sz'] else 0
-                bw = float(d['bw']) if d['bw'] else 0.0
-                
-                # GDMA 指令高度基于数据大小 (sz)
-                # 归一化到 0-1 范围，最大高度为1
-                height = min(1.0, bw / max_bw) if max_bw > 0 else 0.5
-                
-                direction = 0 if dr == 0 else 1
-                mem_ty = "GDMA_TENSOR" if "TENSOR" in d['ty'].upper() else "GDMA_MATRIX"
-                info = (f"{mem_ty}<br>direction={direction}<br>bytes={sz}"
-                        f"<br>speed={bw:.2f}GB/s")
-                
-                gdma_rows.append([
-                    1,  # category
-                    round(begin_us, 3),
-                    round(end_us, 3),
-                    f"gdma_id={d['g']}",
-                    round(height, 4),  # 修改后的高度
-                    -1,  # layer_id
-                    f"{d['name']}(G)",  # layer_type
-                    0,  # subnet_id
-                    "TPU(static)",  # subnet_type
-                    "Iter[0]",  # iteration
-                    info  # info
-                ])
+        if m_right:
+            d = m_right.groupdict()
+            s, e = int(d['s']), int(d['e'])
+            if e < 0:  # 跳过无效结束时间
+                continue
+
+            begin_us = s / TIU_MHZ
+            end_us = e / TIU_MHZ
+            dr = int(d['dr']) if d['dr'] else -1
+            sz = int(d['sz']) if d['sz'] else 0
+            bw = float(d['bw']) if d['bw'] else 0.0
+
+            direction = 0 if dr == 0 else 1
+            mem_ty = "GDMA_TENSOR" if b"TENSOR" in d['ty'].upper() else "GDMA_MATRIX"
+            info = (f"{mem_ty}<br>direction={direction}<br>bytes={sz}"
+                    f"<br>speed={bw:.2f}GB/s")
+
+            gdma_rows.append([
+                1,  # category
+                round(begin_us, 3),
+                round(end_us, 3),
+                f"gdma_id={d['g'].decode()}",
+                None,  # 高度，读完全文件后归一化
+                -1,  # layer_id
+                f"{d['name'].decode()}(G)",  # layer_type
+                0,  # subnet_id
+                "TPU(static)",  # subnet_type
+                "Iter[0]",  # iteration
+                info  # info
+            ])
+            gdma_bw.append(bw)
+            cyc.gdma_start.append(s)
+            cyc.gdma_end.append(e)
+            cyc.gdma_dr.append(dr)
+            cyc.gdma_sz.append(sz)
+
+    return bd_rows, gdma_rows, gdma_bw, max_bw, cyc
+
+
+def parse_profile_range(path, lo, hi):
+    """分块解析 worker：只读文件的 [lo, hi) 字节区间"""
+    return scan_profile_lines(read_range(path, lo, hi).splitlines())
+
 
-    # 计算API结束时间和DDR带宽
+def parse_single_profile(path: Path, jobs: int = 1):
+    """
+    单遍流式解析：逐行读一次，读完后再按全局最大带宽统一归一化 GDMA 高度
+    jobs > 1 且文件足够大时按换行对齐的块多进程解析，再按块顺序拼接
+    """
+    if not path.exists() or path.stat().st_size == 0:
+        return [], [], 0, new_cycles()
+
+    if FORK_CTX is not None and use_chunks(path, jobs):
+        parts = map_ranges(path, parse_profile_range, jobs, mp_context=FORK_CTX)
+    else:
+        with open_input(path) as f:
+            parts = [scan_profile_lines(f)]
+    bd_rows, gdma_rows, gdma_bw, max_bw, cyc = parts[0]
+    for bd, gdma, bws, mx, c in parts[1:]:
+        bd_rows.extend(bd)
+        gdma_rows.extend(gdma)
+        gdma_bw.extend(bws)
+        for col, more in zip(cyc, c):
+            col.extend(more)
+        if mx is not None:
+            max_bw = mx if max_bw is None else max(max_bw, mx)
+
+    # GDMA 指令高度基于带宽，归一化到 0-1 范围，最大高度为1
+    if max_bw is None:
+        max_bw = 1  # 默认最大值（避免除以0）
+    for row, bw in zip(gdma_rows, gdma_bw):
+        height = min(1.0, bw / max_bw) if max_bw > 0 else 0.5
+        row[4] = round(height, 4)
+
+    # 计算API结束时间（DDR 带宽等汇总量在整个 core 读完后由 core_stats 统一计算）
     api_end = max((row[2] for row in bd_rows + gdma_rows), default=0)
-    ddr_bw = 0.0  # 实际应用中可能需要计算
-    
-    return bd_rows, gdma_rows, api_end, ddr_bw
 
+    return bd_rows, gdma_rows, api_end, cyc
+
+
+# ----------------------------------------------------------
+# 5. 汇总表统计（区间并集，按 core 聚合，整体线性）
+# ----------------------------------------------------------
+def interval_union(starts, ends):
+    """[start, end) 区间并集的总长度；starts 已升序时（profile 的常态）为线性"""
+    n = len(starts)
+    if n == 0:
+        return 0
+    if np is not None:
+        s = np.frombuffer(starts, dtype=np.int64)
+        e = np.frombuffer(ends, dtype=np.int64)
+        if (s[1:] < s[:-1]).any():
+            order = np.argsort(s, kind='stable')
+            s, e = s[order], e[order]
+        reach = np.maximum.accumulate(e)
+        first = np.flatnonzero(np.r_[True, s[1:] > reach[:-1]])   # 每段并集的第一条
+        last = np.r_[first[1:] - 1, n - 1]
+        return int(np.clip(reach[last] - s[first], 0, None).sum())
+    pairs = zip(starts, ends)
+    if any(a > b for a, b in zip(starts, starts[1:])):
+        pairs = sorted(pairs, key=lambda p: p[0])
+    total, seg_s, seg_e = 0, None, None
+    for a, b in pairs:
+        if seg_e is None or a > seg_e:
+            if seg_e is not None:
+                total += max(seg_e - seg_s, 0)
+            seg_s, seg_e = a, b
+        elif b > seg_e:
+            seg_e = b
+    return total + max(seg_e - seg_s, 0)
+
+
+def core_stats(cyc):
+    """
+    单个 core 的汇总量（cycle）：
+      total = 所有指令的最早开始到最晚结束；tiu / gdma = 各自区间并集（忙碌时间）
+      ddr_bw = 经过 DDR 的 GDMA 总字节数 / 这些指令的忙碌时间（GB/s）
+      ddr_count = 经过 DDR 的 GDMA 指令条数（平均突发长度 = ddr_bytes / ddr_count）
+    numpy 可用时用一个 DDR 方向的布尔掩码同时筛出字节数和起止时间
+    """
+    starts = [min(c) for c in (cyc.bd_start, cyc.gdma_start) if c]
+    ends = [max(c) for c in (cyc.bd_end, cyc.gdma_end) if c]
+    total = max(max(ends) - min(starts), 0) if starts else 0
+    if np is not None and cyc.gdma_dr:
+        ddr = np.isin(np.frombuffer(cyc.gdma_dr, dtype=np.int64), DDR_DIRS)
+        ddr_count = int(np.count_nonzero(ddr))
+        ddr_bytes = int(np.frombuffer(cyc.gdma_sz, dtype=np.int64)[ddr].sum())
+        ddr_cycle = interval_union(np.frombuffer(cyc.gdma_start, dtype=np.int64)[ddr],
+                                   np.frombuffer(cyc.gdma_end, dtype=np.int64)[ddr])
+    else:
+        ddr = [i for i, dr in enumerate(cyc.gdma_dr) if dr in DDR_DIRS]
+        ddr_count = len(ddr)
+        ddr_bytes = sum(cyc.gdma_sz[i] for i in ddr)
+        ddr_cycle = interval_union(array('q', (cyc.gdma_start[i] for i in ddr)),
+                                   array('q', (cyc.gdma_end[i] for i in ddr)))
+    return {
+        'total': total,
+        'tiu': interval_union(cyc.bd_start, cyc.bd_end),
+        'gdma': interval_union(cyc.gdma_start, cyc.gdma_end),
+        'ddr_bytes': ddr_bytes,
+        'ddr_cycle': ddr_cycle,
+        'ddr_count': ddr_count,
+        'ddr_bw': _gbps(ddr_bytes, ddr_cycle),
+    }
+
+
+def _gbps(nbytes, cycles):
+    # 字节 / cycle × MHz / 1000 = GB/s
+    return nbytes / cycles * TIU_MHZ / 1000 if cycles else 0.0
+
+
+def _burst(nbytes, count):
+    # 平均每条经过 DDR 的 GDMA 指令搬运的字节数
+    return f'{nbytes / count:.2f}' if count else '0.00'
+
+
+def _pct(a, b):
+    return f'{a / b * 100:.2f}%' if b else '0.00%'
+
+
+def _us(cycles):
+    return f'{cycles / TIU_MHZ:.2f}us'
+
+
+def summary_rows(stats):
+    """stats: [(core_id, core_stats)] → 按 SUMMARY_HEADER 排列的各 core 行，末尾追加 Overall 行"""
+    rows = []
+    for core_id, st in stats:
+        rows.append([
+            str(core_id), _pct(st['tiu'] + st['gdma'], st['total']), st['total'],
+            _pct(st['tiu'], st['total']), st['tiu'], SUMMARY_NA, st['gdma'],
+            f"{st['ddr_bw']:.2f}", 0, _burst(st['ddr_bytes'], st['ddr_count']), 0, 0, 0,
+        ])
+    if stats:
+        # 各 core 并行执行：总时间取最长的 core，比例和带宽按各 core 加总计算
+        tot = {k: sum(st[k] for _, st in stats)
+               for k in ('total', 'tiu', 'gdma', 'ddr_bytes', 'ddr_cycle', 'ddr_count')}
+        wall = max(st['total'] for _, st in stats)
+        rows.append([
+            'Overall', _pct(tot['tiu'] + tot['gdma'], tot['total']), _us(wall),
+            _pct(tot['tiu'], tot['total']), _us(tot['tiu']), SUMMARY_NA, _us(tot['gdma']),
+            f"{_gbps(tot['ddr_bytes'], tot['ddr_cycle']):.2f}", 0,
+            _burst(tot['ddr_bytes'], tot['ddr_count']), '0.00us', 0, '0.00',
+        ])
+    return rows
 
 
+# ----------------------------------------------------------
+# 6. 逐 core 解析 + 关联 layer
+# ----------------------------------------------------------
 class CoreData:
     def __init__(self, core_id):
         self.core_id = core_id
@@ -428,11 +474,11 @@ class CoreData:
         self.lmem_record = []      # 给 window.lmem_op_record<n>
         self.api_cycle = 0
         self.ddr_bw_usage = 0
+        self.cycles = new_cycles()    # 各文件的原始 cycle 列，供汇总表统计
 
-cores = {}   # core_id -> CoreData
 
-for prof_path in profile_files:
-    # 从文件名提取核心ID (更健壮的匹配)
+def core_id_of(prof_path):
+    """从文件名提取核心ID (更健壮的匹配)"""
     try:
         # 支持多种文件名格式:
         #   compiler_profile_0
@@ -441,131 +487,125 @@ for prof_path in profile_files:
         match = re.search(r'(\d+)(?:\..+)?$', prof_path.stem)
         if not match:
             print(f"⚠️ 无法从文件名提取core_id: {prof_path.name}, 使用默认值0")
-            core_id = 0
-        else:
-            core_id = int(match.group(1))
+            return 0
+        return int(match.group(1))
     except Exception as e:
         print(f"⚠️ 文件名解析错误: {prof_path.name}, 错误: {e}, 使用默认值0")
-        core_id = 0
-    
-    print(f'[info] 处理 {prof_path.name} (core {core_id})')
-    
-    # try:
-    #     bd_list, gdma_list, api_end, ddr_bw = parse_single_profile(prof_path)
-    #     core = cores.setdefault(core_id, CoreData(core_id))
-    #     core.api_cycle = api_end
-    #     core.ddr_bw_usage = ddr_bw
-
-    #     #print(f"bd_list:{bd_list}")
-
-    #     # bd_map = {e[0] for e in bd_list}
-    #     # gdma_map = {e[0] for e in gdma_list}
-
-    #     # 1. 先扔指令级数据
-    #     core.time_data.extend(bd_list)      # category=0/1
-    #     core.time_data.extend(gdma_list)
-
-    #     # 2. 再追加 Layer 级数据（category=2）
-    #     for op in filter(lambda o: o.core_id == core_id, bmodel_ops):
-    #         bd_entries = [bd_map[i] for i in range(op.bd_start, op.bd_start + op.bd_count) if i in bd_map]
-    #         gdma_entries = [gdma_map[i] for i in range(op.gdma_start, op.gdma_start + op.gdma_count) if i in gdma_map]
-    #         all_e = bd_entries + gdma_entries
-    #         if not all_e:
-    #             continue
-    #         begin_us = min(e.start_t for e in all_e) / TIU_MHZ
-    #         end_us   = max(e.end_t   for e in all_e) / TIU_MHZ
-    #         dur_us   = end_us - begin_us
-    #         func_type = f"{op.name}(L)"
-    #         layer_row = [
-    #             2, round(begin_us,3), round(end_us,3),
-    #             func_type, 1, op.file_line, func_type,
-    #             0, "TPU(static)", "Iter[0]", build_info(op)
-    #         ]
-    #         core.time_data.append(layer_row)
+        return 0
 
-    try:
-        bd_list, gdma_list, api_end, ddr_bw = parse_single_profile(prof_path)
-        core = cores.setdefault(core_id, CoreData(core_id))
-        core.api_cycle = api_end
-        core.ddr_bw_usage = ddr_bw
-
-        # 1. 添加指令级数据
-        core.time_data.extend(bd_list)      # category=0/1
-        core.time_data.extend(gdma_list)
-
-        # 2. 创建指令ID到时间记录的字典映射
-        # 注意: bd_list/gdma_list中的第3项是"bd_id=X"或"gdma_id=X"
-        bd_dict = {}
-        for entry in bd_list:
-            # 提取 "bd_id=100" 中的 100
-            bd_id = entry[3].split('=')[1]
-            bd_dict[bd_id] = entry  # 存储完整记录
-        
-        gdma_dict = {}
-        for entry in gdma_list:
-            # 提取 "gdma_id=50" 中的 50
-            gdma_id = entry[3].split('=')[1]
-            gdma_dict[gdma_id] = entry  # 存储完整记录
-
-        # 3. 处理当前核心的算子
-        for op in filter(lambda o: o.core_id == core_id, bmodel_ops):
-            all_entries = []  # 存储所有相关指令的记录
-            
-            # 收集BD指令
-            for bd_id in range(op.bd_start, op.bd_start + op.bd_count):
-                bd_str = str(bd_id)
-                if bd_str in bd_dict:
-                    all_entries.append(bd_dict[bd_str])
-            
-            # 收集GDMA指令
-            for gdma_id in range(op.gdma_start, op.gdma_start + op.gdma_count):
-                gdma_str = str(gdma_id)
-                if gdma_str in gdma_dict:
-                    all_entries.append(gdma_dict[gdma_str])
-            
-            # 如果没有找到任何指令记录，跳过该算子
-            if not all_entries:
-                continue
-            
-            # 计算时间范围 (所有指令的最小开始和最大结束时间)
-            # 注意: 时间在parse_single_profile中已转换为微秒
-            begin_us = min(entry[1] for entry in all_entries)
-            end_us = max(entry[2] for entry in all_entries)
-            
-            # 构建Layer记录
-            func_type = f"{op.name}(L)"
-            layer_row = [
-                2,  # category=2 (TPU_LAYER)
-                round(begin_us, 3), 
-                round(end_us, 3),
-                func_type, 
-                1,  # 固定高度
-                op.file_line,  # layer_id
-                func_type,     # layer_type
-                0,  # subnet_id
-                "TPU(static)",  # subnet_type
-                "Iter[0]",      # iteration
-                build_info(op)  # HTML信息
-            ]
-            core.time_data.append(layer_row)
 
-        # 4. 按时间排序
+def load_core(core_id, paths, prefetched=None):
+    """
+    解析同一 core 的全部 profile 文件并关联 layer；都失败时返回 None
+    prefetched 里已提交到进程池的文件（{path: future}）直接取结果
+    """
+    core = None
+    for prof_path in paths:
+        print(f'[info] 处理 {prof_path.name} (core {core_id})')
+        try:
+            fut = prefetched.pop(prof_path, None) if prefetched else None
+            parsed = fut.result() if fut else parse_single_profile(prof_path, jobs)
+            bd_list, gdma_list, api_end, cyc = parsed
+            core = core or CoreData(core_id)
+            core.api_cycle = api_end
+            for col, more in zip(core.cycles, cyc):
+                col.extend(more)
+
+            # 1. 添加指令级数据
+            core.time_data.extend(bd_list)      # category=0/1
+            core.time_data.extend(gdma_list)
+
+            # 2. 创建指令ID到时间记录的字典映射
+            # 注意: bd_list/gdma_list中的第3项是"bd_id=X"或"gdma_id=X"
+            bd_dict = {}
+            for entry in bd_list:
+                # 提取 "bd_id=100" 中的 100
+                bd_id = int(entry[3].split('=')[1])
+                bd_dict[bd_id] = entry  # 存储完整记录
+
+            gdma_dict = {}
+            for entry in gdma_list:
+                # 提取 "gdma_id=50" 中的 50
+                gdma_id = int(entry[3].split('=')[1])
+                gdma_dict[gdma_id] = entry  # 存储完整记录
+
+            # 3. 处理当前核心的算子（区间已在索引中预先算好）
+            #    convert 的算子指令 id 为 tiu_dma_id(before) .. (after)-1，比 log_parser 的约定早一条
+            core_ops = bmodel_index.ops_for_core(core_id)
+            ranges = bmodel_index.ranges_for_core(core_id, LAYER_ID_SHIFT)
+            for op, (bd_lo, bd_hi, g_lo, g_hi) in zip(core_ops, ranges):
+                all_entries = []  # 存储所有相关指令的记录
+
+                # 收集BD指令
+                for bd_id in range(bd_lo, bd_hi):
+                    if bd_id in bd_dict:
+                        all_entries.append(bd_dict[bd_id])
+
+                # 收集GDMA指令
+                for gdma_id in range(g_lo, g_hi):
+                    if gdma_id in gdma_dict:
+                        all_entries.append(gdma_dict[gdma_id])
+
+                # 如果没有找到任何指令记录，跳过该算子
+                if not all_entries:
+                    continue
+
+                # 计算时间范围 (所有指令的最小开始和最大结束时间)
+                # 注意: 时间在parse_single_profile中已转换为微秒
+                begin_us = min(entry[1] for entry in all_entries)
+                end_us = max(entry[2] for entry in all_entries)
+
+                # 构建Layer记录
+                func_type = f"{op.name}(L)"
+                layer_row = [
+                    2,  # category=2 (TPU_LAYER)
+                    round(begin_us, 3),
+                    round(end_us, 3),
+                    func_type,
+                    1,  # 固定高度
+                    op.file_line,  # layer_id
+                    func_type,     # layer_type
+                    0,  # subnet_id
+                    "TPU(static)",  # subnet_type
+                    "Iter[0]",      # iteration
+                    build_info(op)  # HTML信息
+                ]
+                core.time_data.append(layer_row)
+        except Exception as e:
+            print(f"❌ 处理 {prof_path.name} 失败: {type(e).__name__}: {e}")
+            continue
+
+    # 4. 按时间排序（多个文件属于同一 core 时合并后统一排序）
+    if core:
         core.time_data.sort(key=lambda r: r[1])
+    return core
 
-        # 3. 按时间排序（可选，前端也能排）
-        # core.time_data.sort(key=lambda r: r[1])
-    except Exception as e:
-        print(f"❌ 处理 {prof_path.name} 失败: {type(e).__name__}: {e}")
-        continue
 
-print(f'[info] 共处理 {len(cores)} 个 core')
+# 同一 core 的多个文件合并处理，core 按首次出现的顺序输出
+core_files = {}   # core_id -> [profile 文件]
+for prof_path in profile_files:
+    core_files.setdefault(core_id_of(prof_path), []).append(prof_path)
 
-# print(f'core{core.time_data}')
+# 压缩的 profile 不能分块并行：-j > 1 时把后面 jobs 个 core 的压缩文件提前交给进程池解压解析
+prefetch_pool = None
+if jobs > 1 and FORK_CTX is not None and any(is_compressed(p) for p in profile_files):
+    prefetch_pool = ProcessPoolExecutor(max_workers=jobs, mp_context=FORK_CTX)
 
 # ----------------------------------------------------------
-# 6. 写出 profile_data.js (增强兼容性)
+# 7. 写出 profile_data.js（逐 core 解析、写出后即释放，内存只保留当前 core）
 # ----------------------------------------------------------
+def write_js_array(f, name, rows):
+    """逐行写出 JS 数组，与 json.dumps(rows) 逐字节一致，但不拼出整个大字符串"""
+    f.write(f'{name} = [')
+    for i, row in enumerate(rows):
+        if i:
+            f.write(', ')
+        f.write(json.dumps(row))
+    f.write('];\n')
+
+
 try:
+    n_cores = 0
     with out_js.open('w', encoding='utf-8') as f:
         f.write('var np = {float64: v=>parseFloat(v), int64: v=>parseInt(v,10)};\n')
         f.write(f'let page_caption = {json.dumps(PAGE_CAP)};\n')
@@ -573,7 +613,6 @@ try:
         f.write(f'let configs = {json.dumps(CONFIGS)};\n')
         f.write(f'let summary_caption = {json.dumps(SUMMARY_CAP)};\n')
         f.write(f'let summary_header = {json.dumps(SUMMARY_HEADER)};\n')
-        f.write(f'let summary_data = {json.dumps(SUMMARY_DATA)};\n')
         f.write(f'let ddr_bandwidth = {DDR_BW};\n')
         f.write(f'let l2_bandwidth = {L2_BW};\n')
         f.write(f'let dependCmds = {json.dumps(DEPEND_CMDS)};\n')
@@ -582,14 +621,36 @@ try:
         f.write(f'let lmem_partition = {json.dumps(LMEM_PARTITION)};\n')
         f.write(f'let time_header = {json.dumps(TIME_HEADER)};\n')
 
-        for core_id, core in cores.items():
-            f.write(f'window.time_data{core_id} = {json.dumps(core.time_data)};\n')
-            f.write(f'window.lmem_op_record{core_id} = {json.dumps(core.lmem_record)};\n')
+        stats = []   # [(core_id, core_stats)]，每个 core 只留几个数
+        core_items = list(core_files.items())
+        prefetched, ahead = {}, 0   # ahead：下一个待提交的 core 下标
+        for i, (core_id, paths) in enumerate(core_items):
+            while prefetch_pool and ahead < min(i + jobs, len(core_items)):
+                for p in core_items[ahead][1]:
+                    if is_compressed(p):
+                        prefetched[p] = prefetch_pool.submit(parse_single_profile, p)
+                ahead += 1
+            core = load_core(core_id, paths, prefetched)
+            if core is None:
+                continue
+            st = core_stats(core.cycles)   # 每个 core 只统计一次
+            core.ddr_bw_usage = st['ddr_bw']
+            stats.append((core_id, st))
+            write_js_array(f, f'window.time_data{core_id}', core.time_data)
+            write_js_array(f, f'window.lmem_op_record{core_id}', core.lmem_record)
             # lane 暂无
             f.write(f'window.lane_op_record{core_id} = [];\n')
+            n_cores += 1
+            del core
 
+        # 汇总表依赖全部 core 的统计，放在最后写（页面在脚本加载完后才读取）
+        f.write(f'let summary_data = {json.dumps(summary_rows(stats))};\n')
+    if prefetch_pool:
+        prefetch_pool.shutdown()
+
+    print(f'[info] 共处理 {n_cores} 个 core')
     print('[info] 已生成', out_js)
-    
+
 except Exception as e:
     print(f"❌ 写入输出文件失败: {type(e).__name__}: {e}")
     sys.exit(1)
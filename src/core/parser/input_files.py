@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+输入文件查找与打开：透明支持压缩的输入（log_parser.py / convert.py 共用）
+    - compiler_profile_* / LayerGroup 日志 / *.bmodel.json 都可以是 .gz / .xz / .zst 压缩版本
+    - open_input 返回按行可迭代的二进制流，边解压边交给解析器，不落地解压后的文件
+    - find_inputs 同时匹配原文件名和压缩后的文件名；两者并存时用未压缩的
+.gz / .xz 用标准库；.zst 需要 Python 3.14+（compression.zstd）或安装 zstandard
+压缩文件不能按字节区间随机读取，不走 profile_reader 的分块并行；多个文件之间仍按 core 并行解压解析
+"""
+import io
+import gzip
+import lzma
+from pathlib import Path
+from typing import BinaryIO, List
+
+try:
+    from compression import zstd as _zstd       # Python 3.14+
+except ImportError:
+    _zstd = None
+try:
+    import zstandard
+except ImportError:  # 可选依赖：没有 compression.zstd 时用它读 .zst
+    zstandard = None
+
+
+def _open_zst(path: Path) -> BinaryIO:
+    if _zstd is not None:
+        return _zstd.open(path, 'rb')
+    if zstandard is not None:
+        # stream_reader 不支持 readline，套一层 BufferedReader 才能按行迭代
+        return io.BufferedReader(zstandard.open(path, 'rb'))
+    raise ImportError(f'读取 {path.name} 需要 Python 3.14+ 或安装 zstandard')
+
+
+# 读取 / 解压损坏的输入时可能抛出的异常
+INPUT_ERRORS = (OSError, EOFError, lzma.LZMAError,
+                *((_zstd.ZstdError,) if _zstd else ()),
+                *((zstandard.ZstdError,) if zstandard else ()))
+
+COMPRESSORS = {
+    '.gz':  lambda path: gzip.open(path, 'rb'),
+    '.xz':  lambda path: lzma.open(path, 'rb'),
+    '.zst': _open_zst,
+}
+
+
+def is_compressed(path: Path) -> bool:
+    return path.suffix in COMPRESSORS
+
+
+def strip_compression(name: str) -> str:
+    """'compiler_profile_0.gz' → 'compiler_profile_0'"""
+    for suffix in COMPRESSORS:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def open_input(path: Path) -> BinaryIO:
+    """以二进制流打开输入文件，压缩文件边读边解压"""
+    opener = COMPRESSORS.get(path.suffix)
+    return opener(path) if opener else path.open('rb')
+
+
+def read_input(path: Path) -> bytes:
+    with open_input(path) as f:
+        return f.read()
+
+
+def find_inputs(folder: Path, pattern: str) -> List[Path]:
+    """
+    folder 下匹配 pattern 或 pattern + 压缩后缀的文件，按文件名排序
+    同一文件的压缩版与原文件并存时只取原文件
+    """
+    found = set()
+    for pat in [pattern, *(pattern + suffix for suffix in COMPRESSORS)]:
+        found.update(p for p in folder.glob(pat) if p.is_file())
+    chosen = {}
+    for path in sorted(found, key=is_compressed):   # 原文件优先
+        chosen.setdefault(strip_compression(path.name), path)
+    return sorted(chosen.values())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+profile 时间轴的多分辨率汇总金字塔（level of detail），只在 --columnar 时写进 result.lvpk 的 META（profileLod）
+前端接入之前不写进 result.json
+    - 时间按桶切分，桶宽为 2 的幂；第 0 层最细，逐层桶宽翻倍直到只剩 1 个桶
+      最细一层的桶数不超过 LOD_MAX_BUCKETS，也不超过 entries 数 / LOD_MIN_PER_BUCKET（小 profile 不必汇总到很细）
+    - 每个 engine（BD / GDMA / LAYER）每个桶三个量：
+        busy   区间与桶重叠的 cycle 数之和（同一 engine 指令串行时即占用时间）
+        count  start 落在桶内的指令条数
+        bytes  start 落在桶内的指令搬运字节数（size 之和，只有 GDMA 非 0）
+    - 所有 engine 共用同一套桶边界：桶 k 覆盖 [t0 + k*width, t0 + (k+1)*width)
+前端缩小时直接画金字塔里桶宽合适的一层，只对可见窗口加载原始 entries
+
+结构：
+    {'t0': int, 'levels': [{'width': w, 'BD': {'busy': [...], 'count': [...], 'bytes': [...]}, ...}, ...]}
+
+busy 用覆盖计数的积分 F(x) = Σ clip(x - s_i, 0, e_i - s_i) 在桶边界上的差值求得：
+对排好序的 start / end 做前缀和，每个边界二分一次，整体 O(n log n)，与单条指令跨多少个桶无关
+有 numpy 时全程向量化，否则退回等价的纯 Python 实现
+"""
+import bisect
+from array import array
+from itertools import accumulate
+from typing import Any, Dict, List, Optional
+
+from columnar import ENGINES, MISSING, EntryColumns
+
+try:
+    import numpy as np
+except ImportError:  # 可选依赖：有 numpy 时向量化构建
+    np = None
+
+LOD_MAX_BUCKETS    = 2048       # 最细一层的桶数上限
+LOD_MIN_PER_BUCKET = 16         # 最细一层平均每桶至少这么多条 entries，金字塔体积约为 entries 的 1/10
+
+
+def base_width(span: int, max_buckets: int = LOD_MAX_BUCKETS) -> int:
+    """覆盖 span 个 cycle 且桶数不超过 max_buckets 的最小 2 的幂桶宽"""
+    w = 1
+    while -(-span // w) > max_buckets:
+        w <<= 1
+    return w
+
+
+def build_lod(entries: EntryColumns, max_buckets: int = LOD_MAX_BUCKETS) -> Optional[Dict[str, Any]]:
+    """按 engine 构建汇总金字塔；没有 entries 时返回 None"""
+    if not len(entries):
+        return None
+    t0 = min(entries.start)
+    t1 = max(max(entries.end), max(entries.start) + 1)
+    width = base_width(t1 - t0, max(1, min(max_buckets, len(entries) // LOD_MIN_PER_BUCKET)))
+    n_buckets = -(-(t1 - t0) // width)
+    build = _engine_numpy if np is not None else _engine_python
+
+    base = {}
+    for code, engine in enumerate(ENGINES):
+        cols = build(entries, code, t0, width, n_buckets)
+        if cols is not None:
+            base[engine] = cols
+
+    levels = []
+    while True:
+        levels.append({'width': width, **{k: {m: list(v) for m, v in cols.items()}
+                                          for k, cols in base.items()}})
+        if n_buckets <= 1:
+            break
+        base = {k: {m: _halve(v) for m, v in cols.items()} for k, cols in base.items()}
+        width <<= 1
+        n_buckets = -(-n_buckets // 2)
+    return {'t0': t0, 'levels': levels}
+
+
+def _halve(values: List[int]) -> List[int]:
+    """相邻两桶合并（桶宽翻倍），奇数个时最后一桶单独成桶"""
+    return [sum(values[i:i + 2]) for i in range(0, len(values), 2)]
+
+
+# ----------------------------------------------------------
+# 1. numpy 实现
+# ----------------------------------------------------------
+def _engine_numpy(entries: EntryColumns, code: int, t0: int,
+                  width: int, n_buckets: int) -> Optional[Dict[str, List[int]]]:
+    idx = np.flatnonzero(np.frombuffer(entries.engine, dtype=np.uint8) == code)
+    if not len(idx):
+        return None
+    s = np.frombuffer(entries.start, dtype=np.int64)[idx]
+    e = np.maximum(np.frombuffer(entries.end, dtype=np.int64)[idx], s)
+    sz = np.frombuffer(entries.size, dtype=np.int64)[idx]
+    sz = np.where(sz == MISSING, 0, sz)
+
+    bucket = (s - t0) // width
+    count = np.bincount(bucket, minlength=n_buckets)
+    nbytes = np.bincount(bucket, weights=sz, minlength=n_buckets).astype(np.int64)
+
+    # F(x) = Σ_{s_i<x}(x - s_i) - Σ_{e_i<x}(x - e_i)
+    s.sort()
+    e.sort()
+    bounds = t0 + width * np.arange(n_buckets + 1, dtype=np.int64)
+    ps = np.concatenate(([0], np.cumsum(s)))
+    pe = np.concatenate(([0], np.cumsum(e)))
+    cs = np.searchsorted(s, bounds)
+    ce = np.searchsorted(e, bounds)
+    covered = (cs - ce) * bounds - ps[cs] + pe[ce]
+    return {'busy': np.diff(covered).tolist(), 'count': count.tolist(), 'bytes': nbytes.tolist()}
+
+
+# ----------------------------------------------------------
+# 2. 纯 Python 实现（与 numpy 结果逐桶一致）
+# ----------------------------------------------------------
+def _engine_python(entries: EntryColumns, code: int, t0: int,
+                   width: int, n_buckets: int) -> Optional[Dict[str, List[int]]]:
+    rows = [i for i, c in enumerate(entries.engine) if c == code]
+    if not rows:
+        return None
+    start, end, size = entries.start, entries.end, entries.size
+    count = [0] * n_buckets
+    nbytes = [0] * n_buckets
+    s, e = array('q'), array('q')
+    for i in rows:
+        si = start[i]
+        k = (si - t0) // width
+        count[k] += 1
+        if size[i] != MISSING:
+            nbytes[k] += size[i]
+        s.append(si)
+        e.append(max(end[i], si))
+
+    s, e = sorted(s), sorted(e)
+    ps = [0, *accumulate(s)]
+    pe = [0, *accumulate(e)]
+    covered = []
+    for k in range(n_buckets + 1):
+        x = t0 + k * width
+        cs = bisect.bisect_left(s, x)
+        ce = bisect.bisect_left(e, x)
+        covered.append((cs - ce) * x - ps[cs] + pe[ce])
+    busy = [b - a for a, b in zip(covered, covered[1:])]
+    return {'busy': busy, 'count': count, 'bytes': nbytes}
@@ -3,66 +3,160 @@
 """
 单日志文件解析，输出固定格式 json 文件以及 profile 导出表
 usage:
-    python log_parser.py input_dir/  -o output_dir/ 
+    python log_parser.py input_dir/  -o output_dir/ [-j N] [--columnar] [--timings [trace.json]]
+                         [--only lmem,summary,timestep,profile] [--cores 0-7] [--export none|csv|xlsx|parquet]
+                         [--stats-backend python|numpy]
     其中 input_dir/ 包含需可视化的日志文件，如：LayerGroup 日志文件， compiler_profie_(), xxxx.bmodel.json 等
+    这些文件都可以是 .gz / .xz / .zst 压缩版本，边解压边解析（见 input_files.py）
 """
+import io
+import os
 import re
 import json
+import hashlib
 import argparse
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Callable, Tuple, Optional, Iterable, Iterator, Set, Union
 from pathlib import Path
+import bisect
+from array import array
 import collections
+import heapq
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from columnar import ColumnarWriter, EntryColumns, ENGINE_CODE, MISSING
+from input_files import INPUT_ERRORS, find_inputs, open_input, read_input
+from lod import build_lod
+from parse_cache import ParseCache, CACHE_DIRNAME, package_modules
+from profile_reader import ColumnSplitter, map_ranges, read_range, submit_ranges, use_chunks
+from stage_timer import TIMER, TracedExecutor
+from table_export import CoreExporter, check_formats, default_formats, export_core
+
+try:
+    import numpy as np
+except ImportError:  # 可选依赖：仅 MemoryStatistics(backend='numpy') 需要
+    np = None
 
 # ----------------------------------------------------------
-# 1. 日志分段
+# 1. 日志分段（流式：逐行扫描，段一结束就分发给各消费者）
+#    日志按 bytes 读取和切段，不整体解码；只有写进结果的字符串值才解码
 # ----------------------------------------------------------
-def extract_valid_sections(raw_log: str) -> Dict[str, Any]:
-    marker_re = re.compile(
-        r'^-{20,}\s*\n'          # 第1行：20+ 个 -
-        r'.*start time.*$',       # 第2行：包含 start time
-        re.MULTILINE
-    )
-    m = marker_re.search(raw_log)
-    if m:
-        split_pos    = m.start()
-        compute_text = raw_log[:split_pos]
-        profile_text = raw_log[split_pos:]
+ACTION_RE       = re.compile(rb'; action = \w')        # 段起始位置（等价于原 split 的前瞻）
+PROFILE_MARK_RE = re.compile(rb'-{20,}\s*\n')          # profile 分隔线：20+ 个 -
+KV_RE           = re.compile(rb';\s*(\w+)\s*=\s*([^;]+)')
+LOG_KINDS       = frozenset({'lmem', 'timestep', 'chip', 'profile'})
+LOG_MARKERS     = (b'; action = lmem_assign', b'; action = timestep_cycle')  # 主日志的判定标记
+SNIFF_CHUNK     = 4 << 20      # 找主日志时每次读入的字节数
+SNIFF_THREADS   = 8            # 同时扫描的候选日志数
+
+
+def _iter_log_lines(src: Union[str, bytes, Path]) -> Iterator[bytes]:
+    """Path 按行读文件（bytes，压缩文件边解压边读）；str / bytes 视为已加载的日志文本"""
+    if isinstance(src, Path):
+        with open_input(src) as f:
+            yield from f
     else:
-        compute_text = raw_log
-        profile_text = ""
-
-    compute_secs = re.split(r'(?=; action = \w+)', compute_text)
-    lmem_sections = [
-        s for s in compute_secs
-        if '; action = lmem_assign' in s and '; tag = iteration_result' in s
-    ]
-    timestep_sections = []
-    start_idx = next((
-        i for i, s in enumerate(compute_secs)
-        if '; action = timestep_cycle; debug_range = given;' in s
-    ), -1)
-    if start_idx != -1:
-        seen = set()
-        for s in compute_secs[start_idx:]:
-            if (
-                '; action = timestep_cycle;' in s
-                and '; step = timestep_cycle;' in s
-                and '; tag = result;' in s
-                and s not in seen
-            ):
-                seen.add(s)
-                timestep_sections.append(s)
-
-    chip_section = next((
-        s for s in compute_secs
-        if '; action = lmem_assign' in s and '; step = lmem_spec' in s
-    ), None)
+        yield from io.BytesIO(src.encode('utf-8') if isinstance(src, str) else src)
+
+
+def _text(raw: bytes) -> str:
+    """写进结果的字符串值才解码（与原先按 errors='ignore' 读日志一致）"""
+    return raw.decode('utf-8', 'ignore')
+
+
+class _SectionRouter:
+    """判断每个完整段属于 lmem / timestep / chip 中的哪一类；不在 kinds 里的类别直接跳过"""
+    def __init__(self, kinds: Optional[Set[str]] = None):
+        self.kinds = LOG_KINDS if kinds is None else kinds
+        self.chip_found = False
+        self.ts_started = False
+        self.ts_seen = set()     # 已出现的 timestep 段的摘要（定长，不保留段本身）
+
+    def route(self, sec: bytes) -> Iterator[Tuple[str, bytes]]:
+        if b'; action = lmem_assign' in sec:
+            if 'lmem' in self.kinds and b'; tag = iteration_result' in sec:
+                yield 'lmem', sec
+            if not self.chip_found and 'chip' in self.kinds and b'; step = lmem_spec' in sec:
+                self.chip_found = True
+                yield 'chip', sec
+        if 'timestep' not in self.kinds:
+            return
+        # timestep 从第一个 debug_range = given 段开始收集，并去重
+        if not self.ts_started and b'; action = timestep_cycle; debug_range = given;' in sec:
+            self.ts_started = True
+        if (
+            self.ts_started
+            and b'; action = timestep_cycle;' in sec
+            and b'; step = timestep_cycle;' in sec
+            and b'; tag = result;' in sec
+        ):
+            digest = hashlib.blake2b(sec, digest_size=16).digest()
+            if digest not in self.ts_seen:
+                self.ts_seen.add(digest)
+                yield 'timestep', sec
+
+
+def iter_log_sections(lines: Iterable[bytes],
+                      kinds: Optional[Set[str]] = None) -> Iterator[Tuple[str, bytes]]:
+    """
+    逐行扫描 LayerGroup 日志（bytes 行），产出 (kind, bytes)：
+      kind = 'lmem' / 'timestep' / 'chip'：一个完整的 '; action = xxx' 段
+      kind = 'profile'：分隔线（20+ 个 -，其后首个非空行含 start time）之后的全部文本
+    kinds 限定只产出哪几类（默认 LOG_KINDS 全部）；不要 profile 时读到分隔线即停止
+    内存只与单段大小相关，不随日志总大小增长
+    """
+    kinds = LOG_KINDS if kinds is None else kinds
+    router = _SectionRouter(kinds)
+    buf: List[bytes] = []        # 当前段
+    pending: List[bytes] = []    # 疑似 profile 分隔线及其后的空白行，待确认
+    it = iter(lines)
+    for line in it:
+        if pending:
+            if not line.strip():
+                pending.append(line)
+                continue
+            if b'start time' in line:
+                yield from router.route(b''.join(buf))
+                if 'profile' in kinds:
+                    yield 'profile', b''.join(pending) + line + b''.join(it)
+                return
+            buf.extend(pending)
+            pending = []
+        if PROFILE_MARK_RE.fullmatch(line):
+            pending.append(line)
+            continue
+        pos = 0
+        for m in ACTION_RE.finditer(line):
+            buf.append(line[pos:m.start()])
+            yield from router.route(b''.join(buf))
+            buf = []
+            pos = m.start()
+        buf.append(line[pos:])
+    buf.extend(pending)
+    yield from router.route(b''.join(buf))
+
+
+def parse_chip_section(sec: bytes) -> Dict[str, int]:
     chip = {}
-    if chip_section:
-        for m in re.finditer(r';\s*(\w+)\s*=\s*([^;]+)', chip_section):
-            key, val = m.group(1), m.group(2).strip()
-            if key in {'lmem_bytes', 'lmem_banks', 'lmem_bank_bytes'}:
-                chip[key] = int(val)
+    for m in KV_RE.finditer(sec):
+        key = m.group(1).decode('ascii')
+        if key in {'lmem_bytes', 'lmem_banks', 'lmem_bank_bytes'}:
+            chip[key] = int(m.group(2).strip())
+    return chip
+
+
+def extract_valid_sections(raw_log: Union[str, bytes, Path]) -> Dict[str, Any]:
+    """一次性收集各类段（兼容旧接口，段为 bytes）；大日志请直接用 iter_log_sections / parse_log"""
+    lmem_sections, timestep_sections = [], []
+    profile_text, chip = b"", {}
+    for kind, sec in iter_log_sections(_iter_log_lines(raw_log)):
+        if kind == 'lmem':
+            lmem_sections.append(sec)
+        elif kind == 'timestep':
+            timestep_sections.append(sec)
+        elif kind == 'chip':
+            chip = parse_chip_section(sec)
+        elif kind == 'profile':
+            profile_text = sec
 
     return {
         'lmemSections': lmem_sections,
@@ -71,10 +165,58 @@ def extract_valid_sections(raw_log: str) -> Dict[str, Any]:
         'chip': chip or None
     }
 
+
+def sniff_log(path: Path, markers: Tuple[bytes, ...] = LOG_MARKERS,
+              give_up: Callable[[], bool] = lambda: False) -> bool:
+    """
+    分块读 path，读到任一 marker 即返回 True，不读剩下的部分；内存只占一块
+    相邻块之间保留 marker 长度 - 1 字节，跨块的 marker 也能找到；give_up() 为真时提前放弃
+    """
+    keep = max(map(len, markers)) - 1
+    tail = b''
+    try:
+        with open_input(path) as f:
+            while not give_up():
+                chunk = f.read(SNIFF_CHUNK)
+                if not chunk:
+                    return False
+                buf = tail + chunk
+                if any(m in buf for m in markers):
+                    return True
+                tail = buf[-keep:]
+    except ImportError as e:   # 没有读 .zst 的库
+        print(f'[warn] {e}')
+    except INPUT_ERRORS:
+        pass
+    return False
+
+
+def find_main_log(in_dir: Path) -> Optional[Path]:
+    """
+    在 in_dir/*.log（含压缩的 *.log.gz 等）里找 LayerGroup 主日志：按文件名顺序取第一个含 LOG_MARKERS 的
+    各候选在线程池里同时扫描（读文件 / 解压时不占 GIL）；排在已命中文件之后的候选随即放弃
+    """
+    candidates = find_inputs(in_dir, '*.log')
+    if not candidates:
+        return None
+    first = [len(candidates)]   # 已命中的最小下标
+
+    def scan(i: int, path: Path) -> bool:
+        hit = sniff_log(path, give_up=lambda: first[0] < i)
+        if hit:
+            first[0] = min(first[0], i)
+        return hit
+
+    with ThreadPoolExecutor(max_workers=min(len(candidates), SNIFF_THREADS)) as executor:
+        hits = list(executor.map(scan, range(len(candidates)), candidates))
+    return next((path for path, hit in zip(candidates, hits) if hit), None)
+
 FIELDS_WHITELIST_LMEM = {
     'op_name', 'op_type', 'addr', 'size', 'timestep_start', 'timestep_end',
     'lmem_type', 'hold_in_lmem', 'status', 'tag', 'bank_id'
 }
+# 段里用得到的键（bytes → str）；其余键不转换直接跳过
+LMEM_KEYS = {k.encode(): k for k in FIELDS_WHITELIST_LMEM | {'shape_secs', 'allow_bank_conflict'}}
 
 # ----------------------------------------------------------
 # 2. LMEM 解析
@@ -83,39 +225,48 @@ class LmemParser:
     def __init__(self,chip: Dict = None):
         self.max_timestep_global = 0
         self.chip = chip or {}
+        self._groups = []
 
     def get_global_max_timestep(self) -> int:
         return self.max_timestep_global
 
     # ---- 主入口 ----
-    def parse(self, sections: List[str]) -> List[Dict[str, Any]]:
-        raw_groups = self._group_by_settings(sections)
-        return self._process_allocation_groups(raw_groups)
-
-    # ---- 内部 ----
-    def _group_by_settings(self, sections: List[str]):
-        groups = []
-        cur = None
+    def parse(self, sections: Iterable[str]) -> List[Dict[str, Any]]:
         for sec in sections:
-            entry, settings = self._parse_section(sec)
-            if not entry:
-                continue
-            if not cur or not self._is_same_settings(cur['settings'], settings):
-                cur = {'settings': settings, 'allocations': []}
-                groups.append(cur)
-            cur['allocations'].append(entry)
-        return groups
+            self.feed(sec)
+        return self.finish()
+
+    # ---- 流式入口：逐段喂入，最后 finish ----
+    def feed(self, sec: Union[str, bytes]):
+        entry, settings = self._parse_section(sec)
+        if not entry:
+            return
+        cur = self._groups[-1] if self._groups else None
+        if not cur or not self._is_same_settings(cur['settings'], settings):
+            cur = {'settings': settings, 'allocations': []}
+            self._groups.append(cur)
+        cur['allocations'].append(entry)
+
+    def finish(self) -> List[Dict[str, Any]]:
+        groups, self._groups = self._groups, []
+        for g in groups:
+            g['settings'].update(self.chip)  # 合并芯片规格（chip 段可能晚于分配段出现）
+        return self._process_allocation_groups(groups)
 
-    def _parse_section(self, sec: str) -> Tuple[Optional[Dict], Dict]:
+    # ---- 内部 ----
+    def _parse_section(self, sec: Union[str, bytes]) -> Tuple[Optional[Dict], Dict]:
+        if isinstance(sec, str):
+            sec = sec.encode('utf-8')
         entry, settings = {}, {}
-        for m in re.finditer(r';\s*(\w+)\s*=\s*([^;]+)', sec):
-            key, raw = m.group(1), m.group(2).strip()
-            val = self._convert_value(key, raw)
+        for m in KV_RE.finditer(sec):
+            key = LMEM_KEYS.get(m.group(1))
+            if key is None:
+                continue
+            val = self._convert_value(key, m.group(2).strip())
             if key == 'shape_secs' or key == 'allow_bank_conflict':
                 settings[key] = val
             if key in FIELDS_WHITELIST_LMEM:
                 entry[key] = val
-        settings.update(self.chip)  # 合并芯片规格
         valid_entry = self._validate_entry(entry)
         return valid_entry, settings
 
@@ -162,19 +313,20 @@ class LmemParser:
                 json.dumps(a.get('allow_bank_conflict')) ==
                 json.dumps(b.get('allow_bank_conflict')))
 
-    def _convert_value(self, key: str, val: str):
+    def _convert_value(self, key: str, val: bytes):
+        """val 为段里的原始 bytes；数字直接由 bytes 转换，只有字符串值解码"""
         val = val.strip()
         if key in {'hold_in_lmem', 'allow_bank_conflict', 'one_loop'}:
-            return val == '1' or val.lower() == 'true'
-        if val.startswith('0x'):
+            return val == b'1' or val.lower() == b'true'
+        if val.startswith(b'0x'):
             return int(val, 16)
-        if val.isdigit() or (val.startswith('-') and val[1:].isdigit()):
+        if val.isdigit() or (val.startswith(b'-') and val[1:].isdigit()):
             return int(val)
         if key == 'shape_secs':
-            return [int(x) for x in val.split(',') if x]
-        if val.startswith('"') and val.endswith('"'):
-            return val[1:-1]
-        return val
+            return [int(x) for x in val.split(b',') if x]
+        if val.startswith(b'"') and val.endswith(b'"'):
+            return _text(val[1:-1])
+        return _text(val)
 
     def _validate_entry(self, entry: Dict):
         if entry.get('tag') != 'iteration_result':
@@ -190,36 +342,46 @@ FIELDS_WHITELIST_TS = {
     'timestep', 'timestep_type', 'op', 'tensor_name',
     'concerning_op', 'concerning_op_name', 'cycle', 'shape_secs'
 }
+TS_KEYS = {k.encode(): k for k in FIELDS_WHITELIST_TS}
 
 
 class TimestepParser:
     def __init__(self):
         self.max_timestep_global = 0
+        self._groups = []
 
     def get_global_max_timestep(self) -> int:
         return self.max_timestep_global
 
-    def parse(self, sections: List[str]) -> List[Dict[str, Any]]:
-        groups = self._group_by_settings(sections)
-        return [{'settings': g['settings'], 'entries': g['entries']} for g in groups]
-
-    def _group_by_settings(self, sections):
-        groups, cur = [], None
+    def parse(self, sections: Iterable[str]) -> List[Dict[str, Any]]:
         for sec in sections:
-            entry, settings = self._parse_section(sec)
-            if not entry:
-                continue
-            if not cur or not self._is_same_settings(cur['settings'], settings):
-                cur = {'settings': settings, 'entries': []}
-                groups.append(cur)
-            cur['entries'].append(entry)
-        return groups
+            self.feed(sec)
+        return self.finish()
+
+    # ---- 流式入口：逐段喂入，最后 finish ----
+    def feed(self, sec: Union[str, bytes]):
+        entry, settings = self._parse_section(sec)
+        if not entry:
+            return
+        cur = self._groups[-1] if self._groups else None
+        if not cur or not self._is_same_settings(cur['settings'], settings):
+            cur = {'settings': settings, 'entries': []}
+            self._groups.append(cur)
+        cur['entries'].append(entry)
+
+    def finish(self) -> List[Dict[str, Any]]:
+        groups, self._groups = self._groups, []
+        return [{'settings': g['settings'], 'entries': g['entries']} for g in groups]
 
-    def _parse_section(self, sec: str):
+    def _parse_section(self, sec: Union[str, bytes]):
+        if isinstance(sec, str):
+            sec = sec.encode('utf-8')
         entry, settings = {}, {}
-        for m in re.finditer(r';\s*(\w+)\s*=\s*([^;]+)', sec):
-            k, raw = m.group(1), m.group(2).strip()
-            v = self._convert_value(k, raw)
+        for m in KV_RE.finditer(sec):
+            k = TS_KEYS.get(m.group(1))
+            if k is None:
+                continue
+            v = self._convert_value(k, m.group(2).strip())
             if k == 'shape_secs':
                 settings[k] = v
             if k in FIELDS_WHITELIST_TS:
@@ -240,20 +402,168 @@ class TimestepParser:
     def _is_same_settings(self, a: Dict, b: Dict) -> bool:
         return json.dumps(a.get('shape_secs')) == json.dumps(b.get('shape_secs'))
 
-    def _convert_value(self, key: str, val: str):
+    def _convert_value(self, key: str, val: bytes):
         if key == 'shape_secs':
-            return [int(x) for x in val.split(',') if x]
-        if val.isdigit() or (val.startswith('-') and val[1:].isdigit()):
+            return [int(x) for x in val.split(b',') if x]
+        if val.isdigit() or (val.startswith(b'-') and val[1:].isdigit()):
             return int(val)
-        if val.startswith('"') and val.endswith('"'):
-            return val[1:-1]
-        return val
+        if val.startswith(b'"') and val.endswith(b'"'):
+            return _text(val[1:-1])
+        return _text(val)
 
 # ----------------------------------------------------------
 #  4. MemoryStatistics 
 # ----------------------------------------------------------
+class _ActiveAllocs:
+    """
+    扫描线状态：当前 step 活跃的分配集合，增删时增量维护各项统计
+    （总/已用内存、bank 分布、类型计数、地址排序后的碎片间隙）。
+    最大值用带惰性删除的堆；bank / 类型输出顺序与按分配顺序遍历时首次出现的顺序一致
+    """
+    def __init__(self, allocs: List[Dict]):
+        self.addr  = [a['addr'] for a in allocs]
+        self.size  = [a['size'] for a in allocs]
+        self.end   = [a['addr'] + a['size'] for a in allocs]
+        self.succ  = [a.get('status') == 'success' for a in allocs]
+        self.bank  = [a.get('bank_id', 0) for a in allocs]
+        self.ltype = [a.get('lmem_type', 'unknown') for a in allocs]
+        self.alive = [False] * len(allocs)
+        self.count = self.used = self.succ_count = self.gap = 0
+        self.size_heap: List[Tuple[int, int]] = []   # (-size, idx)
+        self.end_heap: List[Tuple[int, int]] = []    # (-end, idx)
+        self.by_addr: List[Tuple[int, int]] = []     # 按 (addr, idx) 排序的活跃分配
+        self.banks: Dict[Any, list] = {}             # bid -> [used, count, size_heap, idx_heap]
+        self.types: Dict[Any, list] = {}             # type -> [count, idx_heap]
+
+    # ---- 增删 ----
+    def add(self, i: int):
+        self.alive[i] = True
+        self.count += 1
+        self.used += self.size[i]
+        self.succ_count += self.succ[i]
+        heapq.heappush(self.size_heap, (-self.size[i], i))
+        heapq.heappush(self.end_heap, (-self.end[i], i))
+        b = self.banks.setdefault(self.bank[i], [0, 0, [], []])
+        b[0] += self.size[i]
+        b[1] += 1
+        heapq.heappush(b[2], (-self.size[i], i))
+        heapq.heappush(b[3], i)
+        t = self.types.setdefault(self.ltype[i], [0, []])
+        t[0] += 1
+        heapq.heappush(t[1], i)
+        key = (self.addr[i], i)
+        pos = bisect.bisect_left(self.by_addr, key)
+        self._relink(pos, i, +1)
+        self.by_addr.insert(pos, key)
+
+    def remove(self, i: int):
+        self.alive[i] = False
+        self.count -= 1
+        self.used -= self.size[i]
+        self.succ_count -= self.succ[i]
+        b = self.banks[self.bank[i]]
+        b[0] -= self.size[i]
+        b[1] -= 1
+        self.types[self.ltype[i]][0] -= 1
+        pos = bisect.bisect_left(self.by_addr, (self.addr[i], i))
+        del self.by_addr[pos]
+        self._relink(pos, i, -1)
+
+    def _relink(self, pos: int, i: int, sign: int):
+        """i 插入到 / 移出 by_addr[pos] 位置时，更新相邻分配之间的间隙和"""
+        prv = self.by_addr[pos - 1][1] if pos > 0 else None
+        nxt = self.by_addr[pos][1] if pos < len(self.by_addr) else None
+        delta = 0
+        if prv is not None and nxt is not None:
+            delta -= max(0, self.addr[nxt] - self.end[prv])
+        if prv is not None:
+            delta += max(0, self.addr[i] - self.end[prv])
+        if nxt is not None:
+            delta += max(0, self.addr[nxt] - self.end[i])
+        self.gap += sign * delta
+
+    # ---- 查询 ----
+    def _top(self, heap: List[Tuple[int, int]]) -> int:
+        while heap and not self.alive[heap[0][1]]:
+            heapq.heappop(heap)
+        return -heap[0][0] if heap else 0
+
+    def _first_idx(self, heap: List[int]) -> int:
+        while not self.alive[heap[0]]:
+            heapq.heappop(heap)
+        return heap[0]
+
+    def snapshot(self, step: int, settings_key: str) -> Dict[str, Any]:
+        banks = sorted((self._first_idx(b[3]), bid) for bid, b in self.banks.items() if b[1])
+        types = sorted((self._first_idx(t[1]), ty) for ty, t in self.types.items() if t[0])
+        return _step_record(
+            step, settings_key,
+            self._top(self.end_heap), self.used, self._top(self.size_heap),
+            self.count, self.succ_count, self.gap,
+            [(bid, self.banks[bid][0], self.banks[bid][1], self._top(self.banks[bid][2]))
+             for _, bid in banks],
+            [(ty, self.types[ty][0]) for _, ty in types],
+        )
+
+
+def _step_record(step, settings_key, total_mem, used_mem, peak, n, succ, gap,
+                 banks, types) -> Dict[str, Any]:
+    """
+    由单个 step 的聚合量拼出 stepStatistics 条目（各后端共用，保证输出一致）
+    banks: [(bank_id, used, count, largest)]，types: [(lmem_type, count)]，均已按首次出现排序
+    """
+    if n < 2:
+        frag = 0
+    else:
+        frag = (gap / total_mem * 100) if total_mem else 0
+    return {
+        'step': step,
+        'settingsKey': settings_key,
+        'totalMemory': total_mem,
+        'usedMemory': used_mem,
+        'freeMemory': max(0, total_mem - used_mem),
+        'memoryUsagePercentage': (used_mem / total_mem * 100) if total_mem else 0,
+        'peakMemory': peak,
+        'allocationCount': n,
+        'activeAllocations': n,
+        'bankStatistics': {
+            bid: {
+                'usedMemory': b_used,
+                'allocationCount': b_cnt,
+                'averageAllocationSize': b_used / b_cnt,
+                'largestAllocation': b_max
+            }
+            for bid, b_used, b_cnt, b_max in banks
+        },
+        'detailedStats': {
+            'successfulAllocations': succ,
+            'failedAllocations': n - succ,
+            'successRate': (succ / n * 100) if n else 0,
+            'averageAllocationSize': used_mem / n if n else 0,
+            'memoryFragmentation': frag,
+            'allocationTypes': dict(types)
+        }
+    }
+
+
+STATS_BACKENDS = ('python', 'numpy')
+
+
 class MemoryStatistics:
-    def __init__(self):
+    # numpy 后端每块最多处理的 step × allocation 元素数，控制活跃矩阵的内存占用
+    NUMPY_BLOCK_ELEMS = 1 << 22
+
+    def __init__(self, backend: str = 'python'):
+        """
+        backend: 'python'（默认，纯 Python 扫描线）/ 'numpy'（向量化活跃矩阵）
+        numpy 后端代价为 O(step × allocation)，分配区间稀疏时扫描线更快；没装 numpy 时退回 python
+        """
+        if backend not in STATS_BACKENDS:
+            raise ValueError(f'未知的统计后端: {backend}')
+        if backend == 'numpy' and np is None:
+            print('[warn] 未安装 numpy，LMEM 统计改用 python 后端')
+            backend = 'python'
+        self.backend = backend
         self.lmem_groups = []
         self.ts_counts = 0
         self.summary_cache = None
@@ -279,42 +589,121 @@ class MemoryStatistics:
     def _calc_for_group(self, group: Dict):
         settings, allocs = group['settings'], group['allocations']
         max_ts = max(a['max_timestep'] for a in allocs) if allocs else 0
-        step_stats = [self._calc_step(allocs, step, settings)
-                      for step in range(max_ts + 1)]
+        if self.backend == 'numpy':
+            step_stats = self._numpy_steps(allocs, max_ts, settings)
+        else:
+            step_stats = self._sweep_steps(allocs, max_ts, settings)
         summary = self._group_summary(step_stats, allocs)
         return {'settings': settings,
                 'stepStatistics': step_stats,
                 'summary': summary}
 
-    def _calc_step(self, allocs, step: int, settings: Dict):
-        step_allocs = [a for a in allocs if self._is_active(a, step)]
-        by_bank = {}
-        for a in step_allocs:
-            bank_id = a.get('bank_id', 0)
-            by_bank.setdefault(bank_id, []).append(a)
-        total_mem = self._total_memory(step_allocs)
-        used_mem = self._used_memory(step_allocs)
-        return {
-            'step': step,
-            'settingsKey': self._settings_key(settings),
-            'totalMemory': total_mem,
-            'usedMemory': used_mem,
-            'freeMemory': max(0, total_mem - used_mem),
-            'memoryUsagePercentage': (used_mem / total_mem * 100) if total_mem else 0,
-            'peakMemory': max((a['size'] for a in step_allocs), default=0),
-            'allocationCount': len(step_allocs),
-            'activeAllocations': len(step_allocs),
-            'bankStatistics': {
-                bid: {
-                    'usedMemory': self._used_memory(bank),
-                    'allocationCount': len(bank),
-                    'averageAllocationSize': self._avg_size(bank),
-                    'largestAllocation': max((a['size'] for a in bank), default=0)
-                }
-                for bid, bank in by_bank.items()
-            },
-            'detailedStats': self._detailed(step_allocs)
-        }
+    def _sweep_steps(self, allocs, max_ts: int, settings: Dict):
+        """
+        扫描线：每个分配只在进入 / 离开活跃区间时各处理一次，
+        代替逐 step 全量扫描所有分配
+        """
+        n_steps = max_ts + 1
+        if n_steps <= 0:
+            return []
+        enter = [[] for _ in range(n_steps + 1)]
+        leave = [[] for _ in range(n_steps + 1)]
+        for i, a in enumerate(allocs):
+            for lo, hi in self._active_ranges(a, max_ts):
+                enter[lo].append(i)
+                leave[hi + 1].append(i)
+        state = _ActiveAllocs(allocs)
+        settings_key = self._settings_key(settings)
+        step_stats = []
+        for step in range(n_steps):
+            for i in leave[step]:
+                state.remove(i)
+            for i in enter[step]:
+                state.add(i)
+            step_stats.append(state.snapshot(step, settings_key))
+        return step_stats
+
+    def _numpy_steps(self, allocs, max_ts: int, settings: Dict):
+        """
+        numpy 向量化：分配转成列数组，按 step 分块构造 step × allocation 活跃矩阵，
+        一次算出每个 step 的总量 / bank 分布 / 类型计数 / 碎片间隙
+        """
+        n_steps = max_ts + 1
+        if n_steps <= 0:
+            return []
+        n = len(allocs)
+        addr  = np.fromiter((a['addr'] for a in allocs), np.int64, n)
+        size  = np.fromiter((a['size'] for a in allocs), np.int64, n)
+        start = np.fromiter((a['timestep_start'] for a in allocs), np.int64, n)
+        end   = np.fromiter((a['timestep_end'] for a in allocs), np.int64, n)
+        hold  = np.fromiter((bool(a.get('hold_in_lmem')) for a in allocs), bool, n)
+        succ  = np.fromiter((a.get('status') == 'success' for a in allocs), np.int64, n)
+        stop  = addr + size
+        banks = self._index_by_key(a.get('bank_id', 0) for a in allocs)
+        types = self._index_by_key(a.get('lmem_type', 'unknown') for a in allocs)
+        # 碎片：按 (addr, 原顺序) 排序后相邻活跃分配的间隙
+        order = np.lexsort((np.arange(n), addr))
+        addr_s, stop_s = addr[order], stop[order]
+        pos = np.arange(n)
+
+        settings_key = self._settings_key(settings)
+        step_stats = []
+        block = max(1, self.NUMPY_BLOCK_ELEMS // max(n, 1))
+        for s0 in range(0, n_steps, block):
+            steps = np.arange(s0, min(s0 + block, n_steps))[:, None]
+            act = np.where(start <= end,
+                           (steps >= start) & (steps <= end),
+                           ((steps >= start) & (steps <= self.ts_counts)) | (steps <= end))
+            act |= hold
+            actw = act.astype(np.int64)
+            cnt  = actw.sum(axis=1)
+            used = actw @ size
+            nsuc = actw @ succ
+            total = np.max(np.where(act, stop, 0), axis=1, initial=0)
+            peak  = np.max(np.where(act, size, 0), axis=1, initial=0)
+
+            act_s = act[:, order]
+            last = np.maximum.accumulate(np.where(act_s, pos, -1), axis=1)
+            prev = np.full_like(last, -1)
+            prev[:, 1:] = last[:, :-1]
+            gaps = np.where(act_s & (prev >= 0),
+                            np.maximum(0, addr_s - stop_s[np.maximum(prev, 0)]), 0)
+            gap = gaps.sum(axis=1)
+
+            bank_cols = []
+            for bid, cols in banks:
+                sub = act[:, cols]
+                bank_cols.append((
+                    bid,
+                    cols[sub.argmax(axis=1)].tolist(),
+                    (sub.astype(np.int64) @ size[cols]).tolist(),
+                    sub.sum(axis=1).tolist(),
+                    np.max(np.where(sub, size[cols], 0), axis=1, initial=0).tolist(),
+                ))
+            type_cols = []
+            for ty, cols in types:
+                sub = act[:, cols]
+                type_cols.append((ty, cols[sub.argmax(axis=1)].tolist(),
+                                  sub.sum(axis=1).tolist()))
+
+            cols = [c.tolist() for c in (cnt, used, nsuc, total, peak, gap)]
+            for r, (c, u, sc, t, pk, g) in enumerate(zip(*cols)):
+                step_banks = sorted((first[r], bid, bu[r], bc[r], bm[r])
+                                    for bid, first, bu, bc, bm in bank_cols if bc[r])
+                step_types = sorted((first[r], ty, tc[r])
+                                    for ty, first, tc in type_cols if tc[r])
+                step_stats.append(_step_record(
+                    s0 + r, settings_key, t, u, pk, c, sc, g,
+                    [b[1:] for b in step_banks], [t_[1:] for t_ in step_types]))
+        return step_stats
+
+    @staticmethod
+    def _index_by_key(keys: Iterable[Any]) -> List[Tuple[Any, Any]]:
+        """按 key 分桶，返回 [(key, 升序下标数组)]"""
+        buckets: Dict[Any, List[int]] = {}
+        for i, k in enumerate(keys):
+            buckets.setdefault(k, []).append(i)
+        return [(k, np.array(v, dtype=np.int64)) for k, v in buckets.items()]
 
     def _group_summary(self, step_stats, allocs):
         succ = [a for a in allocs if a.get('status') == 'success']
@@ -347,52 +736,29 @@ class MemoryStatistics:
         }
 
     # ---- 工具 ----
-    def _is_active(self, a: Dict, step: int) -> bool:
+    def _active_ranges(self, a: Dict, max_ts: int) -> List[Tuple[int, int]]:
+        """
+        分配的活跃 step 闭区间（裁剪到 [0, max_ts]）：
+        hold_in_lmem 全程活跃；start > end 为回卷，拆成 [0, end] 和 [start, ts_counts]
+        """
         if a.get('hold_in_lmem'):
-            return True
-        start, end = a['timestep_start'], a['timestep_end']
-        if start <= end:
-            return start <= step <= end
-        return (start <= step <= self.ts_counts) or (0 <= step <= end)
+            spans = [(0, max_ts)]
+        else:
+            start, end = a['timestep_start'], a['timestep_end']
+            if start <= end:
+                spans = [(start, end)]
+            else:
+                spans = [(0, end), (start, self.ts_counts)]
+        out = []
+        for lo, hi in spans:
+            lo, hi = max(lo, 0), min(hi, max_ts)
+            if lo <= hi:
+                out.append((lo, hi))
+        return out
 
     def _total_memory(self, allocs):
         return max((a['addr'] + a['size'] for a in allocs), default=0)
 
-    def _used_memory(self, allocs):
-        return sum(a['size'] for a in allocs)
-
-    def _avg_size(self, allocs):
-        return sum(a['size'] for a in allocs) / len(allocs) if allocs else 0
-
-    def _detailed(self, allocs):
-        succ = [a for a in allocs if a.get('status') == 'success']
-        total = len(allocs)
-        return {
-            'successfulAllocations': len(succ),
-            'failedAllocations': total - len(succ),
-            'successRate': (len(succ) / total * 100) if total else 0,
-            'averageAllocationSize': self._avg_size(allocs),
-            'memoryFragmentation': self._fragmentation(allocs),
-            'allocationTypes': self._types(allocs)
-        }
-
-    def _fragmentation(self, allocs):
-        if len(allocs) < 2:
-            return 0
-        sorted_allocs = sorted(allocs, key=lambda x: x['addr'])
-        gap = 0
-        for prev, cur in zip(sorted_allocs, sorted_allocs[1:]):
-            gap += max(0, cur['addr'] - (prev['addr'] + prev['size']))
-        total = self._total_memory(allocs)
-        return (gap / total * 100) if total else 0
-
-    def _types(self, allocs):
-        cnt = {}
-        for a in allocs:
-            t = a.get('lmem_type', 'unknown')
-            cnt[t] = cnt.get(t, 0) + 1
-        return cnt
-
     def _settings_key(self, settings: Dict) -> str:
         return json.dumps({
             'allow_bank_conflict': settings.get('allow_bank_conflict'),
@@ -413,30 +779,52 @@ OpNode = collections.namedtuple(
     'operands results is_local'
 )
 
-def parse_bmodel(path: Path) -> List[OpNode]:
-    """安全解析 bmodel.json，返回 OpNode 列表"""
+def parse_bmodel(path: Path, verbose: bool = False) -> List[OpNode]:
+    """
+    安全解析 bmodel.json，返回 OpNode 列表；格式有误的算子跳过
+    verbose 时打印修复 / 解析失败 / 跳过算子的诊断信息（convert.py 用）
+    """
     if not path.exists() or path.stat().st_size == 0:
         return []
+    content = ''
     try:
-        content = path.read_text(encoding='utf-8-sig').strip()
+        content = read_input(path).decode('utf-8-sig').strip()
         if content.startswith('[') and content.endswith(',]'):
             content = content[:-2] + ']'
+        elif not content.startswith('[') or not content.endswith(']'):
+            if verbose:
+                print(f"⚠️ 警告: JSON格式异常，尝试修复")
+            content = '[' + content + ']'
         data = json.loads(content)
-    except Exception:
+    except json.JSONDecodeError as e:
+        if verbose:
+            print(f"❌ JSON解析失败: {e}")
+            print(f"错误位置: {e.pos}, 行 {e.lineno}, 列 {e.colno}")
+            print(f"错误上下文: {content[max(0, e.pos-50):e.pos+50]}")
+        return []
+    except Exception as e:
+        if verbose:
+            print(f"❌ 文件读取失败: {type(e).__name__}: {e}")
         return []
     ops = []
     for node in data:
-        if not isinstance(node, dict) or not node.get('opcode', '').startswith('tpu.'):
+        try:
+            if not isinstance(node, dict) or not node.get('opcode', '').startswith('tpu.'):
+                continue
+            fl  = node.get('file-line', 'N/A')
+            core = node.get('core_id', -1)
+            name = node['opcode'].split('.')[-1]
+            before = node.get('tiu_dma_id(before)', [0, 0])
+            after  = node.get('tiu_dma_id(after)',  [0, 0])
+            if len(before) < 2: before = [0, 0]
+            if len(after)  < 2: after  = [0, 0]
+            bd_start, gdma_start = before[0]+1, before[1]+1
+            bd_count, gdma_count = after[0] - before[0], after[1] - before[1]
+        except Exception as e:
+            if verbose:
+                print(f"⚠️ 算子解析错误: {e}")
+                print(f"问题节点: {node.get('file-line', '未知')}")
             continue
-        fl  = node.get('file-line', 'N/A')
-        core = node.get('core_id', -1)
-        name = node['opcode'].split('.')[-1]
-        before = node.get('tiu_dma_id(before)', [0, 0])
-        after  = node.get('tiu_dma_id(after)',  [0, 0])
-        if len(before) < 2: before = [0, 0]
-        if len(after)  < 2: after  = [0, 0]
-        bd_start, gdma_start = before[0]+1, before[1]+1
-        bd_count, gdma_count = after[0] - before[0], after[1] - before[1]
         ops.append(OpNode(fl, core, name, bd_start, bd_count,
                           gdma_start, gdma_count,
                           node.get('operands', []),
@@ -475,50 +863,141 @@ def build_info(op: OpNode) -> str:
     local = 'local_layer' if op.is_local else 'global_layer'
     return f"<br>{local}{ins}{outs}<br>" #========<br>feature_size=0<br>weight_size=0<br>total_size=0"
 
+class BmodelIndex:
+    """
+    bmodel.json 解析一次后的共享索引：算子按 core_id 分桶（保持 bmodel 内顺序），
+    并预先算好每个算子的 BD / GDMA id 区间 [start, end)
+    区间按 log_parser 的约定：算子的指令 id 为 tiu_dma_id(before)+1 .. tiu_dma_id(after)
+    """
+    def __init__(self, ops: List[OpNode]):
+        self.ops = ops
+        self.by_core: Dict[int, List[OpNode]] = {}
+        self.ranges: Dict[int, List[Tuple[int, int, int, int]]] = {}
+        for op in ops:
+            self.by_core.setdefault(op.core_id, []).append(op)
+            self.ranges.setdefault(op.core_id, []).append((
+                op.bd_start, op.bd_start + op.bd_count,
+                op.gdma_start, op.gdma_start + op.gdma_count,
+            ))
+
+    @classmethod
+    def load(cls, path: Path, verbose: bool = False) -> 'BmodelIndex':
+        return cls(parse_bmodel(path, verbose))
+
+    def ops_for_core(self, core_id: int) -> List[OpNode]:
+        return self.by_core.get(core_id, [])
+
+    def ranges_for_core(self, core_id: int, shift: int = 0) -> List[Tuple[int, int, int, int]]:
+        """shift 把各区间整体平移（convert.py 沿用 before .. after-1 的老约定时传 -1）"""
+        ranges = self.ranges.get(core_id, [])
+        if shift:
+            ranges = [(a + shift, b + shift, c + shift, d + shift) for a, b, c, d in ranges]
+        return ranges
+
+    def subset(self, core_id: int) -> 'BmodelIndex':
+        """只含单个 core 的索引（发给子进程时只序列化该 core 的算子）"""
+        return BmodelIndex(self.ops_for_core(core_id))
+
+
+class _RangeExtrema:
+    """
+    静态数组的区间 min / max（op 取内置 min 或 max）：按 BLOCK 分块，
+    块内零头直接切片，整块部分查稀疏表，O(1) 次查表；额外内存约 n / BLOCK · log(n / BLOCK)
+    """
+    BLOCK = 64
+
+    def __init__(self, values: array, op):
+        self.values, self.op = values, op
+        B = self.BLOCK
+        level = array('q', (op(values[i:i + B]) for i in range(0, len(values), B)))
+        self.table = [level]
+        n_blocks, half = len(level), 1
+        while 2 * half <= n_blocks:
+            level = array('q', map(op, level[:len(level) - half], level[half:]))
+            self.table.append(level)
+            half *= 2
+
+    def query(self, lo: int, hi: int) -> int:
+        """[lo, hi) 上的极值，要求 lo < hi"""
+        op, B, values = self.op, self.BLOCK, self.values
+        bl, bh = lo // B, (hi - 1) // B
+        if bl == bh:
+            return op(values[lo:hi])
+        res = op(op(values[lo:(bl + 1) * B]), op(values[bh * B:hi]))
+        if bh - bl > 1:
+            a, b = bl + 1, bh          # 中间整块 [a, b)
+            k = (b - a).bit_length() - 1
+            t = self.table[k]
+            res = op(res, t[a], t[b - (1 << k)])
+        return res
+
+
+class _IdRangeIndex:
+    """
+    单个引擎的指令按 id 升序排好的 start / end 列：
+    给定 id 区间 [lo, hi)，返回其中已出现指令的 (min start, max end)
+    同一 id 出现多次时以最后一条为准（与原先按 id 建 dict 的行为一致）
+    """
+    def __init__(self, table: EntryColumns, engine: str, id_col: array):
+        code = ENGINE_CODE[engine]
+        pairs = [(i, row) for row, (eng, i) in enumerate(zip(table.engine, id_col))
+                 if eng == code and i != MISSING]
+        if any(a[0] >= b[0] for a, b in zip(pairs, pairs[1:])):
+            pairs = sorted(dict(pairs).items())
+        starts, ends = table.start, table.end
+        self.ids = array('q', (i for i, _ in pairs))
+        self.dense = not pairs or pairs[-1][0] - pairs[0][0] + 1 == len(pairs)
+        self.min_start = _RangeExtrema(array('q', (starts[r] for _, r in pairs)), min)
+        self.max_end   = _RangeExtrema(array('q', (ends[r] for _, r in pairs)), max)
+
+    def query(self, lo: int, hi: int) -> Optional[Tuple[int, int]]:
+        ids = self.ids
+        if not ids:
+            return None
+        if self.dense:  # id 连续时直接换算下标
+            n, base = len(ids), ids[0]
+            i, j = min(max(lo - base, 0), n), min(max(hi - base, 0), n)
+        else:
+            i = bisect.bisect_left(ids, lo)
+            j = bisect.bisect_left(ids, hi, i)
+        if i >= j:
+            return None
+        return self.min_start.query(i, j), self.max_end.query(i, j)
+
+
 class LayerExtractor:
     """根据已解析的 BD/GDMA entries + bmodel 生成 layer 条目（对象格式）"""
-    def __init__(self, bmodel_path: Path):
-        self.ops = parse_bmodel(bmodel_path)
+    def __init__(self, bmodel: Union[Path, BmodelIndex]):
+        self.index = bmodel if isinstance(bmodel, BmodelIndex) else BmodelIndex.load(bmodel)
+        self.ops = self.index.ops
         self.lookup = {(op.file_line, op.name): op for op in self.ops}
 
     def make_layer_entries(
         self,
-        bd_entries: List[Dict[str, Any]],
-        gdma_entries: List[Dict[str, Any]],
+        table: EntryColumns,
         core_id: int,
         tiu_mhz: int = 1000,
-    ) -> List[Dict[str, Any]]:
-        bd_map   = {e['bd_id']:  e for e in bd_entries  if 'bd_id'  in e}
-        gdma_map = {e['gdma_id']: e for e in gdma_entries if 'gdma_id' in e}
-        layer_entries = []
-        for op in filter(lambda o: o.core_id == core_id, self.ops):
-            instr = []
-            for bd_id in range(op.bd_start, op.bd_start + op.bd_count):
-                if bd_id in bd_map:
-                    instr.append(bd_map[bd_id])
-            for g_id in range(op.gdma_start, op.gdma_start + op.gdma_count):
-                if g_id in gdma_map:
-                    instr.append(gdma_map[g_id])
-            if not instr:
+    ) -> int:
+        """
+        把该 core 各算子的 layer 条目直接追加到 table（排序交给调用方），返回新增条数
+        每个算子的起止 cycle 是其 BD / GDMA id 区间上的 min(start) / max(end) 区间查询，
+        整个 core 的关联近似线性，与算子包含的指令数无关
+        """
+        bd   = _IdRangeIndex(table, 'BD', table.bd_id)
+        gdma = _IdRangeIndex(table, 'GDMA', table.gdma_id)
+        n0 = len(table)
+        ops = self.index.ops_for_core(core_id)
+        for op, (bd_lo, bd_hi, g_lo, g_hi) in zip(ops, self.index.ranges_for_core(core_id)):
+            spans = [s for s in (bd.query(bd_lo, bd_hi), gdma.query(g_lo, g_hi)) if s]
+            if not spans:
                 continue
-            start_cyc = min(e['start'] for e in instr)
-            end_cyc   = max(e['end']   for e in instr)
+            start_cyc = min(s[0] for s in spans)
+            end_cyc   = max(s[1] for s in spans)
             suffix = '(G)' if not op.is_local else '(L)'
             isSL = True if op.name == 'Load' or op.name == 'Store' else False
-            layer_entries.append({
-                'engine'   : 'LAYER',
-                'op'       : op.name,
-                'type'     : f"{op.name}{suffix}",
-                'start'    : start_cyc,
-                'end'      : end_cyc,
-                'cost'     : end_cyc - start_cyc,
-                'file_line' : op.file_line,
-                'info'     : build_info(op),
-                'isSL'      : isSL,
-            })
-        # 按开始时间排序
-        layer_entries.sort(key=lambda x: x['start'])
-        return layer_entries
+            table.append_layer(op.name, f"{op.name}{suffix}", start_cyc, end_cyc,
+                               end_cyc - start_cyc, op.file_line, build_info(op), isSL)
+        return len(table) - n0
 
 # ----------------------------------------------------------
 # 6. ProfileParser
@@ -527,51 +1006,154 @@ FIELDS_PROFILE = {
     'op', 'type', 'start', 'end', 'cost',
     'bd_id', 'gdma_id', 'direction', 'size', 'bandwidth'
 }
+# 标准 BD / GDMA 单元格一次匹配：op|type|s|b|g|[h|sd|]e|t[|dr|sz|bw]
+# 与逐字段解析结果（含键顺序）一致；匹配不上的回退到 _parse_fields
+# 直接匹配 bytes：数字字段由 bytes 转 int / float，只有 op / type 名解码
+PROFILE_CELL_RE = re.compile(
+    rb'([^|]*)\|([^|]*)\|s:(\d+)\|b:(\d+)\|g:(\d+)(?:\|h:\d+\|sd:\d+)?\|e:(-?\d+)\|t:(\d+)'
+    rb'(?:\|dr:(\d+)\|sz:(\d+)\|bw:(\d+(?:\.\d+)?))?'
+)
+NAN = float('nan')
+# _extract_tail_summary 输出的键顺序
+SUMMARY_KEYS = [
+    'totalCycle', 'lastBdId', 'lastGdmaId', 'tcyc', 'gdmaBytes',
+    'ddrBwUsage', 'flops', 'runtime_Ms', 'computationAbility_T',
+]
+# 尾部汇总行的开头（API_END / TCYC / GDMA SUMMARY / DDR BW USAGE / flops），只有这些行交给 _extract_tail_summary
+SUMMARY_PREFIXES = (b'API_END', b'TCYC', b'GDMA SUMMARY', b'DDR BW', b'flops')
 class ProfileParser:
     def parse(
         self,
-        raw_text: str,
+        raw_text: Union[str, bytes],
         bmodel_path: Optional[Path] = None,
         core_id: int = 0,
         tiu_mhz: int = 1000,
+        bmodel_index: Optional[BmodelIndex] = None,
     ) -> List[Dict[str, Any]]:
+        """
+        raw_text 可为 str 或 bytes（文件内容直接按 bytes 解析，不整体解码）
+        bmodel_index 已给出时直接复用，不再按 bmodel_path 重新解析 bmodel.json
+        """
         if not raw_text:
             return []
-        entries = []
-        bd_entries, gdma_entries = [], []
-        for line in raw_text.splitlines():
-            line = line.rstrip()
-            if not line or line.startswith('-') or 'ENGINE_' in line:
-                continue
-            left, right = self._split_two_cols(line)
-            if left:
-                e = self._parse_single(left, 'BD')
-                if e:
-                    entries.append(e)
-                    bd_entries.append(e)
-            if right:
-                e = self._parse_single(right, 'GDMA')
-                if e:
-                    entries.append(e)
-                    gdma_entries.append(e)
+        entries, summary = self._scan_lines(raw_text)
+        return self._finish(entries, summary, bmodel_path, core_id, tiu_mhz, bmodel_index)
+
+    def parse_file(
+        self,
+        path: Path,
+        core_id: int = 0,
+        tiu_mhz: int = 1000,
+        bmodel_index: Optional[BmodelIndex] = None,
+        jobs: int = 1,
+    ) -> List[Dict[str, Any]]:
+        """大文件且 jobs > 1 时 mmap 分块多进程解析（见 profile_reader），否则按 bytes 逐行流式读入"""
+        if not use_chunks(path, jobs):
+            if not path.stat().st_size:
+                return []
+            with open_input(path) as f:
+                entries, summary = self._scan_lines(f)
+            return self._finish(entries, summary, None, core_id, tiu_mhz, bmodel_index)
+        parts = map_ranges(path, _parse_profile_range, jobs)
+        return self.merge_ranges(parts, core_id, tiu_mhz, bmodel_index)
+
+    def merge_ranges(
+        self,
+        parts: List[Tuple[EntryColumns, Dict[str, Any]]],
+        core_id: int = 0,
+        tiu_mhz: int = 1000,
+        bmodel_index: Optional[BmodelIndex] = None,
+    ) -> List[Dict[str, Any]]:
+        """按区间顺序拼接 _parse_profile_range 的结果，再统一注入 layer、排序"""
+        if not parts:
+            return []
+        with TIMER.stage('profile.merge', items_in=len(parts)):
+            entries = parts[0][0]
+            for cols, _ in parts[1:]:
+                entries.extend(cols)
+            # 每项汇总取第一个出现的区间（与整段 re.search 的结果一致）
+            found = {}
+            for _, summary in parts:
+                for k, v in summary.items():
+                    found.setdefault(k, v)
+            summary = {k: found[k] for k in SUMMARY_KEYS if k in found}
+        return self._finish(entries, summary, None, core_id, tiu_mhz, bmodel_index)
+
+    def _scan_lines(self, data: Union[str, bytes, Iterable[bytes]]) -> Tuple[EntryColumns, Dict[str, Any]]:
+        """
+        一遍扫描同时得到 entries 和尾部汇总；汇总正则只在两列都不是指令、且以汇总行开头的几行上跑，
+        与指令条数无关（只有 GDMA 列的行再多也不会进 tail）
+        data 为整段文本（str / bytes）或逐行 bytes 的可迭代对象（如以 'rb' 打开的文件）
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        size = len(data) if isinstance(data, bytes) else 0
+        lines = io.BytesIO(data) if isinstance(data, bytes) else data
+        # entries 直接进列式存储，不为每条指令建 dict
+        entries = EntryColumns()
+        add, scan = entries.append_instr, self._scan_cell
+        names: Dict[bytes, str] = {}   # op / type 名只解码一次
+        cols = ColumnSplitter()        # 两列按表头 / 数据行学到的位置切分
+        split = cols.split
+        tail = []
+        with TIMER.stage('profile.scan', items_in=size) as st:
+            for line in lines:
+                line = line.rstrip()
+                if not line or line.startswith(b'-'):
+                    continue
+                if b'ENGINE_' in line:
+                    cols.learn_header(line)
+                    continue
+                left, right = split(line)
+                bd = scan(left, names) if left else None
+                if bd:
+                    add('BD', *bd)
+                gdma = scan(right, names) if right else None
+                if gdma:
+                    add('GDMA', *gdma)
+                elif bd is None and line.lstrip().startswith(SUMMARY_PREFIXES):
+                    tail.append(line)  # API_END / TCYC / GDMA SUMMARY 等汇总行
+            st.set(items_out=len(entries))
+        return entries, self._extract_tail_summary(b'\n'.join(tail).decode('utf-8', 'replace'))
+
+    def _finish(self, entries: EntryColumns, summary: Dict[str, Any],
+                bmodel_path: Optional[Path], core_id: int, tiu_mhz: int,
+                bmodel_index: Optional[BmodelIndex]) -> List[Dict[str, Any]]:
         # ---- 注入 layer ----
-        if bmodel_path and bmodel_path.exists():
-            layer_ext = LayerExtractor(bmodel_path)
-            entries.extend(
-                layer_ext.make_layer_entries(bd_entries, gdma_entries, core_id, tiu_mhz)
-            )
+        if bmodel_index is None and bmodel_path and bmodel_path.exists():
+            bmodel_index = BmodelIndex.load(bmodel_path)
+        if bmodel_index is not None:
+            with TIMER.stage('profile.layer_join', core=core_id, items_in=len(entries)) as st:
+                layer_ext = LayerExtractor(bmodel_index)
+                st.set(items_out=layer_ext.make_layer_entries(entries, core_id, tiu_mhz))
         # -------------------
-        entries.sort(key=lambda x: x['start'])
-        summary = self._extract_tail_summary(raw_text)
+        with TIMER.stage('profile.sort', items_in=len(entries)):
+            entries.sort_by_start()
         return [{'settings': summary, 'entries': entries}]
 
-    # 用 ≥2 空格拆成左右两列
-    def _split_two_cols(self, line: str):
-        parts = re.split(r' {2,}', line, maxsplit=1)
-        return parts[0], (parts[1] if len(parts) > 1 else None)
+    # 把 “Conv2D_32|AR|s:117369|b:11|g:10|e:117370|t:2” 解析成
+    # EntryColumns.append_instr 的参数 (op, type, start, end, cost, bd_id, gdma_id, dr, sz, bw)
+    def _scan_cell(self, text: bytes, names: Dict[bytes, str]) -> Optional[tuple]:
+        m = PROFILE_CELL_RE.fullmatch(text)
+        if m is not None:
+            op, ty, s, b, g, e, t, dr, sz, bw = m.groups()
+            try:
+                op, ty = names[op], names[ty]
+            except KeyError:
+                op, ty = _name(names, op), _name(names, ty)
+            if dr is None:
+                return op, ty, int(s), int(e), int(t), int(b), int(g), MISSING, MISSING, NAN
+            return op, ty, int(s), int(e), int(t), int(b), int(g), int(dr), int(sz), float(bw)
+        entry = self._parse_fields(text.decode('utf-8'), '')
+        if entry is None:
+            return None
+        return (entry['op'], entry['type'], entry['start'], entry['end'], entry['cost'],
+                entry.get('bd_id', MISSING), entry.get('gdma_id', MISSING),
+                entry.get('direction', MISSING), entry.get('size', MISSING),
+                entry.get('bandwidth', NAN))
 
-    # 把 “Conv2D_32|AR|s:117369|b:11|g:10|e:117370|t:2” 解析成 dict
-    def _parse_single(self, text: str, engine: str) -> Dict[str, Any]:
+    # 逐字段解析：字段顺序 / 格式不标准的单元格走这里
+    def _parse_fields(self, text: str, engine: str) -> Dict[str, Any]:
         items = text.split('|')
         if len(items) < 3:
             return None
@@ -637,40 +1219,108 @@ class ProfileParser:
         return out
 
 
+def _name(names: Dict[bytes, str], raw: bytes) -> str:
+    name = names.get(raw)
+    if name is None:
+        name = names[raw] = raw.decode('utf-8')
+    return name
+
+
+def _parse_profile_range(path: Path, lo: int, hi: int) -> Tuple[EntryColumns, Dict[str, Any]]:
+    """进程池 worker：解析 profile 文件的一个字节区间 [lo, hi)（需保持模块级函数）"""
+    data = read_range(path, lo, hi)
+    pp = ProfileParser()
+    return pp._scan_lines(data)
+
+
 # ----------------------------------------------------------
 # 7. 主流程
 # ----------------------------------------------------------
-def parse_log(raw_log: str) -> Dict[str, Any]:
-    sections = extract_valid_sections(raw_log)
-    lmem_sections = sections['lmemSections']
-    timestep_sections = sections['timestepSections']
-    profile_text = sections['profileText']
-    chip = sections['chip']
+PRODUCTS = ('lmem', 'summary', 'timestep', 'profile')
+# 各产物依赖日志里的哪类段（summary 由 lmem 分配统计而来）
+PRODUCT_KINDS = {'lmem': {'lmem'}, 'summary': {'lmem'}, 'timestep': {'timestep'}, 'profile': {'profile'}}
+
+
+def log_kinds(only: Iterable[str]) -> Set[str]:
+    """给定要构建的产物，返回需要从日志里取的段类别（chip 总是取，代价可忽略）"""
+    kinds = {'chip'}
+    for product in only:
+        kinds |= PRODUCT_KINDS[product]
+    return kinds
+
+
+def parse_log(raw_log: Union[str, Path], only: Optional[Iterable[str]] = None,
+              stats_backend: str = 'python') -> Dict[str, Any]:
+    """
+    raw_log 可为日志文本或日志路径；传路径时逐行流式解析，不整体读入内存
+    only 给出要构建的产物（PRODUCTS 的子集，默认全部）；其余产物对应的段不解析、统计不计算，
+    结果里为 None 且 valid 为 False
+    stats_backend 为 summary 统计用的 MemoryStatistics 后端（两者结果相同，只是速度不同）
+    """
+    only = set(PRODUCTS if only is None else only)
+    lmem_parser = LmemParser()
+    ts_parser = TimestepParser()
+    feeders = {'lmem': lmem_parser.feed, 'timestep': ts_parser.feed}
+    seen = {'lmem': False, 'timestep': False}
+    errors = {}
+    chip, profile_text = {}, b""
+
+    # 段一结束就交给对应的 parser，不保留段列表（各段的解析时间另记在 lmem.feed / timestep.feed）
+    size = raw_log.stat().st_size if isinstance(raw_log, Path) else len(raw_log)
+    with TIMER.stage('log.sections', items_in=size) as st:
+        n_sections = 0
+        for kind, sec in iter_log_sections(_iter_log_lines(raw_log), log_kinds(only)):
+            n_sections += 1
+            if kind == 'chip':
+                chip = parse_chip_section(sec)
+            elif kind == 'profile':
+                profile_text = sec
+            else:
+                seen[kind] = True
+                if kind in errors:
+                    continue
+                try:
+                    with TIMER.stage(f'{kind}.feed', merge=True, items_in=1):
+                        feeders[kind](sec)
+                except Exception as e:
+                    errors[kind] = e
+        st.set(items_out=n_sections)
+    chip = chip or None
 
     results = {'lmem': None, 'summary': None,
                'timestep': None, 'profile': None, 'chip': chip}
     valid = {'lmem': False, 'summary': False, 'timestep': False, 'profile': False}
 
     # 6.1 LMEM (保持不变)
-    if lmem_sections:
+    if seen['lmem']:
         try:
-            lmem_parser = LmemParser(chip=chip)
-            results['lmem'] = lmem_parser.parse(lmem_sections)
+            if 'lmem' in errors:
+                raise errors['lmem']
+            lmem_parser.chip = chip or {}
+            with TIMER.stage('lmem.finish') as st:
+                results['lmem'] = lmem_parser.finish()
+                st.set(items_out=sum(len(g['allocations']) for g in results['lmem']))
             valid['lmem'] = True
-            if results['lmem']:
-                stats = MemoryStatistics()
-                stats.set_lmem_data(results['lmem'],
-                                    lmem_parser.get_global_max_timestep())
-                results['summary'] = stats.calculate_all_statistics()
+            if results['lmem'] and 'summary' in only:
+                with TIMER.stage('lmem.statistics', items_in=len(results['lmem'])):
+                    stats = MemoryStatistics(stats_backend)
+                    stats.set_lmem_data(results['lmem'],
+                                        lmem_parser.get_global_max_timestep())
+                    results['summary'] = stats.calculate_all_statistics()
                 valid['summary'] = True
         except Exception as e:
             print(f'[LMEM] 解析错误: {e}')
+        if 'lmem' not in only:  # 只为 summary 解析的 lmem 不输出
+            results['lmem'], valid['lmem'] = None, False
 
     # 6.2 Timestep (保持不变)
-    if timestep_sections:
+    if seen['timestep']:
         try:
-            ts_parser = TimestepParser()
-            results['timestep'] = ts_parser.parse(timestep_sections)
+            if 'timestep' in errors:
+                raise errors['timestep']
+            with TIMER.stage('timestep.finish') as st:
+                results['timestep'] = ts_parser.finish()
+                st.set(items_out=len(results['timestep']))
             valid['timestep'] = True
         except Exception as e:
             print(f'[Timestep] 解析错误: {e}')
@@ -679,7 +1329,8 @@ def parse_log(raw_log: str) -> Dict[str, Any]:
     if profile_text:
         try:
             profile_parser = ProfileParser()
-            results['profile'] = profile_parser.parse(profile_text)  # 单文件场景先空着
+            with TIMER.stage('log.profile', items_in=len(profile_text)):
+                results['profile'] = profile_parser.parse(profile_text)  # 单文件场景先空着
             valid['profile'] = True
         except Exception as e:
             print(f'[Profile] 解析错误: {e}')
@@ -687,14 +1338,303 @@ def parse_log(raw_log: str) -> Dict[str, Any]:
     return {**results, 'valid': valid, 'success': True}
 
 # ----------------------------------------------------------
-# 8. CLI（仅把 bmodel.json 路径和 core_id 传进 parse）
+# 8. 多 core profile 解析（可多进程）
+# ----------------------------------------------------------
+def parse_core_profile(prof_path: Path, bmodel_index: Optional[BmodelIndex],
+                       core_id: int) -> Dict[str, Any]:
+    """解析单个 compiler_profile_<n> 并注入 layer；作为进程池 worker 需保持模块级函数"""
+    with TIMER.stage('profile.core', core=core_id, items_in=prof_path.stat().st_size) as st:
+        parsed = ProfileParser().parse_file(prof_path, core_id=core_id, bmodel_index=bmodel_index)
+        st.set(items_out=len(parsed[0]['entries']) if parsed else 0)
+    return parsed[0] if parsed else {"settings": {}, "entries": []}
+
+
+def parse_export_core(prof_path: Path, bmodel_index: Optional[BmodelIndex], core_id: int,
+                      out_dir: Path, formats: List[str]) -> Dict[str, Any]:
+    """worker 里解析完就地导出表格（见 CoreExporter.claim）；导出失败只告警，不影响解析结果"""
+    parsed = parse_core_profile(prof_path, bmodel_index, core_id)
+    if parsed['entries']:
+        try:
+            export_core(out_dir, core_id, parsed['entries'], formats)
+        except Exception as e:
+            print(f'❌[export] core_{core_id} 导出失败: {e}')
+    return parsed
+
+
+def merge_core_ranges(parts: List[Tuple[EntryColumns, Dict[str, Any]]],
+                      bmodel_index: Optional[BmodelIndex], core_id: int) -> Dict[str, Any]:
+    """分块解析的大文件：在主进程合并各区间并注入 layer"""
+    parsed = ProfileParser().merge_ranges(parts, core_id=core_id, bmodel_index=bmodel_index)
+    return parsed[0] if parsed else {"settings": {}, "entries": []}
+
+
+def iter_profiles(
+    prof_files: List[Tuple[int, Path]],
+    bmodel_path: Optional[Path] = None,
+    jobs: int = 1,
+    cache: Optional[ParseCache] = None,
+    executor: Optional[ProcessPoolExecutor] = None,
+    exporter: Optional[CoreExporter] = None,
+) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """
+    逐 core 解析 profile，按 core_id 升序产出 (core_id, 结果)，解析完一个就交出一个
+    bmodel.json 只解析一次，各 core 共用同一份索引
+    jobs > 1 时用进程池并行；超过 PARALLEL_MIN_BYTES 的大文件再按块拆开，同一进程池里并行解析
+    单个 core 失败记为 None，不影响其他 core
+    给出 cache 时，profile 与 bmodel.json 都没变的 core 直接读缓存
+    给出 executor 时在其中并行（与表格导出共用），否则按需临时起一个进程池
+    给出 exporter 时，整文件在 worker 里解析的 core 由该 worker 顺带导出表格
+    """
+    prof_files = sorted(prof_files)
+    keys = {n: cache.key('profile', [prof_path, bmodel_path], n)
+            for n, prof_path in prof_files} if cache else {}
+    todo = [(n, prof_path) for n, prof_path in prof_files
+            if not (cache and cache.has(keys[n]))]
+
+    index = None
+    if todo and bmodel_path and bmodel_path.exists():
+        if cache:
+            index = cache.cached(cache.key('bmodel', [bmodel_path]),
+                                 lambda: BmodelIndex.load(bmodel_path))
+        else:
+            index = BmodelIndex.load(bmodel_path)
+
+    def finish(n, prof_path, compute):
+        try:
+            parsed = compute()
+        except Exception as e:
+            print(f'❌[Profile] 解析失败 {prof_path.name}: {e}')
+            return None
+        if cache:
+            cache.put(keys[n], parsed)
+        return parsed
+
+    def from_cache(n, prof_path):
+        with TIMER.stage('profile.cache', core=n):
+            parsed = cache.get(keys[n])
+        if parsed is None:  # 缓存文件损坏 / 被淘汰，退回现场解析
+            parsed = finish(n, prof_path, lambda: parse_core_profile(prof_path, index, n))
+        return parsed
+
+    big = {n for n, prof_path in todo if use_chunks(prof_path, jobs)}
+    if jobs <= 1 or (len(todo) <= 1 and not big):
+        pending = {n for n, _ in todo}
+        for n, prof_path in prof_files:
+            if n in pending:
+                yield n, finish(n, prof_path, lambda: parse_core_profile(prof_path, index, n))
+            else:
+                yield n, from_cache(n, prof_path)
+        return
+    own = executor is None
+    if own:
+        executor = ProcessPoolExecutor(max_workers=jobs if big else min(jobs, len(todo)))
+    try:
+        pool = TracedExecutor(executor)   # --timings 时 worker 里的阶段也带回主进程
+        futures = {}
+        for n, prof_path in todo:
+            export = exporter.claim(n) if exporter and n not in big else None
+            if n in big:
+                futures[n] = submit_ranges(pool, prof_path, _parse_profile_range, jobs)
+            elif export:
+                futures[n] = pool.submit(parse_export_core, prof_path,
+                                         index.subset(n) if index else None, n, *export)
+            else:
+                futures[n] = pool.submit(parse_core_profile, prof_path,
+                                         index.subset(n) if index else None, n)
+        for n, prof_path in prof_files:
+            fut = futures.pop(n, None)
+            if fut is None:
+                yield n, from_cache(n, prof_path)
+            elif n in big:
+                yield n, finish(n, prof_path, lambda: merge_core_ranges(
+                    [f.result() for f in fut], index, n))
+            else:
+                yield n, finish(n, prof_path, fut.result)
+    finally:
+        if own:
+            executor.shutdown()
+
+
+def parse_profiles(
+    prof_files: List[Tuple[int, Path]],
+    bmodel_path: Optional[Path] = None,
+    jobs: int = 1,
+) -> Dict[int, Optional[Dict[str, Any]]]:
+    """一次性收集 iter_profiles 的结果：{core_id: 结果}"""
+    return dict(iter_profiles(prof_files, bmodel_path, jobs))
+
+
+def iter_profile_array(
+    profiles: Iterable[Tuple[int, Optional[Dict[str, Any]]]]
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    把按 core 升序的解析结果展开成 result['profile'] 的下标序列：
+    缺失 / 失败的 core 补空；数组只到最后一个解析成功的 core 为止
+    """
+    next_idx = 0
+    for n, parsed in profiles:
+        if parsed is None:
+            continue
+        for i in range(next_idx, n):
+            yield i, {"settings": {}, "entries": []}
+        yield n, parsed
+        next_idx = n + 1
+
+# ----------------------------------------------------------
+# 9. 输出：流式 result.json + csv / excel
 # ----------------------------------------------------------
+class ResultJsonWriter:
+    """
+    按顶层键依次写 result.json，列表可逐项追加（profile 每个 core 写完即可释放）
+    输出与 json.dumps(result, ensure_ascii=False, indent=2) 逐字节一致
+    """
+    INDENT = 2
+
+    def __init__(self, path: Path):
+        self.f = path.open('w', encoding='utf-8')
+        self.f.write('{')
+        self.enc = json.JSONEncoder(ensure_ascii=False, indent=self.INDENT)
+        self.n_keys = 0
+        self.n_items = 0
+
+    def write_key(self, key: str, value: Any):
+        self._open_key(key)
+        self._dump(value, 1)
+
+    def begin_list(self, key: str):
+        self._open_key(key)
+        self.f.write('[')
+        self.n_items = 0
+
+    def write_item(self, value: Any):
+        self.f.write(',' if self.n_items else '')
+        self.f.write('\n' + ' ' * (2 * self.INDENT))
+        self._dump(value, 2)
+        self.n_items += 1
+
+    def end_list(self):
+        self.f.write(('\n' + ' ' * self.INDENT + ']') if self.n_items else ']')
+
+    def close(self):
+        self.f.write('\n}' if self.n_keys else '}')
+        self.f.close()
+
+    def _open_key(self, key: str):
+        self.f.write(',' if self.n_keys else '')
+        self.f.write('\n' + ' ' * self.INDENT + json.dumps(key, ensure_ascii=False) + ': ')
+        self.n_keys += 1
+
+    def _dump(self, value: Any, level: int):
+        if isinstance(value, EntryColumns):
+            self._dump_rows(value, level)
+            return
+        if isinstance(value, dict) and any(isinstance(v, EntryColumns) for v in value.values()):
+            self._dump_dict(value, level)
+            return
+        # 缩进只出现在结构换行处（字符串里的换行已转义），整体平移即可
+        pad = '\n' + ' ' * (self.INDENT * level)
+        for chunk in self.enc.iterencode(value):
+            self.f.write(chunk.replace('\n', pad))
+
+    def _dump_dict(self, value: Dict[str, Any], level: int):
+        """含 EntryColumns 的 dict：逐键写，列式 entries 交给 _dump_rows"""
+        self.f.write('{')
+        for i, (k, v) in enumerate(value.items()):
+            self.f.write((',' if i else '') + '\n' + ' ' * (self.INDENT * (level + 1)))
+            self.f.write(json.dumps(k, ensure_ascii=False) + ': ')
+            self._dump(v, level + 1)
+        self.f.write('\n' + ' ' * (self.INDENT * level) + '}')
+
+    def _dump_rows(self, rows: EntryColumns, level: int):
+        """列式 entries 逐条还原成 dict 写出，写完即丢"""
+        if not len(rows):
+            self.f.write('[]')
+            return
+        self.f.write('[')
+        for i, row in enumerate(rows):
+            self.f.write((',' if i else '') + '\n' + ' ' * (self.INDENT * (level + 1)))
+            self._dump(row, level + 1)
+        self.f.write('\n' + ' ' * (self.INDENT * level) + ']')
+
+
+def export_core_tables(out_dir: Path, core_id: int,
+                       entries: Union[EntryColumns, List[Dict[str, Any]]],
+                       formats: Optional[Iterable[str]] = None):
+    """导出单个 core 的 csv（装了 openpyxl / pyarrow 时同时导出 excel / parquet），见 table_export.py"""
+    export_core(out_dir, core_id, entries, formats)
+
+# ----------------------------------------------------------
+# 10. CLI（仅把 bmodel.json 路径和 core_id 传进 parse）
+# ----------------------------------------------------------
+def _split_list(spec: str) -> List[str]:
+    return [x.strip() for x in spec.split(',') if x.strip()]
+
+
+def parse_only(spec: str) -> Set[str]:
+    """--only lmem,profile"""
+    only = set(_split_list(spec))
+    unknown = only - set(PRODUCTS)
+    if unknown or not only:
+        raise argparse.ArgumentTypeError(
+            f'未知的产物: {",".join(sorted(unknown)) or spec!r}（可选 {",".join(PRODUCTS)}）')
+    return only
+
+
+def parse_cores(spec: str) -> Set[int]:
+    """--cores 0-7,9 → {0..7, 9}"""
+    cores = set()
+    try:
+        for part in _split_list(spec):
+            lo, _, hi = part.partition('-')
+            cores.update(range(int(lo), int(hi or lo) + 1))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'core 范围格式错误: {spec!r}（如 0-7,9）')
+    return cores
+
+
+def parse_export(spec: str) -> List[str]:
+    """--export none / csv / csv,parquet"""
+    formats = _split_list(spec)
+    return [] if formats == ['none'] else formats
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument('folder', type=Path, help='包含所有日志/json 的文件夹')
     ap.add_argument('-o', '--output', required=True, type=Path,
-                    help='输出文件夹（将写入 result.json 及 core_*.csv/xlsx）')
+                    help='输出文件夹（将写入 result.json 及 core_*.csv/xlsx/parquet）')
+    ap.add_argument('-j', '--jobs', type=int, default=1,
+                    help='并行解析 profile 的进程数（默认 1 串行；0 表示 CPU 核数）；'
+                         '超大的单个 profile 文件会再按块拆分并行解析')
+    ap.add_argument('--columnar', action='store_true',
+                    help='额外写出紧凑列式文件 result.lvpk（见 columnar.py，含各 core 的时间轴汇总金字塔）')
+    ap.add_argument('--no-cache', action='store_true',
+                    help=f'不使用输出目录下的增量解析缓存（{CACHE_DIRNAME}/）')
+    ap.add_argument('--cache-size', type=int, default=2048,
+                    help='增量解析缓存上限（MB），超出按最近使用时间淘汰')
+    ap.add_argument('--timings', nargs='?', const='', metavar='TRACE_JSON',
+                    help='结束时打印各阶段耗时表；给出路径时另写 Chrome trace-event JSON'
+                         '（chrome://tracing / Perfetto 打开，并行解析的每个进程一条轨道）')
+    ap.add_argument('--only', type=parse_only, default=set(PRODUCTS), metavar='PRODUCTS',
+                    help=f'只构建这些产物（逗号分隔，可选 {",".join(PRODUCTS)}；默认全部），'
+                         '其余产物需要的解析 / 统计阶段直接跳过')
+    ap.add_argument('--cores', type=parse_cores, metavar='RANGES',
+                    help='只解析这些 core 的 profile（如 0-7,9；默认全部）')
+    ap.add_argument('--export', type=parse_export, metavar='FORMATS',
+                    help='每个 core 导出的表格格式：none 或 csv,xlsx,parquet 的组合'
+                         '（默认 csv，装了 openpyxl / pyarrow 时加 xlsx / parquet）')
+    ap.add_argument('--stats-backend', choices=STATS_BACKENDS, default='python',
+                    help='LMEM 统计（summary）的计算方式：python 扫描线（默认）/ numpy 向量化；'
+                         '分配多而 timestep 少时 numpy 更快，没装 numpy 时退回 python')
     args = ap.parse_args()
+    try:
+        export_formats = check_formats(default_formats() if args.export is None else args.export)
+    except (ValueError, ImportError) as e:
+        ap.error(str(e))
+    if args.jobs <= 0:
+        args.jobs = os.cpu_count() or 1
+    if args.timings is not None:
+        TIMER.enable()
 
     in_dir: Path  = args.folder
     out_dir: Path = args.output
@@ -703,44 +1643,48 @@ def main():
         exit(1)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    # 1. 自动找主日志
+    # 1. 自动找主日志（只要 profile 时不需要）
+    only: Set[str] = args.only
+    log_only = only - {'profile'}   # 日志里内嵌的 profile 不写进 result.json，不必解析
     main_log = None
-    for log_file in in_dir.glob('*.log'):
-        txt = log_file.read_text(encoding='utf-8', errors='ignore')
-        if '; action = lmem_assign' in txt or '; action = timestep_cycle' in txt:
-            main_log = txt
-            print(f'[info] 主日志: {log_file.name}')
-            break
+    if log_only:
+        with TIMER.stage('inputs.find_log'):
+            main_log = find_main_log(in_dir)  # 只记路径，解析时再流式读取
+        if main_log:
+            print(f'[info] 主日志: {main_log.name}')
 
     # 2. 自动找 bmodel.json
-    bmodel_json = next(in_dir.glob('*.bmodel.json'), None)
+    bmodel_json = next(iter(find_inputs(in_dir, '*.bmodel.json')), None) if 'profile' in only else None
     if bmodel_json:
         print(f'[info] bmodel.json: {bmodel_json.name}')
 
-    # 3. 自动找所有 compiler_profile_<n>
-    prof_map, max_n = {}, -1
-    prof_parser = ProfileParser()
-    for prof_path in sorted(in_dir.glob('compiler_profile_*')):
+    # 3. 自动找所有 compiler_profile_<n>（--cores 之外的跳过）
+    prof_files = []
+    for prof_path in find_inputs(in_dir, 'compiler_profile_*') if 'profile' in only else ():
         m = re.search(r'compiler_profile_(\d+)', prof_path.name)
         if not m:
             continue
         n = int(m.group(1))
+        if args.cores is not None and n not in args.cores:
+            continue
         print(f'[info] 加载 profile: {prof_path.name} (core {n})')
-        try:
-            parsed = prof_parser.parse(
-                prof_path.read_text(encoding='utf-8'),
-                bmodel_path=bmodel_json,
-                core_id=n
-            )
-            prof_map[n] = parsed[0] if parsed else {"settings": {}, "entries": []}
-            max_n = max(max_n, n)
-        except Exception as e:
-            print(f'❌[Profile] 解析失败 {prof_path.name}: {e}')
-            prof_map[n] = {"settings": {}, "entries": []}
+        prof_files.append((n, prof_path))
+
+    # 增量缓存：输入文件（大小 / mtime / 内容哈希）和解析器都没变时直接复用上次结果
+    # 解析器版本包含本文件及其导入的所有同目录模块，其中任何一个改动都会让缓存失效
+    cache = None
+    if not args.no_cache:
+        cache = ParseCache(out_dir / CACHE_DIRNAME, args.cache_size << 20,
+                           code_files=package_modules(Path(__file__)))
 
     # 4. 解析主日志或搭空骨架
     if main_log:
-        result = parse_log(main_log)
+        with TIMER.stage('parse_log', items_in=main_log.stat().st_size):
+            if cache:
+                result = cache.cached(cache.key('log', [main_log], sorted(log_only)),
+                                      lambda: parse_log(main_log, log_only, args.stats_backend))
+            else:
+                result = parse_log(main_log, log_only, args.stats_backend)
     else:
         result = {
             'lmem': None, 'timestep': None, 'summary': None,
@@ -749,51 +1693,57 @@ def main():
             'success': True
         }
 
-    # 5. 组装 profile 数组
-    profile_arr = []
-    for i in range(max_n + 1):
-        profile_arr.append(prof_map.get(i, {"settings": {}, "entries": []}))
-    result['profile'] = profile_arr
-    result['valid']['profile'] = any(p['entries'] for p in profile_arr)
-
-    # 6. 写 result.json
+    # 5. 按顶层键流式写 result.json；profile 逐 core 解析（--jobs > 1 时多进程并行），
+    #    每个 core 写完 json / lvpk / csv 后即释放其 entries
     result_json = out_dir / 'result.json'
-    result_json.write_text(json.dumps(result, ensure_ascii=False, indent=2))
-    print(f'✅ json 已生成 -> {result_json}')
-
-    # 7. 自动导出 csv & excel（不依赖额外参数）
-    try:
-        import openpyxl
-        HAS_EXCEL = True
-    except ImportError:
-        HAS_EXCEL = False
-
-    for core_id, prof in enumerate(result['profile']):
-        entries = prof['entries']
-        if not entries:
+    writer = ResultJsonWriter(result_json)
+    lvpk = ColumnarWriter(out_dir / 'result.lvpk') if args.columnar else None
+    # --jobs > 1 时 profile 解析与表格导出共用一个进程池，worker 数不超过 jobs
+    executor = ProcessPoolExecutor(max_workers=args.jobs) if args.jobs > 1 else None
+    exporter = CoreExporter(out_dir, export_formats, args.jobs, executor)
+    profile_settings, profile_lod, profile_ok = [], [], False
+    for key, value in result.items():
+        if key != 'profile':
+            if key == 'valid':
+                value['profile'] = profile_ok
+            writer.write_key(key, value)
             continue
-        keys = ['core_id', 'entry_id'] + list({k for e in entries for k in e})
-
-        # ---- CSV ----
-        csv_path = out_dir / f'core_{core_id}.csv'
-        with csv_path.open('w', newline='', encoding='utf-8') as f:
-            import csv
-            writer = csv.DictWriter(f, fieldnames=keys)
-            writer.writeheader()
-            for idx, entry in enumerate(entries):
-                writer.writerow({'core_id': core_id, 'entry_id': idx, **entry})
-        print(f'[csv] 已导出 -> {csv_path}')
-
-        # ---- Excel ----
-        if HAS_EXCEL:
-            xlsx_path = out_dir / f'core_{core_id}.xlsx'
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.append(keys)
-            for idx, entry in enumerate(entries):
-                ws.append([{'core_id': core_id, 'entry_id': idx, **entry}.get(k) for k in keys])
-            wb.save(xlsx_path)
-            print(f'[excel] 已导出 -> {xlsx_path}')
+        writer.begin_list('profile')
+        profiles = iter_profiles(prof_files, bmodel_json, args.jobs, cache, executor, exporter)
+        for core_id, prof in iter_profile_array(profiles):
+            with TIMER.stage('json.write', core=core_id, items_in=len(prof['entries'])):
+                writer.write_item(prof)
+            profile_settings.append(prof['settings'])
+            if lvpk:
+                # 时间轴汇总金字塔（见 lod.py）只随 .lvpk 写出，result.json 不带
+                with TIMER.stage('lvpk.lod', core=core_id, items_in=len(prof['entries'])):
+                    profile_lod.append(build_lod(prof['entries']) if len(prof['entries']) else None)
+                with TIMER.stage('lvpk.write', core=core_id, items_in=len(prof['entries'])):
+                    lvpk.write_core(core_id, prof['entries'])
+            if prof['entries']:
+                profile_ok = True
+                exporter.submit(core_id, prof['entries'])
+            del prof
+        writer.end_list()
+    writer.close()
+    exporter.close()
+    if executor:
+        executor.shutdown()
+    print(f'✅ json 已生成 -> {result_json}')
+    if lvpk:
+        meta = {k: v for k, v in result.items() if k != 'profile'}
+        meta['profileSettings'] = profile_settings
+        meta['profileLod'] = profile_lod
+        lvpk.close(meta)
+        print(f'✅ lvpk 已生成 -> {lvpk.path}')
+    if cache:
+        cache.close()
+        print(f'[cache] 命中 {cache.hits}，重新解析 {cache.misses}')
+    if args.timings is not None:
+        print(TIMER.report())
+        if args.timings:
+            TIMER.write_trace(Path(args.timings))
+            print(f'[timings] trace -> {args.timings}')
 
 # def main():
 #     ap = argparse.ArgumentParser()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+log_parser 的增量解析缓存（放在输出目录 .lvcache/ 下）
+    - 缓存键 = 解析器版本 + 各输入文件指纹（大小、mtime、内容 sha1）+ 附加参数
+    - 值用 pickle 存：各 core 的 profile 结果、bmodel 索引、主日志解析结果
+    - 总大小超过上限时按最近使用时间淘汰
+未改动的文件只在大小 / mtime 变化时才重新计算内容哈希（记在 fingerprints.json）
+"""
+import os
+import sys
+import json
+import pickle
+import hashlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# 解析结果格式变化时手动递增；解析器源码变化也会自动让缓存失效
+CACHE_VERSION = '1'
+CACHE_DIRNAME = '.lvcache'
+HASH_BLOCK = 1 << 20
+
+
+def _sha1_file(path: Path) -> str:
+    h = hashlib.sha1()
+    with path.open('rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def package_modules(anchor: Path) -> List[Path]:
+    """anchor 所在目录下已导入的模块源文件（解析器本身及其导入的同目录模块），按路径排序"""
+    folder = Path(anchor).resolve().parent
+    files = set()
+    for module in list(sys.modules.values()):
+        path = getattr(module, '__file__', None)
+        if path and path.endswith('.py') and Path(path).resolve().parent == folder:
+            files.add(Path(path).resolve())
+    return sorted(files)
+
+
+class ParseCache:
+    def __init__(self, cache_dir: Path, max_bytes: int, code_files: Iterable[Path] = ()):
+        self.dir = Path(cache_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+        h = hashlib.sha1(CACHE_VERSION.encode())
+        for p in code_files:
+            h.update(Path(p).read_bytes())
+        self.version = h.hexdigest()
+        self._fp_path = self.dir / 'fingerprints.json'
+        try:
+            self._fps: Dict[str, list] = json.loads(self._fp_path.read_text())
+        except (OSError, ValueError):
+            self._fps = {}
+
+    # ---- 指纹 ----
+    def fingerprint(self, path: Optional[Path]) -> str:
+        """size:mtime_ns:sha1；大小和 mtime 都没变时沿用上次的内容哈希"""
+        if path is None:
+            return '-'
+        st = path.stat()
+        key = str(path.resolve())
+        old = self._fps.get(key)
+        if old and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+            digest = old[2]
+        else:
+            digest = _sha1_file(path)
+            self._fps[key] = [st.st_size, st.st_mtime_ns, digest]
+        return f'{st.st_size}:{st.st_mtime_ns}:{digest}'
+
+    def key(self, kind: str, inputs: Iterable[Optional[Path]], *extra: Any) -> str:
+        parts = [self.version, kind] + [self.fingerprint(p) for p in inputs] + [repr(x) for x in extra]
+        return f'{kind}-' + hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+    # ---- 读写 ----
+    def has(self, key: str) -> bool:
+        return (self.dir / f'{key}.pkl').exists()
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self.dir / f'{key}.pkl'
+        try:
+            with path.open('rb') as f:
+                value = pickle.load(f)
+        except Exception:  # 缺失、截断或由别的代码版本写入的缓存（unpickle 可能抛任何异常）都按未命中处理
+            return None
+        os.utime(path)  # 记录最近使用时间，供淘汰参考
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any):
+        """写入新解析的结果（misses 即本次重新解析的次数）"""
+        self.misses += 1
+        tmp = self.dir / f'{key}.tmp'
+        with tmp.open('wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(self.dir / f'{key}.pkl')
+
+    def cached(self, key: str, compute: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    # ---- 收尾 ----
+    def close(self):
+        """保存指纹表，并按最近使用时间淘汰到 max_bytes 以内"""
+        self._fp_path.write_text(json.dumps(self._fps))
+        files = sorted(self.dir.glob('*.pkl'), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in files)
+        for p in files:
+            if total <= self.max_bytes:
+                break
+            total -= p.stat().st_size
+            p.unlink()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+大 compiler_profile_<n> 文件的分块并行读取，以及 BD / GDMA 两列的切分（log_parser.py / convert.py 共用）
+    - mmap 整个文件，按换行对齐切成若干字节区间 [lo, hi)
+    - 每个区间交给进程池里的 worker(path, lo, hi) 独立解析，结果按区间顺序取回
+    - worker 用 read_range 只读自己那一段（bytes，由 worker 直接按 bytes 解析），整个文件不会在任何一个进程里完整读入
+区间边界都落在 b'\n' 之后，utf-8 多字节字符和 \r\n 都不会被切开
+"""
+import re
+import mmap
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+from input_files import is_compressed
+
+PARALLEL_MIN_BYTES = 64 << 20     # 小于此大小的文件仍整体读入解析
+CHUNK_BYTES        = 32 << 20     # 每块目标大小（块数至少等于进程数）
+COL_SPLIT_RE       = re.compile(rb'\s{2,}')   # 列位置对不上时的退路：按 2+ 个空白切分
+
+
+def use_chunks(path: Path, jobs: int) -> bool:
+    """压缩文件不能按区间随机读取，总是整体流式解析"""
+    return jobs > 1 and not is_compressed(path) and path.stat().st_size >= PARALLEL_MIN_BYTES
+
+
+def split_ranges(path: Path, n_chunks: int) -> List[Tuple[int, int]]:
+    """切成不超过 n_chunks 个按换行对齐的字节区间（除最后一块外都以 b'\\n' 结尾）"""
+    size = path.stat().st_size
+    if size == 0:
+        return []
+    if n_chunks <= 1:
+        return [(0, size)]
+    bounds = [0]
+    with path.open('rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for k in range(1, n_chunks):
+            nl = mm.find(b'\n', max(size * k // n_chunks, bounds[-1]))
+            if nl < 0 or nl + 1 >= size:
+                break
+            bounds.append(nl + 1)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def read_range(path: Path, lo: int, hi: int) -> bytes:
+    with path.open('rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return mm[lo:hi]
+
+
+def submit_ranges(
+    executor: Executor,
+    path: Path,
+    worker: Callable[[Path, int, int], Any],
+    jobs: int,
+) -> List[Future]:
+    """把文件各区间提交到已有进程池（worker 需为可 pickle 的模块级函数）"""
+    n_chunks = max(jobs, -(-path.stat().st_size // CHUNK_BYTES))
+    return [executor.submit(worker, path, lo, hi) for lo, hi in split_ranges(path, n_chunks)]
+
+
+def map_ranges(
+    path: Path,
+    worker: Callable[[Path, int, int], Any],
+    jobs: int,
+    mp_context=None,
+) -> List[Any]:
+    """用临时进程池并行解析各区间，按区间顺序返回 worker 结果"""
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=mp_context) as pool:
+        return [fut.result() for fut in submit_ranges(pool, path, worker, jobs)]
+
+
+# ----------------------------------------------------------
+# BD / GDMA 两列切分
+# ----------------------------------------------------------
+class ColumnSplitter:
+    """
+    把 profile 的一行（bytes，已去掉行尾空白）切成 (BD 单元格, GDMA 单元格或 None)
+        - 右列起始位置先取自 ENGINE_ 表头里 ENGINE_GDMA 的位置，之后以数据行实际切出的位置为准
+        - 行在该位置恰好是「空格 → 非空格」的边界时直接按位置切：
+          只有 GDMA 的行（左列为空）、op 名里带连续空格的行都能切对
+        - 对不上时（只有 BD 的短行、左列溢出、列宽变化）退回 COL_SPLIT_RE，并用切出的位置更新列号
+    分块解析时区间里没有表头，由前几行数据学到列号
+    """
+    def __init__(self):
+        self.pos = 0    # 右列起始位置，0 表示还不知道
+
+    def learn_header(self, line: bytes):
+        i = line.find(b'ENGINE_GDMA')
+        if i > 0:
+            self.pos = i
+
+    def split(self, line: bytes) -> Tuple[bytes, Optional[bytes]]:
+        pos = self.pos
+        if 0 < pos < len(line) and line[pos - 1] == 32 and line[pos] != 32:
+            return line[:pos].rstrip(), line[pos:]
+        m = COL_SPLIT_RE.search(line)
+        if m is None:
+            return line, None
+        self.pos = m.end()
+        return line[:m.start()], line[m.end():]
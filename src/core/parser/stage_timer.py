@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析各阶段的耗时记录（log_parser.py --timings）
+    - TIMER.stage(name, **args)：记录一段连续阶段的墙钟时间、CPU 时间、峰值 RSS 增量和输入 / 输出条数
+    - merge=True 的阶段（逐段调用的 lmem / timestep 解析）累加成一条记录
+    - 进程池里的阶段经 TracedExecutor 带回主进程，每个 worker 进程在 trace 里是一条独立的轨道
+    - report() 汇总成表格；chrome_trace() 输出 Chrome trace-event JSON（chrome://tracing / Perfetto 可直接打开）
+未启用时 stage() 只做一次判断，几乎没有开销
+"""
+import os
+import sys
+import time
+import json
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource：不记录 RSS
+    resource = None
+
+# ru_maxrss 在 Linux 上是 KB，macOS 上是字节
+_RSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+def _max_rss() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT if resource else 0
+
+
+class Span:
+    """一个阶段的记录；跨进程传递时转成 tuple"""
+    __slots__ = ('name', 'start', 'wall', 'cpu', 'rss', 'pid', 'args', 'calls')
+
+    def __init__(self, name: str, start: float, pid: int, args: Dict[str, Any]):
+        self.name = name
+        self.start = start          # time.perf_counter()（同一台机器上各进程共用单调时钟）
+        self.wall = self.cpu = 0.0
+        self.rss = 0                # 峰值 RSS 增量（字节）
+        self.pid = pid
+        self.args = args            # items_in / items_out 等计数
+        self.calls = 0
+
+    def set(self, **args):
+        self.args.update(args)
+
+    def add(self, **args):
+        """计数累加（merge 阶段逐次调用时用）"""
+        for k, v in args.items():
+            self.args[k] = self.args.get(k, 0) + v
+
+    def to_tuple(self) -> tuple:
+        return (self.name, self.start, self.wall, self.cpu, self.rss, self.pid, self.args, self.calls)
+
+    @classmethod
+    def from_tuple(cls, t: tuple) -> 'Span':
+        span = cls(t[0], t[1], t[5], t[6])
+        span.wall, span.cpu, span.rss, span.calls = t[2], t[3], t[4], t[7]
+        return span
+
+
+class _NullSpan:
+    def set(self, **args):
+        pass
+
+    add = set
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class StageTimer:
+    def __init__(self):
+        self.enabled = False
+        self.origin = 0.0
+        self.spans: List[Span] = []
+        self._merged: Dict[str, Span] = {}
+
+    def enable(self):
+        self.enabled = True
+        self.origin = time.perf_counter()
+        self.spans = []
+        self._merged = {}
+
+    @contextmanager
+    def stage(self, name: str, merge: bool = False, **args) -> Iterator[Any]:
+        if not self.enabled:
+            yield _NULL_SPAN
+            return
+        span = self._merged.get(name) if merge else None
+        if span is None:
+            span = Span(name, time.perf_counter(), os.getpid(), {})
+            self.spans.append(span)
+            if merge:
+                self._merged[name] = span
+        if merge:
+            span.add(**args)
+        else:
+            span.set(**args)
+        rss0, cpu0, t0 = _max_rss(), time.process_time(), time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.wall += time.perf_counter() - t0
+            span.cpu += time.process_time() - cpu0
+            span.rss = max(span.rss, _max_rss() - rss0)
+            span.calls += 1
+
+    # ---- 跨进程 ----
+    def drain(self) -> List[tuple]:
+        spans, self.spans, self._merged = self.spans, [], {}
+        return [s.to_tuple() for s in spans]
+
+    def absorb(self, spans: List[tuple]):
+        self.spans.extend(Span.from_tuple(t) for t in spans)
+
+    # ---- 输出 ----
+    def report(self) -> str:
+        """按阶段名汇总（同名阶段合计，按首次出现顺序）"""
+        rows: Dict[str, List[Any]] = {}
+        for s in self.spans:
+            r = rows.setdefault(s.name, [0, 0.0, 0.0, 0, 0, 0])
+            r[0] += s.calls
+            r[1] += s.wall
+            r[2] += s.cpu
+            r[3] = max(r[3], s.rss)
+            r[4] += s.args.get('items_in', 0)
+            r[5] += s.args.get('items_out', 0)
+        lines = [f"{'stage':24s} {'calls':>6s} {'wall(s)':>9s} {'cpu(s)':>9s} "
+                 f"{'dRSS(MB)':>9s} {'in':>12s} {'out':>12s}"]
+        for name, (calls, wall, cpu, rss, n_in, n_out) in rows.items():
+            lines.append(f'{name:24s} {calls:6d} {wall:9.3f} {cpu:9.3f} {rss / 2**20:9.1f} '
+                         f'{n_in or "":>12} {n_out or "":>12}')
+        lines.append(f'elapsed {time.perf_counter() - self.origin:.3f}s')
+        return '\n'.join(lines)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """每个进程一条轨道（tid = 进程号），时间单位微秒"""
+        main_pid = os.getpid()
+        events = []
+        for pid in dict.fromkeys(s.pid for s in self.spans):
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': main_pid, 'tid': pid,
+                           'args': {'name': 'main' if pid == main_pid else f'worker {pid}'}})
+        for s in self.spans:
+            args = {**s.args, 'cpu_ms': round(s.cpu * 1e3, 3), 'rss_delta_mb': round(s.rss / 2**20, 2)}
+            if s.calls > 1:
+                args['merged_calls'] = s.calls
+            events.append({
+                'name': s.name, 'cat': s.name.split('.')[0], 'ph': 'X',
+                'ts': round((s.start - self.origin) * 1e6, 1), 'dur': round(s.wall * 1e6, 1),
+                'pid': main_pid, 'tid': s.pid, 'args': args,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_trace(self, path: Path):
+        Path(path).write_text(json.dumps(self.chrome_trace()))
+
+
+TIMER = StageTimer()
+
+
+# ----------------------------------------------------------
+# 进程池：worker 里的阶段随结果一起带回
+# ----------------------------------------------------------
+def traced_call(fn: Callable, *args) -> Tuple[Any, List[tuple]]:
+    """在 worker 进程里启用记录并执行 fn（需保持模块级函数）"""
+    TIMER.enable()
+    result = fn(*args)
+    return result, TIMER.drain()
+
+
+class _TracedFuture:
+    def __init__(self, fut):
+        self.fut = fut
+        self._done = False
+        self._result = None
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        if not self._done:
+            self._result, spans = self.fut.result(timeout)
+            TIMER.absorb(spans)
+            self._done = True
+        return self._result
+
+
+class TracedExecutor:
+    """包一层 Executor：TIMER 启用时 submit 的任务在 worker 里也记录阶段"""
+    def __init__(self, executor: Executor):
+        self.executor = executor
+
+    def submit(self, fn: Callable, *args):
+        if not TIMER.enabled:
+            return self.executor.submit(fn, *args)
+        return _TracedFuture(self.executor.submit(traced_call, fn, *args))
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+profile entries 的表格导出（core_<n>.csv / .xlsx / .parquet）
+    - 固定列顺序 EXPORT_COLUMNS，与 entries 里出现了哪些键无关，每次运行列都一样
+    - 直接从 EntryColumns 的列按批（BATCH_ROWS 行）取值，整批写出，不为每行拼 dict
+    - xlsx 用 openpyxl 的 write-only 模式流式写，超过单表行数上限时自动分表
+    - parquet 需要 pyarrow，按批写 row group
+    - CoreExporter：与 profile 解析共用同一个进程池并行导出；在 worker 里解析的 core 由该 worker 就地导出
+openpyxl / pyarrow 都是可选依赖，没装时对应格式不可用（default_formats 不包含）
+"""
+import csv
+import json
+import collections
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from columnar import ENGINES, MISSING, NO_BOOL, NO_STR, EntryColumns
+from stage_timer import TIMER, TracedExecutor
+
+try:
+    import openpyxl
+except ImportError:  # 可选依赖：xlsx 导出
+    openpyxl = None
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 可选依赖：parquet 导出
+    pa = pq = None
+
+EXPORT_COLUMNS = [
+    'core_id', 'entry_id', 'engine', 'op', 'type', 'start', 'end', 'cost',
+    'bd_id', 'gdma_id', 'direction', 'size', 'bandwidth', 'file_line', 'info', 'isSL',
+]
+BATCH_ROWS    = 1 << 16
+XLSX_MAX_ROWS = 1_048_576 - 1     # Excel 单表行数上限（去掉表头）
+FORMATS       = ('csv', 'xlsx', 'parquet')
+
+
+def default_formats() -> List[str]:
+    """csv 总是导出；装了 openpyxl / pyarrow 时同时导出 xlsx / parquet"""
+    return ['csv'] + (['xlsx'] if openpyxl else []) + (['parquet'] if pa else [])
+
+
+# ----------------------------------------------------------
+# 1. 取列
+# ----------------------------------------------------------
+Entries = Union[EntryColumns, List[Dict[str, Any]]]
+
+
+def column_batches(core_id: int, entries: Entries) -> Iterator[List[list]]:
+    """
+    按 EXPORT_COLUMNS 顺序产出每批的列（list 的 list），缺失值为 None
+    file_line 还原成原来的值（与 result.json 相同），其余为 int / float / str / bool
+    """
+    n = len(entries)
+    if not isinstance(entries, EntryColumns):
+        for lo in range(0, n, BATCH_ROWS):
+            rows = entries[lo:lo + BATCH_ROWS]
+            cols = [[core_id] * len(rows), list(range(lo, lo + len(rows)))]
+            cols += [[e.get(k) for e in rows] for k in EXPORT_COLUMNS[2:]]
+            yield cols
+        return
+
+    strs = entries.strings.strings
+    text_of = lambda v: None if v == NO_STR else strs[v]
+    file_lines: Dict[int, Any] = {}
+
+    def file_line_of(v):
+        if v == NO_STR:
+            return None
+        if v not in file_lines:
+            file_lines[v] = json.loads(strs[v])
+        return file_lines[v]
+
+    for lo in range(0, n, BATCH_ROWS):
+        hi = min(lo + BATCH_ROWS, n)
+        cols = [[core_id] * (hi - lo), list(range(lo, hi)),
+                [ENGINES[c] for c in entries.engine[lo:hi]]]
+        for k in ('op', 'type'):
+            cols.append([text_of(v) for v in getattr(entries, k)[lo:hi]])
+        for k in ('start', 'end', 'cost', 'bd_id', 'gdma_id', 'direction', 'size'):
+            cols.append([None if v == MISSING else v for v in getattr(entries, k)[lo:hi]])
+        cols.append([v if v == v else None for v in entries.bandwidth[lo:hi]])
+        cols.append([file_line_of(v) for v in entries.file_line[lo:hi]])
+        cols.append([text_of(v) for v in entries.info[lo:hi]])
+        cols.append([None if v == NO_BOOL else bool(v) for v in entries.isSL[lo:hi]])
+        yield cols
+
+
+# ----------------------------------------------------------
+# 2. 各格式
+# ----------------------------------------------------------
+def export_csv(path: Path, core_id: int, entries: Entries):
+    with path.open('w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_COLUMNS)
+        for cols in column_batches(core_id, entries):
+            writer.writerows(zip(*cols))
+
+
+def export_xlsx(path: Path, core_id: int, entries: Entries):
+    """write-only 模式逐行流式写，内存与行数无关；超过 XLSX_MAX_ROWS 行换新表"""
+    wb = openpyxl.Workbook(write_only=True)
+    ws, n_rows, n_sheets = None, XLSX_MAX_ROWS, 0
+    fl = EXPORT_COLUMNS.index('file_line')
+    for cols in column_batches(core_id, entries):
+        cols[fl] = [None if v is None else str(v) for v in cols[fl]]  # 单元格不能放 list
+        for row in zip(*cols):
+            if n_rows >= XLSX_MAX_ROWS:
+                n_sheets += 1
+                ws = wb.create_sheet(f'core_{core_id}' + (f' ({n_sheets})' if n_sheets > 1 else ''))
+                ws.append(EXPORT_COLUMNS)
+                n_rows = 0
+            ws.append(row)
+            n_rows += 1
+    if ws is None:
+        wb.create_sheet(f'core_{core_id}').append(EXPORT_COLUMNS)
+    wb.save(path)
+
+
+def _arrow_schema():
+    int_cols = {'core_id', 'entry_id', 'start', 'end', 'cost', 'bd_id', 'gdma_id', 'direction', 'size'}
+    fields = []
+    for k in EXPORT_COLUMNS:
+        if k in int_cols:
+            fields.append(pa.field(k, pa.int64()))
+        elif k == 'bandwidth':
+            fields.append(pa.field(k, pa.float64()))
+        elif k == 'isSL':
+            fields.append(pa.field(k, pa.bool_()))
+        else:
+            fields.append(pa.field(k, pa.string()))
+    return pa.schema(fields)
+
+
+def export_parquet(path: Path, core_id: int, entries: Entries):
+    """每批一个 row group；file_line 存 JSON 文本"""
+    schema = _arrow_schema()
+    fl = EXPORT_COLUMNS.index('file_line')
+    with pq.ParquetWriter(str(path), schema) as writer:
+        for cols in column_batches(core_id, entries):
+            cols[fl] = [None if v is None else json.dumps(v) for v in cols[fl]]
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(c, type=f.type) for c, f in zip(cols, schema)], schema=schema))
+
+
+EXPORTERS = {'csv': export_csv, 'xlsx': export_xlsx, 'parquet': export_parquet}
+LABELS = {'csv': 'csv', 'xlsx': 'excel', 'parquet': 'parquet'}
+
+
+def check_formats(formats: Iterable[str]) -> List[str]:
+    """校验格式名与对应可选依赖"""
+    formats = list(formats)
+    for fmt in formats:
+        if fmt not in EXPORTERS:
+            raise ValueError(f'未知的导出格式: {fmt}（可选 {", ".join(FORMATS)}）')
+        if fmt == 'xlsx' and openpyxl is None:
+            raise ImportError('xlsx 导出需要安装 openpyxl')
+        if fmt == 'parquet' and pa is None:
+            raise ImportError('parquet 导出需要安装 pyarrow')
+    return formats
+
+
+def export_core(out_dir: Path, core_id: int, entries: Entries,
+                formats: Optional[Iterable[str]] = None):
+    """导出单个 core 的各格式表格（作为进程池 worker 需保持模块级函数）"""
+    for fmt in check_formats(default_formats() if formats is None else formats):
+        path = out_dir / f'core_{core_id}.{fmt}'
+        with TIMER.stage(f'export.{fmt}', core=core_id, items_in=len(entries)):
+            EXPORTERS[fmt](path, core_id, entries)
+        print(f'[{LABELS[fmt]}] 已导出 -> {path}')
+
+
+# ----------------------------------------------------------
+# 3. 多 core 并行
+# ----------------------------------------------------------
+class CoreExporter:
+    """
+    逐个 core 提交导出；给出 executor（log_parser 解析 profile 的进程池）时交给它并行，主进程继续解析 / 写 json
+    不自己起进程池，导出与解析共用同一组 worker，进程数不超过 --jobs
+    在 worker 里解析的 core 先经 claim 认领、由该 worker 解析完就地导出，entries 不必再 pickle 一次
+    同时在途的 core 不超过 jobs 个，避免排队的 entries 堆积在内存里
+    """
+    def __init__(self, out_dir: Path, formats: Optional[Iterable[str]] = None, jobs: int = 1,
+                 executor: Optional[Executor] = None):
+        self.out_dir = out_dir
+        self.formats = check_formats(default_formats() if formats is None else formats)
+        self.jobs = jobs
+        self.pool = TracedExecutor(executor) if executor is not None and self.formats else None
+        self.pending = collections.deque()
+        self.claimed: Set[int] = set()
+
+    def claim(self, core_id: int) -> Optional[Tuple[Path, List[str]]]:
+        """解析 worker 认领 core_id 的导出，返回 export_core 的 (out_dir, formats)；之后 submit 跳过该 core"""
+        if not self.formats:
+            return None
+        self.claimed.add(core_id)
+        return self.out_dir, self.formats
+
+    def submit(self, core_id: int, entries: Entries):
+        if not self.formats or core_id in self.claimed:
+            return
+        if self.pool is None:
+            export_core(self.out_dir, core_id, entries, self.formats)
+            return
+        while len(self.pending) >= self.jobs:
+            self.pending.popleft().result()
+        self.pending.append(self.pool.submit(export_core, self.out_dir, core_id, entries, self.formats))
+
+    def close(self):
+        """等在途的导出完成；进程池归调用方所有，不在这里关闭"""
+        while self.pending:
+            self.pending.popleft().result()
+
+    def __enter__(self) -> 'CoreExporter':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
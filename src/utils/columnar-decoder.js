@@ -0,0 +1,242 @@
+/**
+ * LVPK 列式结果文件解码（格式定义见 src/core/parser/columnar.py）
+ * 各列直接用 TypedArray 视图读取，不做文本解析
+ * 每个 core 的主结果是列（columns），entry 对象只在访问时生成：
+ *   - profile[i].entries 首次读取时才整 core 转成对象（只看过的 core 付出对象开销）
+ *   - queryEntries(profile[i], t0, t1) 只为时间窗口内的行生成对象
+ * @module utils/columnar-decoder
+ */
+
+const MAGIC = 'LVPK'
+const NO_STR = 0xFFFFFFFF
+const NO_BOOL = 0xFF
+const TYPED = { d: Float64Array, I: Uint32Array, B: Uint8Array }
+
+/* 还原 entry 时的键顺序，与 result.json 一致 */
+const INSTR_KEYS = ['op', 'type', 'start', 'bd_id', 'gdma_id', 'end', 'cost', 'direction', 'size', 'bandwidth']
+const LAYER_KEYS = ['op', 'type', 'start', 'end', 'cost', 'file_line', 'info', 'isSL']
+const STR_FIELDS = new Set(['op', 'type', 'info'])
+
+const pad8 = n => (8 - (n % 8)) % 8
+
+/* profile 上挂的解码上下文（块列表 + 字符串表），不可枚举，不随 Object.assign / JSON 复制 */
+const LVPK_SOURCE = Symbol('lvpk')
+
+/**
+ * 判断 ArrayBuffer 是否为 LVPK 文件
+ * @param {ArrayBuffer} buffer
+ * @returns {boolean}
+ */
+export function isColumnar(buffer) {
+  if (buffer.byteLength < 8) return false
+  return String.fromCharCode(...new Uint8Array(buffer, 0, 4)) === MAGIC
+}
+
+/**
+ * 遍历 chunk
+ * @param {ArrayBuffer} buffer
+ * @returns {Array<{tag: string, offset: number, length: number}>}
+ */
+export function listChunks(buffer) {
+  const view = new DataView(buffer)
+  const chunks = []
+  let pos = 8
+  while (pos + 16 <= buffer.byteLength) {
+    const tag = String.fromCharCode(...new Uint8Array(buffer, pos, 4))
+    const length = Number(view.getBigUint64(pos + 8, true))
+    chunks.push({ tag, offset: pos + 16, length })
+    pos += 16 + length + pad8(length)
+  }
+  return chunks
+}
+
+function decodeStrings(buffer, offset) {
+  const view = new DataView(buffer)
+  const count = view.getUint32(offset, true)
+  const offsets = new Uint32Array(buffer, offset + 4, count + 1)
+  const base = offset + 4 + 4 * (count + 1)
+  const decoder = new TextDecoder()
+  const bytes = new Uint8Array(buffer)
+  const out = new Array(count)
+  for (let i = 0; i < count; i++) {
+    out[i] = decoder.decode(bytes.subarray(base + offsets[i], base + offsets[i + 1]))
+  }
+  return out
+}
+
+/**
+ * 读取一个 CORE chunk 的所有列（零拷贝 TypedArray 视图）
+ * @param {ArrayBuffer} buffer
+ * @param {number} offset  payload 偏移
+ * @param {Array<[string, string]>} columns  [列名, typecode]
+ * @returns {{coreId: number, length: number, columns: Object<string, TypedArray>}}
+ */
+export function readCoreColumns(buffer, offset, columns) {
+  const view = new DataView(buffer)
+  const coreId = view.getUint32(offset, true)
+  const n = view.getUint32(offset + 4, true)
+  let pos = offset + 8
+  const cols = {}
+  for (const [name, code] of columns) {
+    const Typed = TYPED[code]
+    cols[name] = new Typed(buffer, pos, n)
+    const size = n * Typed.BYTES_PER_ELEMENT
+    pos += size + pad8(size)
+  }
+  return { coreId, length: n, columns: cols }
+}
+
+/**
+ * 第 i 行还原成 entry 对象
+ * @param {Object<string, TypedArray>} cols
+ * @param {number} i
+ * @param {string[]} strings
+ * @param {string[]} engines
+ * @returns {Object}
+ */
+export function entryAt(cols, i, strings, engines) {
+  const engine = engines[cols.engine[i]]
+  const e = { engine }
+  for (const k of engine === 'LAYER' ? LAYER_KEYS : INSTR_KEYS) {
+    const v = cols[k][i]
+    if (STR_FIELDS.has(k)) {
+      if (v !== NO_STR) e[k] = strings[v]
+    } else if (k === 'file_line') {
+      if (v !== NO_STR) e[k] = JSON.parse(strings[v])
+    } else if (k === 'isSL') {
+      if (v !== NO_BOOL) e[k] = v === 1
+    } else if (!Number.isNaN(v)) {
+      e[k] = v
+    }
+  }
+  return e
+}
+
+/**
+ * 列转成 entry 对象数组（兼容现有按对象读取的视图）
+ * @param {Object<string, TypedArray>} cols
+ * @param {number} n
+ * @param {string[]} strings
+ * @param {string[]} engines
+ * @returns {Array<Object>}
+ */
+export function columnsToEntries(cols, n, strings, engines) {
+  const out = new Array(n)
+  for (let i = 0; i < n; i++) out[i] = entryAt(cols, i, strings, engines)
+  return out
+}
+
+/**
+ * 把 prof.entries 定义成惰性属性：首次读取时才由列生成对象数组并缓存；也可直接赋值覆盖
+ * @param {Object} prof
+ * @param {() => Array<Object>} build
+ */
+function defineLazyEntries(prof, build) {
+  const settle = value => {
+    Object.defineProperty(prof, 'entries', { value, writable: true, enumerable: true, configurable: true })
+    return value
+  }
+  Object.defineProperty(prof, 'entries', {
+    get: () => settle(build()),
+    set: settle,
+    enumerable: true,
+    configurable: true,
+  })
+}
+
+/**
+ * 某个 core 与时间窗口 [t0, t1) 相交的 entries（与 columnar.py 的 ColumnarReader.query 相同）
+ * 相交：start < t1 且（start >= t0 或 end > t0）；只为相交的行生成对象，
+ * 整块都在窗口外的块（按块内 start 最小值 / end 最大值判断）直接跳过
+ * @param {Object} prof  decodeColumnar 返回的 profile[i]
+ * @param {number} t0
+ * @param {number} t1
+ * @returns {Array<Object>}
+ */
+export function queryEntries(prof, t0, t1) {
+  const src = prof?.[LVPK_SOURCE]
+  if (!src) return (prof?.entries ?? []).filter(e => e.start < t1 && (e.start >= t0 || e.end > t0))
+  const out = []
+  for (const block of src.blocks) {
+    const { start, end } = block.columns
+    if (!block.length || start[0] >= t1 || blockMaxEnd(block) < t0) continue
+    for (let i = 0; i < block.length; i++) {
+      if (start[i] < t1 && (start[i] >= t0 || end[i] > t0)) {
+        out.push(entryAt(block.columns, i, src.strings, src.engines))
+      }
+    }
+  }
+  return out
+}
+
+/* 块内 end 最大值，首次查询时计算并缓存 */
+function blockMaxEnd(block) {
+  if (block.maxEnd === undefined) {
+    let m = -Infinity
+    for (const v of block.columns.end) if (v > m) m = v
+    block.maxEnd = m
+  }
+  return block.maxEnd
+}
+
+/**
+ * 解码 LVPK 为与 result.json 相同的结构
+ * 每个 profile 带 columns（TypedArray 列）和 length；entries 为惰性属性，读取时才生成对象
+ * @param {ArrayBuffer} buffer
+ * @returns {Object}
+ */
+export function decodeColumnar(buffer) {
+  if (!isColumnar(buffer)) throw new Error('不是 LVPK 文件')
+  const chunks = listChunks(buffer)
+  let strings = []
+  let meta = {}
+  for (const c of chunks) {
+    if (c.tag === 'STRS') strings = decodeStrings(buffer, c.offset)
+    else if (c.tag === 'META') meta = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, c.offset, c.length)))
+  }
+  const { profileSettings = [], profileLod = [], columns, engines, ...rest } = meta
+  const profile = profileSettings.map((settings, i) => {
+    const prof = { settings, entries: [], columns: null }
+    if (profileLod[i]) prof.lod = profileLod[i]   // 时间轴汇总金字塔（见 lod.py）
+    return prof
+  })
+  // v2 起一个 core 的 entries 分成多个 CORE 块（按 start 顺序），逐块追加
+  const blocks = new Map()
+  for (const c of chunks) {
+    if (c.tag !== 'CORE') continue
+    const core = readCoreColumns(buffer, c.offset, columns)
+    if (!blocks.has(core.coreId)) blocks.set(core.coreId, [])
+    blocks.get(core.coreId).push(core)
+  }
+  for (const [coreId, parts] of blocks) {
+    const target = profile[coreId] ?? (profile[coreId] = { settings: {}, entries: [] })
+    const cols = parts.length === 1 ? parts[0].columns : concatColumns(parts, columns)
+    const length = parts.reduce((n, p) => n + p.length, 0)
+    target.columns = cols
+    target.length = length
+    Object.defineProperty(target, LVPK_SOURCE, { value: { blocks: parts, strings, engines } })
+    defineLazyEntries(target, () => columnsToEntries(cols, length, strings, engines))
+  }
+  return { ...rest, profile }
+}
+
+/**
+ * 把同一 core 的多个块的列拼成连续的 TypedArray
+ * @param {Array<{length: number, columns: Object<string, TypedArray>}>} parts
+ * @param {Array<[string, string]>} columns
+ * @returns {Object<string, TypedArray>}
+ */
+function concatColumns(parts, columns) {
+  const total = parts.reduce((n, p) => n + p.length, 0)
+  const cols = {}
+  for (const [name, code] of columns) {
+    const out = new TYPED[code](total)
+    let pos = 0
+    for (const p of parts) {
+      out.set(p.columns[name], pos)
+      pos += p.length
+    }
+    cols[name] = out
+  }
+  return cols
+}
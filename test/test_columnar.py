@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+result.lvpk 往返：read_columnar 还原的 entries 与 result.json 的值和键顺序都一致
+usage:
+    python -m pytest test/
+"""
+import sys
+import json
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / 'src' / 'core' / 'parser'))
+import log_parser as lp                              # noqa: E402
+from columnar import read_columnar, write_columnar   # noqa: E402
+
+PROFILE = '\n'.join([
+    'ENGINE_BD                                ENGINE_GDMA',
+    '-' * 60,
+    'Conv2D_1|AR|s:0|b:1|g:0|e:5|t:5'.ljust(41)
+    + 'Load_1|DMA_tensor|s:1|b:0|g:1|e:9|t:8|dr:0|sz:512|bw:1.25',
+    'Conv2D_2|AR|s:6|b:2|g:1|e:10|t:4',
+    ' ' * 41 + 'Store_2|DMA_tensor|s:10|b:2|g:2|e:20|t:10|dr:1|sz:1024|bw:2.50',
+    '-' * 60,
+    'API_END total_cycle:20|b:2|g:2',
+]) + '\n'
+
+# LayerExtractor 产出的 layer entry（键顺序与 result.json 相同）
+LAYER = {'engine': 'LAYER', 'op': 'tpu.Conv2D', 'type': 'local', 'start': 0, 'end': 10,
+         'cost': 10, 'file_line': [12, 34], 'info': 'in: 1x3x8x8', 'isSL': False}
+
+
+def as_json(entries):
+    """与写进 result.json 再读回的 entries 相同"""
+    return json.loads(json.dumps(list(entries)))
+
+
+def test_roundtrip_key_order(tmp_path):
+    prof = lp.ProfileParser().parse(PROFILE)[0]
+    result = {
+        'chip': None,
+        'profile': [
+            {'settings': prof['settings'], 'entries': prof['entries']},
+            {'settings': {}, 'entries': [LAYER]},
+        ],
+    }
+    expected = [as_json(prof['entries']), [LAYER]]
+    path = tmp_path / 'result.lvpk'
+    write_columnar(result, path)
+    got = read_columnar(path)
+
+    assert [p['entries'] for p in got['profile']] == expected
+    for got_core, exp_core in zip(got['profile'], expected):
+        assert [list(e) for e in got_core['entries']] == [list(e) for e in exp_core]
+    assert got['profile'][0]['settings'] == prof['settings']
+    assert list(expected[0][0]) == ['engine', 'op', 'type', 'start', 'bd_id', 'gdma_id', 'end', 'cost']
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+convert.py（脚本，按子进程运行）
+    - layer 区间：算子的指令 id 为 tiu_dma_id(before) .. (after)-1（log_parser 为 before+1 .. after）
+    - bmodel.json 损坏时打印解析诊断
+usage:
+    python -m pytest test/
+"""
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+PARSER = ROOT / 'src' / 'core' / 'parser'
+sys.path.insert(0, str(PARSER))
+from log_parser import BmodelIndex   # noqa: E402
+
+BD_COL = 41
+PROFILE = '\n'.join([
+    'ENGINE_BD'.ljust(BD_COL) + 'ENGINE_GDMA',
+    '-' * 80,
+    'Conv2D_1|AR|s:0|b:1|g:0|e:10|t:10'.ljust(BD_COL)
+    + 'Load_1|DMA_tensor|s:5|b:1|g:1|e:15|t:10|dr:0|sz:512|bw:1.25',
+    'Conv2D_2|AR|s:10|b:2|g:1|e:20|t:10',
+    'Conv2D_3|AR|s:20|b:3|g:1|e:30|t:10'.ljust(BD_COL)
+    + 'Store_2|DMA_tensor|s:25|b:3|g:2|e:35|t:10|dr:1|sz:512|bw:1.25',
+    'Conv2D_4|AR|s:30|b:4|g:2|e:40|t:10',
+    '-' * 80,
+    'API_END total_cycle:40|b:4|g:2',
+]) + '\n'
+
+
+def op(file_line, before, after):
+    return {'opcode': 'tpu.Conv2D', 'file-line': file_line, 'core_id': 0,
+            'tiu_dma_id(before)': before, 'tiu_dma_id(after)': after,
+            'operands': [], 'results': [], 'is_local': False}
+
+
+BMODEL = [op(12, [0, 0], [2, 1]), op(34, [2, 1], [4, 2])]
+
+
+def run_convert(tmp_path, bmodel_text):
+    (tmp_path / 'compiler_profile_0').write_text(PROFILE)
+    bmodel = tmp_path / 'bmodel.json'
+    bmodel.write_text(bmodel_text)
+    out_js = tmp_path / 'profile_data.js'
+    proc = subprocess.run([sys.executable, str(PARSER / 'convert.py'),
+                           str(tmp_path / 'compiler_profile_0'), str(bmodel), str(out_js)],
+                          cwd=PARSER, capture_output=True, text=True, check=True)
+    return proc.stdout, out_js
+
+
+def js_array(out_js, name):
+    for line in out_js.read_text(encoding='utf-8').splitlines():
+        if line.startswith(f'{name} = '):
+            return json.loads(line[len(name) + 3:].rstrip(';'))
+    raise KeyError(name)
+
+
+def test_layer_boundaries(tmp_path):
+    _, out_js = run_convert(tmp_path, json.dumps(BMODEL))
+    layers = [row for row in js_array(out_js, 'window.time_data0') if row[0] == 2]
+    # 算子 12：BD 0..1（只有 bd 1）；算子 34：BD 2..3 + GDMA 1
+    assert [(row[5], row[1], row[2]) for row in layers] == [(12, 0.0, 0.01), (34, 0.005, 0.03)]
+
+
+def test_index_ranges(tmp_path):
+    path = tmp_path / 'bmodel.json'
+    path.write_text(json.dumps(BMODEL))
+    index = BmodelIndex.load(path)
+    assert index.ranges_for_core(0) == [(1, 3, 1, 2), (3, 5, 2, 3)]
+    assert index.ranges_for_core(0, -1) == [(0, 2, 0, 1), (2, 4, 1, 2)]
+
+
+def test_broken_bmodel_diagnostics(tmp_path):
+    stdout, out_js = run_convert(tmp_path, '[{"opcode": "tpu.Conv2D", ')
+    assert 'JSON解析失败' in stdout and '错误上下文' in stdout
+    assert not [row for row in js_array(out_js, 'window.time_data0') if row[0] == 2]
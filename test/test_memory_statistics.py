@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MemoryStatistics.calculate_all_statistics()
+    - 手算的小例子：分配 / 释放交叠、失败分配、回卷（timestep_end < timestep_start）、
+      hold_in_lmem 常驻、同一 bank 的多个分配，逐 step 核对 stepStatistics / summary
+    - python 扫描线与 numpy 活跃矩阵两个后端在随机分配组上输出一致（没装 numpy 时跳过）
+usage:
+    python -m pytest test/
+"""
+import sys
+import random
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / 'src' / 'core' / 'parser'))
+import log_parser as lp   # noqa: E402
+
+LMEM_TYPES = ['LMEM_ACTIVATION', 'LMEM_WEIGHT', 'LMEM_OPERATION']
+SETTINGS = {'allow_bank_conflict': 1, 'shape_secs': '1,1,1,1,1'}
+SETTINGS_KEY = '{"allow_bank_conflict": 1, "shape_secs": "1,1,1,1,1"}'
+
+
+def alloc(addr, size, start, end, bank, status, lmem_type, hold=0, max_ts=3):
+    return {'addr': addr, 'size': size, 'timestep_start': start, 'timestep_end': end,
+            'bank_id': bank, 'status': status, 'lmem_type': lmem_type,
+            'hold_in_lmem': hold, 'max_timestep': max_ts}
+
+
+def calculate(groups, ts_counts, backend='python'):
+    stats = lp.MemoryStatistics(backend)
+    stats.set_lmem_data(groups, ts_counts)
+    return stats.calculate_all_statistics()
+
+
+# ----------------------------------------------------------
+# 1. 手算例子
+# ----------------------------------------------------------
+#   A: [0, 100)    step 0-1  bank 0
+#   B: [100, 150)  step 1-2  bank 0（step 1 与 A 同 bank）
+#   C: [300, 500)  3 → 0 回卷：step 3 和 step 0，失败分配
+#   D: [600, 640)  hold_in_lmem：所有 step
+HAND_GROUP = {
+    'settings': SETTINGS,
+    'allocations': [
+        alloc(0, 100, 0, 1, 0, 'success', 'LMEM_ACTIVATION'),
+        alloc(100, 50, 1, 2, 0, 'success', 'LMEM_WEIGHT'),
+        alloc(300, 200, 3, 0, 1, 'failed', 'LMEM_ACTIVATION'),
+        alloc(600, 40, 2, 2, 2, 'success', 'LMEM_OPERATION', hold=1),
+    ],
+}
+
+
+def bank(used, count, largest):
+    return {'usedMemory': used, 'allocationCount': count,
+            'averageAllocationSize': used / count, 'largestAllocation': largest}
+
+
+def step(i, used, peak, count, banks, succ, gap, types):
+    return {
+        'step': i, 'settingsKey': SETTINGS_KEY,
+        'totalMemory': 640, 'usedMemory': used, 'freeMemory': 640 - used,
+        'memoryUsagePercentage': used / 640 * 100, 'peakMemory': peak,
+        'allocationCount': count, 'activeAllocations': count,
+        'bankStatistics': banks,
+        'detailedStats': {
+            'successfulAllocations': succ, 'failedAllocations': count - succ,
+            'successRate': succ / count * 100, 'averageAllocationSize': used / count,
+            'memoryFragmentation': gap / 640 * 100, 'allocationTypes': types,
+        },
+    }
+
+
+HAND_STEPS = [
+    step(0, 340, 200, 3, {0: bank(100, 1, 100), 1: bank(200, 1, 200), 2: bank(40, 1, 40)},
+         2, 200 + 100, {'LMEM_ACTIVATION': 2, 'LMEM_OPERATION': 1}),
+    step(1, 190, 100, 3, {0: bank(150, 2, 100), 2: bank(40, 1, 40)},
+         3, 0 + 450, {'LMEM_ACTIVATION': 1, 'LMEM_WEIGHT': 1, 'LMEM_OPERATION': 1}),
+    step(2, 90, 50, 2, {0: bank(50, 1, 50), 2: bank(40, 1, 40)},
+         2, 450, {'LMEM_WEIGHT': 1, 'LMEM_OPERATION': 1}),
+    step(3, 240, 200, 2, {1: bank(200, 1, 200), 2: bank(40, 1, 40)},
+         1, 100, {'LMEM_ACTIVATION': 1, 'LMEM_OPERATION': 1}),
+]
+
+
+def test_hand_computed():
+    out = calculate([HAND_GROUP], 3)
+    group = out['groups'][0]
+    assert group['settings'] == SETTINGS
+    assert group['stepStatistics'] == HAND_STEPS
+    assert group['summary'] == {
+        'totalAllocations': 4, 'successfulAllocations': 3, 'failedAllocations': 1,
+        'successRate': 75.0, 'maxMemoryUsage': 340,
+        'averageMemoryUsage': (340 + 190 + 90 + 240) / 4,
+        'peakAllocationCount': 3, 'totalMemoryFootprint': 640,
+    }
+    assert out['globalSummary'] == {
+        'totalGroups': 1, 'maxMemoryUsage': 340, 'totalAllocations': 4, 'avgSuccessRate': 75.0,
+    }
+
+
+# ----------------------------------------------------------
+# 2. 两个后端一致
+# ----------------------------------------------------------
+def random_groups(seed: int, n_groups: int, n_allocs: int, steps: int):
+    """与 LmemParser 输出同形的分配组：含回卷区间、hold_in_lmem、失败分配和 bank 冲突"""
+    rnd = random.Random(seed)
+    groups = []
+    for g in range(n_groups):
+        allocs = []
+        for _ in range(n_allocs):
+            addr = rnd.randrange(0, 1 << 18, 64)
+            allocs.append(alloc(addr, rnd.randint(1, 64) * 64, rnd.randrange(steps), rnd.randrange(steps),
+                                addr // (1 << 14), 'success' if rnd.random() < 0.9 else 'failed',
+                                rnd.choice(LMEM_TYPES), hold=int(rnd.random() < 0.1)))
+        max_ts = max(a['timestep_end'] for a in allocs)
+        for a in allocs:
+            a['max_timestep'] = max_ts
+        groups.append({'settings': {'allow_bank_conflict': g % 2, 'shape_secs': f'1,{g + 1},1,1,1'},
+                       'allocations': allocs})
+    return groups
+
+
+@pytest.mark.parametrize('seed, n_groups, n_allocs, steps', [
+    (0, 4, 50, 16),
+    (1, 3, 200, 64),
+    (2, 2, 40, 1),
+])
+def test_backends_match(seed, n_groups, n_allocs, steps):
+    pytest.importorskip('numpy')
+    groups = random_groups(seed, n_groups, n_allocs, steps)
+    allocs = [a for g in groups for a in g['allocations']]
+    if steps > 1:
+        assert any(a['timestep_start'] > a['timestep_end'] for a in allocs)
+    assert any(a['hold_in_lmem'] for a in allocs)
+    assert calculate(groups, steps, 'numpy') == calculate(groups, steps, 'python')
+
+
+def test_backends_match_hand_computed():
+    pytest.importorskip('numpy')
+    assert calculate([HAND_GROUP], 3, 'numpy') == calculate([HAND_GROUP], 3, 'python')
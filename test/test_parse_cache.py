@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ParseCache
+    - 损坏或由别的代码版本写入的 .lvcache 条目按未命中处理，重新解析后覆盖
+    - 解析器版本覆盖 log_parser 导入的所有同目录模块
+usage:
+    python -m pytest test/
+"""
+import sys
+import pickle
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / 'src' / 'core' / 'parser'))
+import log_parser                                    # noqa: E402
+from parse_cache import ParseCache, package_modules   # noqa: E402
+
+VALUE = {'profile': [1, 2, 3]}
+BAD_PAYLOADS = {
+    'garbage': b'\x00\x01 not a pickle',
+    'truncated': pickle.dumps(VALUE)[:10],
+    'empty': b'',
+    'missing_module': b'cno_such_module_for_lvcache\nThing\n.',      # ModuleNotFoundError
+    'missing_attr': b'cbuiltins\nno_such_builtin_for_lvcache\n.',    # AttributeError
+}
+
+
+@pytest.mark.parametrize('payload', BAD_PAYLOADS.values(), ids=BAD_PAYLOADS.keys())
+def test_corrupt_entry_is_a_miss(tmp_path, payload):
+    src = tmp_path / 'input.log'
+    src.write_text('x')
+    cache = ParseCache(tmp_path / '.lvcache', 1 << 20)
+    key = cache.key('log', [src])
+    cache.put(key, VALUE)
+    (tmp_path / '.lvcache' / f'{key}.pkl').write_bytes(payload)
+
+    assert cache.get(key) is None
+    calls = []
+    assert cache.cached(key, lambda: calls.append(1) or VALUE) == VALUE
+    assert calls == [1]
+    assert cache.get(key) == VALUE      # 重新解析的结果已覆盖坏条目
+    cache.close()
+
+
+def test_version_covers_imported_modules(tmp_path):
+    names = {p.name for p in package_modules(Path(log_parser.__file__))}
+    assert {'log_parser.py', 'parse_cache.py', 'columnar.py'} <= names
+
+    mod = tmp_path / 'mod.py'
+    mod.write_text('A = 1\n')
+    v1 = ParseCache(tmp_path / 'c', 1 << 20, code_files=[mod]).version
+    mod.write_text('A = 2\n')
+    assert ParseCache(tmp_path / 'c', 1 << 20, code_files=[mod]).version != v1
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ProfileParser 尾部汇总（settings）只由少数汇总行得到，与指令条数无关
+    - 大量只有 GDMA 列的行（BD 列为空）不进入汇总正则的输入
+    - 汇总各字段与按全文搜索的结果一致
+usage:
+    python -m pytest test/
+"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / 'src' / 'core' / 'parser'))
+import log_parser as lp   # noqa: E402
+
+N_GDMA_ONLY = 20_000
+SUMMARY_LINES = [
+    'API_END total_cycle:99999|b:3|g:20003',
+    'TCYC : 99999',
+    'GDMA SUMMARY : total|dr[0] S2L:100 a|dr[1] L2S:200 b|dr[2] S2S:0 c|dr[3] L2L:5',
+    'DDR BW USAGE : 12.5%',
+    'flops: 1.5e+09, runtime: 3.25ms, ComputationAbility: 1.75T',
+]
+
+
+def make_profile() -> str:
+    lines = ['ENGINE_BD                                ENGINE_GDMA', '-' * 60]
+    for i in range(3):
+        lines.append(f'Conv2D_{i}|AR|s:{i * 10}|b:{i + 1}|g:0|e:{i * 10 + 5}|t:5')
+    for i in range(N_GDMA_ONLY):
+        lines.append(' ' * 41 + f'Load_{i}|DMA_tensor|s:{i * 4}|b:3|g:{i + 1}|e:{i * 4 + 3}|t:3'
+                               f'|dr:0|sz:64|bw:1.50')
+    lines.append('-' * 60)
+    return '\n'.join(lines + SUMMARY_LINES) + '\n'
+
+
+def test_summary_ignores_gdma_only_rows(monkeypatch):
+    seen = []
+    extract = lp.ProfileParser._extract_tail_summary
+
+    def spy(self, raw_text):
+        seen.append(raw_text)
+        return extract(self, raw_text)
+
+    monkeypatch.setattr(lp.ProfileParser, '_extract_tail_summary', spy)
+    text = make_profile()
+    entries, summary = lp.ProfileParser()._scan_lines(text)
+
+    assert len(entries) == 3 + N_GDMA_ONLY
+    assert seen == ['\n'.join(SUMMARY_LINES)]
+    assert summary == lp.ProfileParser()._extract_tail_summary(text)
+    assert summary['totalCycle'] == 99999 and summary['lastGdmaId'] == 20003
+    assert summary['gdmaBytes'] == {'S2L': 100, 'L2S': 200, 'S2S': 0, 'L2L': 5}
+    assert summary['computationAbility_T'] == 1.75
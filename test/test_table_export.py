@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CoreExporter 与 profile 解析共用一个进程池
+    - 在 worker 里解析的 core 由该 worker 就地导出，主进程 submit 跳过、不再传 entries
+    - 导出的 csv 与串行导出逐字节一致
+usage:
+    python -m pytest test/
+"""
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / 'src' / 'core' / 'parser'))
+import log_parser as lp                          # noqa: E402
+from table_export import CoreExporter            # noqa: E402
+
+PROFILE = '\n'.join([
+    'ENGINE_BD                                ENGINE_GDMA',
+    '-' * 60,
+    'Conv2D_1|AR|s:0|b:1|g:0|e:5|t:5'.ljust(41)
+    + 'Load_1|DMA_tensor|s:1|b:0|g:1|e:9|t:8|dr:0|sz:512|bw:1.25',
+    'Conv2D_2|AR|s:6|b:2|g:1|e:10|t:4',
+    '-' * 60,
+    'API_END total_cycle:10|b:2|g:1',
+]) + '\n'
+N_CORES = 3
+
+
+def test_shared_pool_exports_in_worker(tmp_path):
+    prof_files = []
+    for n in range(N_CORES):
+        path = tmp_path / f'compiler_profile_{n}.txt'
+        path.write_text(PROFILE)
+        prof_files.append((n, path))
+    pooled, serial = tmp_path / 'pooled', tmp_path / 'serial'
+    pooled.mkdir()
+    serial.mkdir()
+
+    submitted = []
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        exporter = CoreExporter(pooled, ['csv'], 2, executor)
+        for n, prof in lp.iter_profiles(prof_files, None, 2, None, executor, exporter):
+            exporter.submit(n, prof['entries'])
+            submitted.append(n)
+        assert not exporter.pending      # 都已在解析 worker 里导出
+        exporter.close()
+    assert submitted == list(range(N_CORES))
+    assert exporter.claimed == set(range(N_CORES))
+
+    with CoreExporter(serial, ['csv']) as exporter:
+        for n, prof in lp.iter_profiles(prof_files):
+            exporter.submit(n, prof['entries'])
+    for n in range(N_CORES):
+        name = f'core_{n}.csv'
+        assert (pooled / name).read_bytes() == (serial / name).read_bytes()